@@ -0,0 +1,143 @@
+"""Microbenchmark of light state updates and the attribute reads of a state write.
+
+Feeds thousands of bridge states into light entities and reads what Home
+Assistant reads when it writes an entity state (state, capability and state
+attributes), comparing the entity that precomputes its attributes from a
+state record with the previous implementation that derived every attribute
+from the raw state on each property read.
+
+Run from the repository root with Home Assistant and xcomfort installed:
+
+    python benchmarks/bench_entity_state.py --lights 300 --updates 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from custom_components.xcomfort_bridge.light import HASSXComfortLight
+from custom_components.xcomfort_bridge.states import light_record
+from homeassistant.components.light import ColorMode
+
+
+class Light:
+    """Minimal stand-in for a library light."""
+
+    def __init__(self, device_id: int) -> None:
+        self.device_id = device_id
+        self.name = f"Light {device_id}"
+        self.dimmable = True
+        self.state = None
+
+
+class LightState:
+    """Minimal stand-in for a library light state."""
+
+    def __init__(self, switch: bool, dimmvalue: int) -> None:
+        self.switch = switch
+        self.dimmvalue = dimmvalue
+
+
+class _Hub:
+    identifier = "bench"
+    device_id = None
+
+    def __init__(self) -> None:
+        self.writes = 0
+
+    def async_write_state(self, entity, flush: bool = False) -> None:
+        self.writes += 1
+
+
+class LegacyLight(HASSXComfortLight):
+    """The light as it derived its attributes before state records."""
+
+    def __init__(self, hass, hub, device) -> None:
+        super().__init__(hass, hub, device)
+        self._state = None
+        self._color_mode = ColorMode.BRIGHTNESS if device.dimmable else ColorMode.ONOFF
+
+    def _on_device_state(self, new_state):
+        if new_state is not None and new_state != self._state:
+            was_on = self.is_on
+            self._state = new_state
+            self.hub.async_write_state(self, flush=self.is_on != was_on)
+
+    def _get_state_value(self, key, default=None):
+        if self._state is None:
+            return default
+        if isinstance(self._state, dict):
+            return self._state.get(key, default)
+        elif hasattr(self._state, key):
+            return getattr(self._state, key)
+        else:
+            return default
+
+    @property
+    def brightness(self):
+        if not self.is_on:
+            return None
+        dimmvalue = self._get_state_value("dimmvalue", 0)
+        return int(255.0 * dimmvalue / 99.0)
+
+    @property
+    def is_on(self):
+        return self._get_state_value("switch", False)
+
+    @property
+    def color_mode(self):
+        return self._color_mode
+
+    @property
+    def supported_color_modes(self):
+        return {self._color_mode}
+
+
+def _run(cls, lights: int, updates: int, states: list) -> tuple[float, float, list]:
+    hub = _Hub()
+    entities = [cls(None, hub, Light(device_id)) for device_id in range(lights)]
+    seen = []
+    update_time = write_time = 0.0
+    for i in range(updates):
+        entity = entities[i % lights]
+        started = time.perf_counter()
+        entity._on_device_state(states[i % len(states)])
+        written = time.perf_counter()
+        # What a state write reads from the entity
+        seen.append((entity.state, entity.capability_attributes, entity.state_attributes))
+        write_time += time.perf_counter() - written
+        update_time += written - started
+    return updates / update_time, updates / write_time, seen
+
+
+def run(lights: int, updates: int) -> None:
+    """Run both implementations and print updates and state writes per second."""
+    states = [LightState(value % 3 != 0, value % 100) for value in range(97)]
+    legacy_updates, legacy_writes, legacy_seen = _run(LegacyLight, lights, updates, states)
+    # The hub decodes each state once, before it reaches the light
+    updates_, writes, seen = _run(HASSXComfortLight, lights, updates, [light_record(state) for state in states])
+
+    assert legacy_seen == seen
+    print(f"lights={lights} updates={updates}")
+    print(f"  updates before: {legacy_updates:12,.0f}/s")
+    print(f"  updates after:  {updates_:12,.0f}/s  ({updates_ / legacy_updates:.2f}x)")
+    print(f"  writes before:  {legacy_writes:12,.0f}/s")
+    print(f"  writes after:   {writes:12,.0f}/s  ({writes / legacy_writes:.2f}x)")
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lights", type=int, default=300)
+    parser.add_argument("--updates", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.lights, args.updates)
+
+
+if __name__ == "__main__":
+    main()
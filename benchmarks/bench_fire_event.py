@@ -0,0 +1,147 @@
+"""Microbenchmark of state dispatch through XComfortHub._fire_event.
+
+Measures events per second through the hub's dispatch with one listener per
+device, against the previous implementation that resolved the device type and
+id by reflection and formatted its debug logs on every event. The previous
+implementation always fired xcomfort_event on the bus, so the hub is measured
+with the event on for a like for like comparison, and with it off (the
+fire_events option's default) separately.
+
+The hub is built as the integration builds it, on a simulated bridge in a
+bare Home Assistant instance. Run from the repository root with Home Assistant and xcomfort installed:
+
+    python benchmarks/bench_fire_event.py --devices 300 --events 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from simulator import SimulatedBridge
+
+from custom_components.xcomfort_bridge.hub import XComfortHub
+from custom_components.xcomfort_bridge.states import state_decoder
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger("bench_fire_event")
+
+
+class Light:
+    """Minimal stand-in for a library light."""
+
+    def __init__(self, device_id: int) -> None:
+        self.device_id = device_id
+        self.name = f"Light {device_id}"
+
+
+class LightState:
+    """Minimal stand-in for a library light state."""
+
+    def __init__(self, switch: bool, dimmvalue: int) -> None:
+        self.switch = switch
+        self.dimmvalue = dimmvalue
+        self.raw = {"switch": switch, "dimmvalue": dimmvalue}
+
+
+def legacy_fire_event(hub, listeners, entity, state) -> None:
+    """Dispatch as _fire_event did before metadata was precomputed."""
+    entity_id = getattr(entity, "device_id", None)
+    entity_type = type(entity).__name__
+    entity_name = getattr(entity, "name", "")  # noqa: F841
+
+    if hasattr(entity, "device_id"):
+        if entity_type == "BridgeDevice":
+            _LOGGER.debug(f"Skipping event for BridgeDevice (device_id: {entity_id})")
+            return
+    elif hasattr(entity, "room_id"):
+        entity_id = entity.room_id
+        entity_type = "Room"
+    else:
+        return
+
+    for listener in tuple(listeners.get((entity_type, entity_id), ())):
+        listener(state)
+
+    if isinstance(state, (str, int, float, bool)):
+        new_state = state
+    elif hasattr(state, "raw"):
+        new_state = state.raw
+    else:
+        new_state = str(state)
+
+    event_data = {"device_id": entity_id, "device_type": entity_type, "action": "state_change", "new_state": new_state}
+    hub.hass.bus.fire("xcomfort_event", event_data)
+    _LOGGER.debug(f"Fired xcomfort_event for {entity_type} {entity_id} with new_state {new_state}")
+
+
+async def run(devices: int, events: int) -> None:
+    """Run both implementations and print events per second."""
+    received = 0
+
+    def listener(state) -> None:
+        nonlocal received
+        received += 1
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        await hass.async_start()
+        try:
+            hub = XComfortHub(hass, "bench", "simulator", "simulator", bridge=SimulatedBridge(0, 0, 0))
+            sources = [Light(device_id) for device_id in range(devices)]
+            legacy_listeners = {}
+            for source in sources:
+                hub.async_subscribe_state("Light", source.device_id, listener)
+                legacy_listeners[("Light", source.device_id)] = [listener]
+            keys = [("Light", source.device_id) for source in sources]
+            states = [LightState(True, value % 100) for value in range(64)]
+
+            started = time.perf_counter()
+            for i in range(events):
+                legacy_fire_event(hub, legacy_listeners, sources[i % devices], states[i & 63])
+            legacy = events / (time.perf_counter() - started)
+            # Deliver the fired events outside the measurement
+            await hass.async_block_till_done()
+
+            # As the hub's subscription and update queue call it, decoding the
+            # state and taking the event payload once
+            decode = state_decoder("Light")
+            event_state = hub._event_state
+            rates = {}
+            for fire_events in (True, False):
+                hub.fire_events = fire_events
+                started = time.perf_counter()
+                for i in range(events):
+                    state = states[i & 63]
+                    hub._fire_event(keys[i % devices], decode(state), event_state(state) if fire_events else None)
+                rates[fire_events] = events / (time.perf_counter() - started)
+                await hass.async_block_till_done()
+        finally:
+            await hass.async_stop(force=True)
+
+    assert received == 3 * events
+    print(f"devices={devices} events={events}")
+    print(f"  before:             {legacy:12,.0f} events/s")
+    print(f"  after, events on:   {rates[True]:12,.0f} events/s  ({rates[True] / legacy:.2f}x)")
+    print(f"  after, events off:  {rates[False]:12,.0f} events/s  ({rates[False] / legacy:.2f}x)")
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=300)
+    parser.add_argument("--events", type=int, default=200_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.devices, args.events))
+
+
+if __name__ == "__main__":
+    main()
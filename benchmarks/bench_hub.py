@@ -0,0 +1,262 @@
+"""End-to-end benchmarks of XComfortHub against the bridge simulator.
+
+Scenarios:
+  startup   time until the inventory is loaded and every light entity exists,
+            from a cold start and from the cached inventory snapshot
+  events    state changes per second read from bridge messages, and handled
+            through the hub into light entities and the state machine
+  commands  latency of light commands through the hub until the bridge has
+            confirmed them, one at a time and as a group action over all lights
+  reconnect time from a dropped connection until entities are available
+            again, and how many state writes the resync caused
+
+Everything runs in-process against benchmarks/simulator.py, so no bridge or
+network is needed. Run from the repository root with Home Assistant and
+xcomfort installed:
+
+    python benchmarks/bench_hub.py --lights 300 --events 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from contextlib import redirect_stdout
+import logging
+import os
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from simulator import SimulatedBridge
+
+from custom_components.xcomfort_bridge.hub import XComfortHub
+from custom_components.xcomfort_bridge.index import BUCKET_LIGHTS
+from custom_components.xcomfort_bridge.light import HASSXComfortLight
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Context, HomeAssistant
+
+
+def _percentiles(samples: list[float]) -> str:
+    if len(samples) < 2:
+        return f"n={len(samples)}"
+    cuts = statistics.quantiles(samples, n=100)
+    return (
+        f"n={len(samples)} p50={cuts[49] * 1000:.2f}ms "
+        f"p95={cuts[94] * 1000:.2f}ms p99={cuts[98] * 1000:.2f}ms"
+    )
+
+
+class Harness:
+    """A hub wired to a simulated bridge, with light entities attached."""
+
+    def __init__(self, hass: HomeAssistant, args: argparse.Namespace) -> None:
+        """Create the simulator and the hub."""
+        self.hass = hass
+        self.bridge = SimulatedBridge(
+            lights=args.lights, shades=args.shades, rooms=args.rooms, latency=args.latency
+        )
+        self.hub = XComfortHub(hass, "bench", "simulator", "simulator", bridge=self.bridge)
+        self.lights: list[HASSXComfortLight] = []
+        self._run_task: asyncio.Task | None = None
+
+    async def start(self, restore_snapshot: bool = False) -> None:
+        """Connect to the simulator and load the inventory."""
+        if restore_snapshot:
+            await self.hub.async_restore_snapshot()
+        self._run_task = asyncio.create_task(self.hub.run())
+        if not restore_snapshot or not self.hub.has_done_initial_load.is_set():
+            await self.hub.load_devices()
+
+    async def add_lights(self) -> None:
+        """Create light entities for the indexed lights."""
+        for device in self.hub.index[BUCKET_LIGHTS]:
+            light = HASSXComfortLight(self.hass, self.hub, device)
+            light.entity_id = f"light.xcomfort_{device.device_id}"
+            light.async_set_context(Context())
+            await light.async_added_to_hass()
+            self.lights.append(light)
+
+    async def stop(self) -> None:
+        """Remove the entities and stop the hub."""
+        for light in self.lights:
+            await light.async_remove(force_remove=True)
+        await self.hub.stop()
+        if self._run_task is not None:
+            await self._run_task
+
+
+async def bench_startup(hass: HomeAssistant, args: argparse.Namespace) -> None:
+    """Time cold start and start from the cached snapshot."""
+    for label, restore in (("cold", False), ("snapshot", True)):
+        started = time.perf_counter()
+        harness = Harness(hass, args)
+        harness.bridge.connect_delay = args.connect_delay
+        await harness.start(restore_snapshot=restore)
+        await harness.add_lights()
+        first_entities = time.perf_counter() - started
+        if restore:
+            await harness.hub.load_devices()
+        loaded = time.perf_counter() - started
+        print(
+            f"startup {label:8}: entities after {first_entities * 1000:8.1f}ms, "
+            f"live inventory after {loaded * 1000:8.1f}ms ({len(harness.lights)} lights)"
+        )
+        await harness.stop()
+
+
+async def bench_events(hass: HomeAssistant, args: argparse.Namespace) -> None:
+    """Measure state change throughput from bridge messages into entities."""
+    harness = Harness(hass, args)
+    await harness.start()
+    await harness.add_lights()
+
+    writes = 0
+
+    def _count_write(event) -> None:
+        nonlocal writes
+        writes += 1
+
+    unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, _count_write)
+    coalescer = harness.hub.write_coalescer
+    updates = harness.hub.updates
+    merged_before = coalescer.merged
+    overflows_before = updates.overflows
+
+    with open(os.devnull, "w", encoding="utf-8") as devnull, redirect_stdout(devnull):
+        started = time.perf_counter()
+        harness.bridge.emit_state_changes(args.events)
+        read = time.perf_counter() - started
+        while updates.depth:
+            await asyncio.sleep(0)
+        handled = time.perf_counter() - started
+        # Let coalesced writes flush
+        await asyncio.sleep(coalescer.window + 0.05)
+        await hass.async_block_till_done()
+
+    unsub()
+    print(
+        f"events          : {args.events / read:12,.0f} events/s read, "
+        f"{args.events / handled:12,.0f} events/s handled, "
+        f"{writes} state writes, {coalescer.merged - merged_before} merged, "
+        f"{updates.overflows - overflows_before} queue overflows, max depth {updates.max_depth}"
+    )
+    await harness.stop()
+
+
+async def bench_commands(hass: HomeAssistant, args: argparse.Namespace) -> None:
+    """Measure command latency through the hub."""
+    harness = Harness(hass, args)
+    await harness.start()
+    await harness.add_lights()
+    lights = harness.lights[: args.commands]
+
+    async def _timed_turn_on(light: HASSXComfortLight, brightness: int) -> float:
+        started = time.perf_counter()
+        await light.async_turn_on(brightness=brightness)
+        return time.perf_counter() - started
+
+    sequential = [await _timed_turn_on(light, 128) for light in lights]
+    print(f"commands serial : {_percentiles(sequential)}")
+
+    started = time.perf_counter()
+    group = await asyncio.gather(*(_timed_turn_on(light, 255) for light in lights))
+    total = time.perf_counter() - started
+    print(f"commands group  : {_percentiles(list(group))}, whole group {total * 1000:.2f}ms")
+    for name in harness.hub.metrics.command_names:
+        latency = harness.hub.metrics.command_latency(name)
+        print(f"hub {name:12}: " + " ".join(f"{label}={value:.2f}ms" for label, value in latency.items()))
+    if (queue_wait := harness.hub.metrics.queue_wait()) is not None:
+        print("hub queue wait  : " + " ".join(f"{label}={value:.2f}ms" for label, value in queue_wait.items()))
+    optimistic = harness.hub.optimistic
+    print(
+        f"optimistic      : {optimistic.confirmed} confirmed, {optimistic.rolled_back} rolled back, "
+        f"{optimistic.superseded} superseded"
+    )
+
+    await harness.stop()
+
+
+async def bench_reconnect(hass: HomeAssistant, args: argparse.Namespace) -> None:
+    """Measure recovery from a dropped bridge connection."""
+    harness = Harness(hass, args)
+    await harness.start()
+    await harness.add_lights()
+    hub = harness.hub
+    # Change some lights while the connection is down
+    changed = max(1, len(harness.lights) // 10)
+
+    writes = 0
+
+    def _count_write(event) -> None:
+        nonlocal writes
+        writes += 1
+
+    await asyncio.sleep(harness.hub.write_coalescer.window + 0.05)
+    unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, _count_write)
+    started = time.perf_counter()
+    await harness.bridge.drop_connection()
+    while hub.available:
+        await asyncio.sleep(0.001)
+    for device_id in harness.bridge.light_ids[:changed]:
+        harness.bridge.set_dimmvalue(device_id, 42)
+    while not hub.available:
+        await asyncio.sleep(0.01)
+    recovered = time.perf_counter() - started
+    await asyncio.sleep(harness.hub.write_coalescer.window + 0.05)
+    await hass.async_block_till_done()
+    unsub()
+
+    print(
+        f"reconnect       : available again after {recovered * 1000:.0f}ms, "
+        f"{hub.metrics.reconnects} reconnects, {changed} lights changed, {writes} state writes"
+    )
+    await harness.stop()
+
+
+SCENARIOS = {
+    "startup": bench_startup,
+    "events": bench_events,
+    "commands": bench_commands,
+    "reconnect": bench_reconnect,
+}
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Run the selected scenarios."""
+    # Entities are added without an entity platform, which Home Assistant warns about
+    logging.getLogger("homeassistant.helpers.entity").setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        await hass.async_start()
+        try:
+            for name in args.scenarios:
+                await SCENARIOS[name](hass, args)
+        finally:
+            await hass.async_stop(force=True)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS), help=", ".join(SCENARIOS))
+    parser.add_argument("--lights", type=int, default=300)
+    parser.add_argument("--shades", type=int, default=20)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--commands", type=int, default=50, help="lights used in the command scenario")
+    parser.add_argument("--latency", type=float, default=0.005, help="simulated command latency in seconds")
+    parser.add_argument("--connect-delay", type=float, default=0.5, help="simulated bridge handshake in seconds")
+    args = parser.parse_args()
+    if unknown := set(args.scenarios) - set(SCENARIOS):
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
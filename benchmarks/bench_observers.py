@@ -0,0 +1,111 @@
+"""Microbenchmark of the per-event overhead of device state observers.
+
+A state emitted by a library device reaches the hub either through the
+cached stand-in restored from the inventory snapshot, or straight from the
+library device if it has no stand-in. Both paths are timed as they were,
+with the library's Rx BehaviorSubject (and an Rx subject on the stand-in),
+and as they are now, with the library's subject adopted as a
+StateObservable (see adopt_state) and a StateObservable on the stand-in.
+
+Run from the repository root with Home Assistant and xcomfort installed:
+
+    python benchmarks/bench_observers.py --devices 300 --events 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from rx.subject import BehaviorSubject
+
+from custom_components.xcomfort_bridge.observable import StateObservable, adopt_state
+from custom_components.xcomfort_bridge.snapshot import CachedDevice
+
+
+class LiveLight:
+    """Minimal stand-in for a library light, which keeps its state in an Rx subject."""
+
+    def __init__(self, device_id: int) -> None:
+        self.device_id = device_id
+        self.name = f"Light {device_id}"
+        self.state = BehaviorSubject(None)
+
+
+class RxCachedDevice(CachedDevice):
+    """The cached device as it was, with an Rx subject of its own fed from the library's."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.state = BehaviorSubject(self.state.value)
+
+    def bind(self, live) -> None:
+        self.unbind()
+        self._live = live
+        self.name = live.name
+        self._live_subscription = live.state.subscribe(self._forward_state)
+
+
+def _time(subjects: list, events: int) -> float:
+    """Emit events round robin into the subjects, return nanoseconds per event."""
+    count = len(subjects)
+    started = time.perf_counter()
+    for i in range(events):
+        subjects[i % count].on_next(i)
+    return (time.perf_counter() - started) / events * 1e9
+
+
+def _chain(cls, devices: int, events: int) -> tuple[float, int]:
+    received = 0
+
+    def _sink(state) -> None:
+        nonlocal received
+        received += 1
+
+    lives = [LiveLight(device_id) for device_id in range(devices)]
+    for live in lives:
+        cached = cls("Light", live.device_id, live.name)
+        cached.bind(live)
+        cached.state.subscribe(_sink)
+    received = 0
+    return _time([live.state for live in lives], events), received
+
+
+def _direct(adopt: bool, devices: int, events: int) -> float:
+    lives = [LiveLight(device_id) for device_id in range(devices)]
+    for live in lives:
+        state = adopt_state(live) if adopt else live.state
+        state.subscribe(lambda state: None)
+    return _time([live.state for live in lives], events)
+
+
+def run(devices: int, events: int) -> None:
+    """Time both observer paths and print the overhead per event."""
+    rx_chain, rx_received = _chain(RxCachedDevice, devices, events)
+    chain, received = _chain(CachedDevice, devices, events)
+    assert rx_received == received == events
+    rx_direct = _direct(False, devices, events)
+    direct = _direct(True, devices, events)
+
+    print(f"devices={devices} events={events}")
+    print(f"  library -> stand-in -> hub, Rx:                  {rx_chain:8.0f} ns/event")
+    print(f"  library -> stand-in -> hub, StateObservable:     {chain:8.0f} ns/event  ({rx_chain / chain:.2f}x)")
+    print(f"  library -> hub, Rx:                              {rx_direct:8.0f} ns/event")
+    print(f"  library -> hub, StateObservable:                 {direct:8.0f} ns/event  ({rx_direct / direct:.2f}x)")
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=300)
+    parser.add_argument("--events", type=int, default=200_000)
+    args = parser.parse_args()
+    run(args.devices, args.events)
+
+
+if __name__ == "__main__":
+    main()
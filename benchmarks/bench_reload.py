@@ -0,0 +1,177 @@
+"""Leak check of the config entry lifecycle against the bridge simulator.
+
+Sets the integration up as a config entry in a bare Home Assistant instance,
+reloads it many times and tracks after each reload:
+
+  listeners    event bus listeners
+  dispatcher   dispatcher signal connections
+  hubs         XComfortHub instances still alive
+  observers    state observers left on the devices and rooms of the bridge
+               that was just unloaded
+  memory       memory allocated by Python with the integration, xcomfort
+               or rx on the stack (Home Assistant itself keeps some state
+               per reload, e.g. its entity platforms)
+
+Every count must be the same after the last reload as after the warm-up
+reloads, no observers may be left on an unloaded bridge, and memory may not
+grow beyond the tolerance; the script exits with status 1 otherwise.
+
+Every config entry gets its own SimulatedBridge instead of a real bridge.
+Run from the repository root with Home Assistant and xcomfort installed:
+
+    python benchmarks/bench_reload.py --reloads 50
+
+tests/test_reload.py runs a shorter check with the test suite.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+from pathlib import Path
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from simulator import SimulatedBridge
+
+from homeassistant import bootstrap, config_entries, loader
+from homeassistant.const import CONF_IP_ADDRESS
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import DATA_DISPATCHER
+
+ROOT = Path(__file__).resolve().parents[1]
+DOMAIN = "xcomfort_bridge"
+
+# Frames kept per allocation, deep enough to reach the integration's code
+# below Home Assistant's setup and dispatch frames
+TRACEBACK_FRAMES = 30
+OWN_CODE = [
+    tracemalloc.Filter(True, f"*{os.sep}{pattern}{os.sep}*", all_frames=True)
+    for pattern in ("xcomfort_bridge", "xcomfort", "rx")
+]
+
+
+def _observers(sources: list) -> int:
+    return sum(len(source.state.observers) for source in sources)
+
+
+def _live_sources(hub) -> list:
+    """Return the library devices and rooms behind the hub's inventory."""
+    return [getattr(source, "_live", None) or source for source in [*hub.devices, *hub.rooms]]
+
+
+def _measure(hass: HomeAssistant, hub_class) -> dict[str, int]:
+    gc.collect()
+    return {
+        "listeners": sum(hass.bus.async_listeners().values()),
+        "dispatcher": sum(len(targets) for targets in hass.data.get(DATA_DISPATCHER, {}).values()),
+        "hubs": sum(isinstance(obj, hub_class) for obj in gc.get_objects()),
+        "memory": sum(stat.size for stat in tracemalloc.take_snapshot().filter_traces(OWN_CODE).statistics("filename")),
+    }
+
+
+async def run(args: argparse.Namespace) -> bool:
+    """Reload the entry and return True if nothing leaked."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        # Home Assistant loads custom integrations from the config directory
+        os.symlink(ROOT / "custom_components", Path(config_dir) / "custom_components")
+        sys.path.insert(0, config_dir)
+
+        hass = HomeAssistant(config_dir)
+        loader.async_setup(hass)
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        await hass.config_entries.async_initialize()
+        await bootstrap.async_load_base_functionality(hass)
+        await hass.async_start()
+
+        from custom_components.xcomfort_bridge import hub as hub_module
+
+        hub_module.Bridge = lambda ip, auth_key: SimulatedBridge(
+            lights=args.lights, shades=args.shades, rooms=args.rooms
+        )
+
+        entry = config_entries.ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=DOMAIN,
+            title="simulator",
+            data={"identifier": "simulator", CONF_IP_ADDRESS: "simulator", "auth_key": "simulator"},
+            source=config_entries.SOURCE_USER,
+            options={},
+        )
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+
+        tracemalloc.start(TRACEBACK_FRAMES)
+        ok = True
+        baseline = None
+        try:
+            for reload in range(1, args.reloads + 1):
+                sources = _live_sources(hass.data[DOMAIN][entry.entry_id])
+                await hass.config_entries.async_reload(entry.entry_id)
+                await hass.async_block_till_done()
+                hub = hass.data[DOMAIN][entry.entry_id]
+                await hub.has_done_initial_load.wait()
+                await hass.async_block_till_done()
+
+                counts = _measure(hass, hub_module.XComfortHub)
+                observers = _observers(sources)
+                if reload == args.warmup:
+                    baseline = counts
+                if reload in (1, args.warmup) or reload % args.report == 0 or reload == args.reloads:
+                    print(
+                        f"reload {reload:4}: {counts['listeners']} listeners, {counts['dispatcher']} dispatcher, "
+                        f"{counts['hubs']} hubs, {observers} observers, {counts['memory'] / 1024:.0f} KiB"
+                    )
+                if observers:
+                    print(f"  {observers} state observers left on the unloaded bridge")
+                    ok = False
+        finally:
+            await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_stop(force=True)
+            tracemalloc.stop()
+
+        if baseline is None:
+            return ok
+        for name in ("listeners", "dispatcher", "hubs"):
+            if counts[name] > baseline[name]:
+                print(f"{name} grew from {baseline[name]} to {counts[name]}")
+                ok = False
+        growth = counts["memory"] - baseline["memory"]
+        print(f"memory growth after warm-up: {growth / 1024:.0f} KiB over {args.reloads - args.warmup} reloads")
+        if growth > args.memory_tolerance * 1024:
+            print(f"memory grew by more than {args.memory_tolerance} KiB")
+            ok = False
+        return ok
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reloads", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5, help="reloads before the baseline is taken")
+    parser.add_argument("--report", type=int, default=10, help="print every this many reloads")
+    parser.add_argument("--lights", type=int, default=50)
+    parser.add_argument("--shades", type=int, default=5)
+    parser.add_argument("--rooms", type=int, default=5)
+    parser.add_argument("--memory-tolerance", type=int, default=64, help="KiB")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    """Parse arguments, run the check and exit with its result."""
+    args = parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    ok = asyncio.run(run(args))
+    print("no leaks" if ok else "LEAKS FOUND")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
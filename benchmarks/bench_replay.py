@@ -0,0 +1,243 @@
+"""Replay of captured bridge traffic through the integration.
+
+Sets the integration up as a config entry in a bare Home Assistant instance
+against a ReplayBridge, which feeds it the messages of a capture recorded
+with the capture option (see custom_components/xcomfort_bridge/capture.py),
+and reports:
+
+  messages     messages replayed, and per second of wall time until every
+               resulting state update was handled
+  read         time the bridge reader spent per message (p50/p95/p99/max)
+  lag          how late messages were delivered behind the capture's pace
+  events       state changes handled by the hub, by device type
+  writes       entity state writes
+  queue        state update queue overflows and maximum depth
+
+Results can be saved as JSON and compared with those of another version:
+
+    python benchmarks/bench_replay.py site.jsonl.gz --speed 0 --json before.json
+    (check out the other version)
+    python benchmarks/bench_replay.py site.jsonl.gz --speed 0 --baseline before.json
+
+--speed 1 replays at the recorded pace, 10 ten times faster and 0 as fast as
+possible. Without a capture of a real site at hand, --record records one
+from the bridge simulator through the same capture option:
+
+    python benchmarks/bench_replay.py sim.jsonl.gz --record --rate 200 --duration 10
+
+A recorded capture is replayed straight away, and the state changes the hub
+dispatched while recording must come out of the replay in the same order;
+the script fails otherwise.
+
+Run from the repository root with Home Assistant and xcomfort installed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+import json
+import logging
+import os
+from pathlib import Path
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from simulator import ReplayBridge, SimulatedBridge
+
+from homeassistant import bootstrap, config_entries, loader
+from homeassistant.const import CONF_IP_ADDRESS, EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant, callback
+
+ROOT = Path(__file__).resolve().parents[1]
+DOMAIN = "xcomfort_bridge"
+EVENT_XCOMFORT = "xcomfort_event"
+
+
+@asynccontextmanager
+async def _integration(bridge_factory: Callable[[], Any], options: dict[str, Any]):
+    """Yield Home Assistant with a config entry whose hub runs the given bridge."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        # Home Assistant loads custom integrations from the config directory
+        os.symlink(ROOT / "custom_components", Path(config_dir) / "custom_components")
+        sys.path.insert(0, config_dir)
+
+        hass = HomeAssistant(config_dir)
+        loader.async_setup(hass)
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        await hass.config_entries.async_initialize()
+        await bootstrap.async_load_base_functionality(hass)
+        await hass.async_start()
+
+        from custom_components.xcomfort_bridge import hub as hub_module
+
+        hub_module.Bridge = lambda ip, auth_key: bridge_factory()
+        entry = config_entries.ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=DOMAIN,
+            title="replay",
+            data={"identifier": "replay", CONF_IP_ADDRESS: "replay", "auth_key": "replay"},
+            source=config_entries.SOURCE_USER,
+            options=options,
+        )
+        try:
+            await hass.config_entries.async_add(entry)
+            yield hass, entry
+        finally:
+            await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_stop(force=True)
+
+
+def _listen_state_changes(hass: HomeAssistant, changes: list) -> Callable[[], None]:
+    """Append the state changes the hub fires as xcomfort_event to changes, in order."""
+
+    @callback
+    def _on_event(event) -> None:
+        changes.append((event.data["device_type"], event.data["device_id"], event.data["new_state"]))
+
+    return hass.bus.async_listen(EVENT_XCOMFORT, _on_event)
+
+
+def _milliseconds(samples: list[float]) -> dict[str, float] | None:
+    if len(samples) < 2:
+        return None
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50": cuts[49] * 1000,
+        "p95": cuts[94] * 1000,
+        "p99": cuts[98] * 1000,
+        "max": max(samples) * 1000,
+    }
+
+
+async def record(args: argparse.Namespace) -> None:
+    """Record simulated traffic with the integration's capture option, then check its replay."""
+    recorded: list = []
+    bridge = SimulatedBridge(lights=args.lights, shades=args.shades, rooms=args.rooms)
+    async with _integration(lambda: bridge, {"capture": True, "fire_events": True}) as (hass, entry):
+        unsub = _listen_state_changes(hass, recorded)
+        hub = hass.data[DOMAIN][entry.entry_id]
+        await hub.has_done_initial_load.wait()
+        sent = await bridge.run_traffic(args.rate, args.duration)
+        while hub.updates.depth:
+            await asyncio.sleep(0)
+        await hass.async_block_till_done()
+        unsub()
+        capture = hub.recorder.path
+        await hass.config_entries.async_unload(entry.entry_id)
+        shutil.copyfile(capture, args.capture)
+    print(f"recorded {sent} state messages from the simulator to {args.capture}")
+
+    replayed: list = []
+    await replay(args, replayed)
+    mismatch = next(
+        (i for i, (before, after) in enumerate(zip(recorded, replayed, strict=False)) if before != after),
+        None if len(recorded) == len(replayed) else min(len(recorded), len(replayed)),
+    )
+    assert mismatch is None, (
+        f"replay diverged from the recording at state change {mismatch} of {len(recorded)}: "
+        f"{recorded[mismatch] if mismatch < len(recorded) else None} != "
+        f"{replayed[mismatch] if mismatch < len(replayed) else None}"
+    )
+    print(f"replay reproduced the {len(recorded)} recorded state changes")
+
+
+def _replay_bridge(args: argparse.Namespace) -> ReplayBridge:
+    # Importable once Home Assistant has loaded the integration
+    from custom_components.xcomfort_bridge.capture import read_capture
+
+    return ReplayBridge(read_capture(args.capture), args.speed)
+
+
+async def replay(args: argparse.Namespace, changes: list | None = None) -> dict[str, Any]:
+    """Replay the capture and return the results.
+
+    If changes is given, the state changes the hub dispatches are appended
+    to it, see _listen_state_changes.
+    """
+    writes = 0
+
+    def _count_write(event) -> None:
+        nonlocal writes
+        writes += 1
+
+    options = {"fire_events": True} if changes is not None else {}
+    async with _integration(lambda: _replay_bridge(args), options) as (hass, entry):
+        if changes is not None:
+            entry.async_on_unload(_listen_state_changes(hass, changes))
+        unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, _count_write)
+        hub = hass.data[DOMAIN][entry.entry_id]
+        bridge = hub.bridge
+        await bridge.replayed.wait()
+        while hub.updates.depth:
+            await asyncio.sleep(0)
+        elapsed = time.perf_counter() - bridge.started
+        # Let coalesced writes flush
+        await asyncio.sleep(hub.write_coalescer.window + 0.05)
+        await hass.async_block_till_done()
+        unsub()
+        updates = hub.updates
+        return {
+            "capture": str(args.capture),
+            "speed": args.speed,
+            "messages": bridge.delivered,
+            "seconds": elapsed,
+            "messages_per_s": bridge.delivered / elapsed,
+            "read_ms": _milliseconds(bridge.read_times),
+            "lag_ms": _milliseconds(bridge.lag),
+            "events": dict(hub.metrics.events),
+            "state_writes": writes,
+            "queue_overflows": updates.overflows,
+            "queue_max_depth": updates.max_depth,
+        }
+
+
+def _compare(name: str, before: Any, after: Any) -> None:
+    if isinstance(after, dict) and isinstance(before, dict):
+        for key, value in after.items():
+            _compare(f"{name}.{key}" if name else key, before.get(key), value)
+    elif isinstance(after, int | float) and isinstance(before, int | float):
+        ratio = f"({after / before:.2f}x)" if before else ""
+        print(f"  {name:28} {before:14,.2f} -> {after:14,.2f} {ratio}")
+
+
+def main() -> None:
+    """Parse arguments, then record or replay."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", type=Path, help="capture file (.jsonl.gz)")
+    parser.add_argument("--speed", type=float, default=0, help="replay speed, 0 for as fast as possible")
+    parser.add_argument("--json", type=Path, help="save the results to this file")
+    parser.add_argument("--baseline", type=Path, help="compare with results saved by --json")
+    parser.add_argument("--record", action="store_true", help="record a capture from the simulator instead")
+    parser.add_argument("--rate", type=float, default=100, help="simulated messages per second when recording")
+    parser.add_argument("--duration", type=float, default=10, help="seconds to record")
+    parser.add_argument("--lights", type=int, default=100)
+    parser.add_argument("--shades", type=int, default=10)
+    parser.add_argument("--rooms", type=int, default=10)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    if args.record:
+        asyncio.run(record(args))
+        return
+
+    results = asyncio.run(replay(args))
+    print(json.dumps(results, indent=2))
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.baseline is not None:
+        print(f"compared with {args.baseline}:")
+        _compare("", json.loads(args.baseline.read_text(encoding="utf-8")), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""In-process simulator of an xComfort bridge for offline benchmarks.
+
+SimulatedBridge is a real ``xcomfort.bridge.Bridge`` whose websocket connection
+is replaced by SimulatedConnection. The connection synthesizes the bridge
+messages (SET_ALL_DATA on connect, SET_STATE_INFO for state changes) and feeds
+them through the library's own message handling, so devices, rooms and their
+Rx ``state`` subjects behave as they do against a physical bridge. Commands
+sent to it are recorded and echoed back as state changes.
+
+ReplayBridge feeds the messages of a capture recorded by the integration
+(see custom_components/xcomfort_bridge/capture.py) through the same message
+handling instead, at the recorded pace or faster.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+import random
+import time
+from typing import Any
+
+from rx.subject import Subject
+from xcomfort.bridge import Bridge
+from xcomfort.connection import Messages
+from xcomfort.messages import ShadeOperationState
+
+DEV_TYPE_LIGHT = 100
+DEV_TYPE_SHADE = 102
+COMP_TYPE_SHADE_ACTUATOR = 86
+
+
+class _NullSession:
+    """Placeholder so the bridge does not open an aiohttp session."""
+
+
+class SimulatedConnection:
+    """Stand-in for the bridge's secure websocket connection."""
+
+    def __init__(self, bridge: SimulatedBridge) -> None:
+        """Initialize the connection."""
+        self.bridge = bridge
+        self.messages = Subject()
+        self.sent: list[tuple[Messages, dict[str, Any]]] = []
+        self._closed = asyncio.Event()
+
+    async def pump(self) -> None:
+        """Send the initial inventory, then stay connected until closed."""
+        if self.bridge.connect_delay:
+            await asyncio.sleep(self.bridge.connect_delay)
+        self.emit(Messages.SET_ALL_DATA, self.bridge.all_data())
+        await self._closed.wait()
+
+    def emit(self, message_type: Messages, payload: dict[str, Any]) -> None:
+        """Deliver a message from the bridge."""
+        self.messages.on_next({"type_int": int(message_type), "payload": payload})
+
+    async def send_message(self, message_type: Messages, payload: dict[str, Any]) -> None:
+        """Record a message sent to the bridge and echo the resulting state."""
+        if self.bridge.latency:
+            await asyncio.sleep(self.bridge.latency)
+        self.sent.append((message_type, payload))
+        if (item := self.bridge.echo_item(message_type, payload)) is not None:
+            self.emit(Messages.SET_STATE_INFO, {"item": [item]})
+
+    async def close(self) -> None:
+        """Disconnect."""
+        self._closed.set()
+
+
+class SimulatedBridge(Bridge):
+    """Bridge with a synthesized inventory and traffic instead of a websocket."""
+
+    def __init__(
+        self,
+        lights: int = 100,
+        shades: int = 10,
+        rooms: int = 10,
+        latency: float = 0.0,
+        connect_delay: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the simulator.
+
+        Args:
+            lights: Number of dimmable lights
+            shades: Number of shades
+            rooms: Number of rooms with RC Touch and power metering
+            latency: Seconds each sent command takes before it is acknowledged
+            connect_delay: Seconds before the initial inventory is sent
+            seed: Seed for the synthesized traffic
+
+        """
+        super().__init__("simulator", "simulator", session=_NullSession())
+        self.latency = latency
+        self.connect_delay = connect_delay
+        self._random = random.Random(seed)
+        self.light_ids = list(range(1, lights + 1))
+        self.shade_ids = list(range(lights + 1, lights + shades + 1))
+        self.room_ids = list(range(1, rooms + 1))
+        self._dimm = dict.fromkeys(self.light_ids, 0)
+        self._switch = dict.fromkeys(self.light_ids, False)
+        self._power = dict.fromkeys(self.room_ids, 0.0)
+        self._names: dict[int, str] = {}
+
+    async def _connect(self) -> None:
+        self.connection = SimulatedConnection(self)
+        self.connection_subscription = self.connection.messages.subscribe(self._onMessage)
+
+    async def close(self) -> None:
+        """Stop the simulator."""
+        connection = self.connection
+        await super().close()
+        if isinstance(connection, SimulatedConnection):
+            await connection.close()
+
+    async def drop_connection(self) -> None:
+        """Drop the current connection, as when the bridge goes away."""
+        if isinstance(self.connection, SimulatedConnection):
+            await self.connection.close()
+
+    @property
+    def sent(self) -> list[tuple[Messages, dict[str, Any]]]:
+        """Return the messages sent to the bridge on the current connection."""
+        return self.connection.sent if self.connection is not None else []
+
+    def all_data(self) -> dict[str, Any]:
+        """Return the SET_ALL_DATA payload describing the inventory."""
+        devices = [
+            {
+                "deviceId": device_id,
+                "name": self._names.get(device_id, f"Light {device_id}"),
+                "devType": DEV_TYPE_LIGHT,
+                "compId": device_id,
+                "dimmable": True,
+                "switch": self._switch[device_id],
+                "dimmvalue": self._dimm[device_id],
+            }
+            for device_id in self.light_ids
+        ]
+        devices.extend(
+            {
+                "deviceId": device_id,
+                "name": f"Shade {device_id}",
+                "devType": DEV_TYPE_SHADE,
+                "compId": device_id,
+                "shRuntime": 1,
+                "shPos": 0,
+                "curstate": 0,
+                "shSafety": 0,
+            }
+            for device_id in self.shade_ids
+        )
+        comps = [
+            {"compId": device_id, "name": f"Actuator {device_id}", "compType": COMP_TYPE_SHADE_ACTUATOR}
+            for device_id in self.shade_ids
+        ]
+        rooms = [
+            {
+                "roomId": room_id,
+                "name": f"Room {room_id}",
+                "setpoint": 21.0,
+                "temp": 20.5,
+                "humidity": 40.0,
+                "power": self._power[room_id],
+                "currentMode": 3,
+                "state": 0,
+                "modes": [{"mode": 1, "value": 16.0}, {"mode": 2, "value": 18.0}, {"mode": 3, "value": 21.0}],
+            }
+            for room_id in self.room_ids
+        ]
+        return {"devices": devices, "comps": comps, "rooms": rooms, "lastItem": True}
+
+    def add_light(self) -> int:
+        """Add a light to the inventory, reported on the next connection."""
+        device_id = max(self.light_ids + self.shade_ids, default=0) + 1
+        self.light_ids.append(device_id)
+        self._dimm[device_id] = 0
+        self._switch[device_id] = False
+        return device_id
+
+    def rename(self, device_id: int, name: str) -> None:
+        """Rename a light, reported on the next connection."""
+        self._names[device_id] = name
+
+    def set_dimmvalue(self, device_id: int, value: int) -> None:
+        """Change a light without reporting it, e.g. while disconnected."""
+        self._dimm[device_id] = value
+        self._switch[device_id] = value > 0
+
+    def set_power(self, room_id: int, power: float) -> None:
+        """Change the power of a room without reporting it."""
+        self._power[room_id] = power
+
+    def random_item(self) -> dict[str, Any]:
+        """Return a random device or room state change."""
+        pick = self._random.random()
+        if pick < 0.8 or not (self.shade_ids or self.room_ids):
+            device_id = self._random.choice(self.light_ids)
+            value = self._random.randint(0, 99)
+            self.set_dimmvalue(device_id, value)
+            return {"deviceId": device_id, "switch": value > 0, "dimmvalue": value}
+        if pick < 0.9 and self.shade_ids:
+            return {"deviceId": self._random.choice(self.shade_ids), "shPos": self._random.randint(0, 100)}
+        room_id = self._random.choice(self.room_ids)
+        self.set_power(room_id, round(self._random.uniform(0, 2000), 1))
+        return {
+            "roomId": room_id,
+            "power": self._power[room_id],
+            "temp": round(self._random.uniform(18, 24), 1),
+        }
+
+    def emit_state_changes(self, count: int, items_per_message: int = 1) -> None:
+        """Deliver state changes as fast as possible, without yielding to the loop."""
+        for _ in range(0, count, items_per_message):
+            items = [self.random_item() for _ in range(items_per_message)]
+            self.connection.emit(Messages.SET_STATE_INFO, {"item": items})
+
+    async def run_traffic(self, rate: float, duration: float, items_per_message: int = 1) -> int:
+        """Deliver state change messages at the given rate per second.
+
+        Returns the number of messages sent.
+        """
+        loop = asyncio.get_running_loop()
+        interval = 1 / rate
+        started = loop.time()
+        sent = 0
+        while (elapsed := loop.time() - started) < duration:
+            due = int(elapsed * rate) + 1
+            while sent < due:
+                self.emit_state_changes(items_per_message, items_per_message)
+                sent += 1
+            await asyncio.sleep(interval)
+        return sent
+
+    def echo_item(self, message_type: Messages, payload: dict[str, Any]) -> dict[str, Any] | None:
+        """Return the state change the bridge reports after a command."""
+        if message_type == Messages.ACTION_SWITCH_DEVICE:
+            device_id = payload["deviceId"]
+            self._switch[device_id] = payload["switch"]
+            return {"deviceId": device_id, "switch": payload["switch"], "dimmvalue": self._dimm.get(device_id, 99)}
+        if message_type == Messages.ACTION_SLIDE_DEVICE:
+            device_id = payload["deviceId"]
+            self.set_dimmvalue(device_id, payload["dimmvalue"])
+            return {"deviceId": device_id, "switch": True, "dimmvalue": payload["dimmvalue"]}
+        if message_type == Messages.SET_DEVICE_SHADING_STATE:
+            state = payload["state"]
+            if state == ShadeOperationState.OPEN:
+                position = 0
+            elif state == ShadeOperationState.CLOSE:
+                position = 100
+            else:
+                position = payload.get("value")
+            return None if position is None else {"deviceId": payload["deviceId"], "shPos": position}
+        if message_type == Messages.SET_HEATING_STATE:
+            return {"roomId": payload["roomId"], "mode": payload["mode"], "setpoint": payload["setpoint"]}
+        return None
+
+
+class ReplayConnection:
+    """Stand-in for the bridge connection that replays captured messages."""
+
+    def __init__(self, bridge: ReplayBridge) -> None:
+        """Initialize the connection."""
+        self.bridge = bridge
+        self.messages = Subject()
+        self.sent: list[tuple[Messages, dict[str, Any]]] = []
+        self._closed = asyncio.Event()
+
+    async def pump(self) -> None:
+        """Deliver the captured messages, then stay connected until closed."""
+        bridge = self.bridge
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        bridge.started = time.perf_counter()
+        for seconds, message in bridge.capture:
+            if bridge.speed:
+                if (delay := started + seconds / bridge.speed - loop.time()) > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    bridge.lag.append(-delay)
+            elif bridge.delivered % bridge.yield_every == 0:
+                # Let the hub's consumer run, as socket reads would
+                await asyncio.sleep(0)
+            read = time.perf_counter()
+            self.messages.on_next(message)
+            bridge.read_times.append(time.perf_counter() - read)
+            bridge.delivered += 1
+        bridge.replayed.set()
+        await self._closed.wait()
+
+    async def send_message(self, message_type: Messages, payload: dict[str, Any]) -> None:
+        """Record a message sent to the bridge; the capture has the replies."""
+        self.sent.append((message_type, payload))
+
+    async def close(self) -> None:
+        """Disconnect."""
+        self._closed.set()
+
+
+class ReplayBridge(Bridge):
+    """Bridge whose single connection replays a capture."""
+
+    def __init__(
+        self, capture: Iterable[tuple[float, dict[str, Any]]], speed: float = 1.0, yield_every: int = 1
+    ) -> None:
+        """Initialize the replay.
+
+        Args:
+            capture: Messages with their time in seconds, see read_capture
+            speed: Replay speed relative to the capture, 0 for as fast as possible
+            yield_every: Messages delivered between yields to the loop at speed 0
+
+        """
+        super().__init__("replay", "replay", session=_NullSession())
+        self.capture = list(capture)
+        self.speed = speed
+        self.yield_every = max(1, yield_every)
+        self.delivered = 0
+        # perf_counter when the first message was delivered
+        self.started: float | None = None
+        # Seconds each message took to handle in the reader, and how late
+        # messages were delivered when the replay fell behind the capture
+        self.read_times: list[float] = []
+        self.lag: list[float] = []
+        self.replayed = asyncio.Event()
+
+    async def _connect(self) -> None:
+        self.connection = ReplayConnection(self)
+        self.connection_subscription = self.connection.messages.subscribe(self._onMessage)
+
+    async def close(self) -> None:
+        """Stop the replay."""
+        connection = self.connection
+        await super().close()
+        if isinstance(connection, ReplayConnection):
+            await connection.close()
@@ -6,6 +6,7 @@ import logging
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_IP_ADDRESS, Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.typing import ConfigType
 
 from .const import CONF_AUTH_KEY, CONF_IDENTIFIER, DOMAIN
@@ -41,16 +42,21 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _LOGGER.error("Missing required configuration: identifier, ip, or auth_key")
         return False
 
-    hub = XComfortHub(hass, identifier=identifier, ip=ip, auth_key=auth_key)
+    hub = XComfortHub(hass, identifier=identifier, ip=ip, auth_key=auth_key, entry=entry)
     _LOGGER.debug("Hub initialized with identifier: %s, ip: %s", identifier, ip)  # Log hub initialization
 
     hass.data[DOMAIN][entry.entry_id] = hub
 
+    # Create entities from the last known inventory while the bridge connects
+    await hub.async_restore_snapshot()
+    # Register the bridge before the platforms add the devices behind it
+    hub.async_register_bridge()
+
     try:
-        entry.async_create_background_task(hass, hub.bridge.run(), f"XComfort/{identifier}")
-        _LOGGER.debug("Background task for bridge.run() created")  # Log task creation
+        entry.async_create_background_task(hass, hub.run(), f"XComfort/{identifier}")
+        _LOGGER.debug("Background task for hub.run() created")  # Log task creation
     except Exception as e:
-        _LOGGER.error("Failed to create background task for bridge.run(): %s", e)
+        _LOGGER.error("Failed to create background task for hub.run(): %s", e)
         return False
 
     try:
@@ -63,19 +69,38 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     _LOGGER.debug("Platforms loaded: %s", PLATFORMS)  # Log platform loading
 
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
     return True
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+async def async_remove_config_entry_device(
+    hass: HomeAssistant, entry: ConfigEntry, device_entry: dr.DeviceEntry
+) -> bool:
+    """Let the user remove a device the bridge no longer reports."""
+    hub = XComfortHub.get_hub(hass, entry)
+    return hub.async_remove_missing_device(device_entry.identifiers)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Disconnect from bridge and remove loaded devices."""
     hub = XComfortHub.get_hub(hass, entry)
-    await hub.stop()
 
-    unload_ok = all(
-        await asyncio.gather(
-            *[hass.config_entries.async_forward_entry_unload(entry, platform) for platform in PLATFORMS]
+    # Entities are removed first, so they unsubscribe while the hub still runs
+    try:
+        unload_ok = all(
+            await asyncio.gather(
+                *[hass.config_entries.async_forward_entry_unload(entry, platform) for platform in PLATFORMS]
+            )
         )
-    )
+    finally:
+        # Nothing else owns the bridge connection, stop it even if a platform failed
+        await hub.stop()
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+    else:
+        _LOGGER.warning("Not every platform of %s unloaded, the bridge connection was stopped", entry.title)
 
     return unload_ok
\ No newline at end of file
@@ -1,17 +1,20 @@
 """Binary sensor platform for xComfort integration with Home Assistant."""
 import logging
 
-from xcomfort.devices import DoorSensor, DoorWindowSensor, WindowSensor
+from xcomfort.devices import DoorSensor, WindowSensor
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, Event
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .entity import XComfortEntity
 from .hub import XComfortHub
+from .index import BUCKET_DOOR_WINDOW_SENSORS
+from .states import ContactRecord
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,25 +31,25 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     """
     hub = XComfortHub.get_hub(hass, entry)
 
-    async def _wait_for_hub_then_setup():
-        """Wait for hub to complete initial load then set up binary sensors."""
-        await hub.has_done_initial_load.wait()
-
-        devices = hub.devices
+    @callback
+    def _add_sensors(devices):
+        """Add binary sensors for door/window sensor devices."""
         sensors = []
 
         # Create a generator expression and extend the list with it
-        sensors.extend(
-            XComfortDoorWindowSensor(hub, device)
-            for device in devices
-            if isinstance(device, DoorWindowSensor)
-        )
+        sensors.extend(XComfortDoorWindowSensor(hub, device) for device in devices)
 
         async_add_entities(sensors)
 
+    async def _wait_for_hub_then_setup():
+        """Wait for hub to complete initial load then set up binary sensors."""
+        await hub.has_done_initial_load.wait()
+
+        hub.async_setup_bucket(entry, BUCKET_DOOR_WINDOW_SENSORS, _add_sensors)
+
     entry.async_create_task(hass, _wait_for_hub_then_setup())
 
-class XComfortDoorWindowSensor(BinarySensorEntity):
+class XComfortDoorWindowSensor(XComfortEntity, BinarySensorEntity):
     """Representation of an xComfort door/window binary sensor."""
 
     def __init__(self, hub: XComfortHub, device: WindowSensor | DoorSensor) -> None:
@@ -63,36 +66,37 @@ class XComfortDoorWindowSensor(BinarySensorEntity):
         self.hub = hub
         self._device = device
         self._is_open = device.is_open if device.is_open is not None else False
-        self._expected_device_type = type(device).__name__
+        self._expected_device_type = hub.device_kind(device)
 
-        if isinstance(device, WindowSensor):
+        if self._expected_device_type == "WindowSensor":
             self._attr_device_class = BinarySensorDeviceClass.WINDOW
-        elif isinstance(device, DoorSensor):
+        elif self._expected_device_type == "DoorSensor":
             self._attr_device_class = BinarySensorDeviceClass.DOOR
 
     async def async_added_to_hass(self):
         """Run when entity is added to Home Assistant.
 
-        Sets up event listener for xcomfort_event.
+        Registers with the hub for state changes of this device.
 
         """
-        self.hass.bus.async_listen("xcomfort_event", self._handle_event)
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.hub.async_subscribe_state(self._expected_device_type, self._device.device_id, self._handle_state)
+        )
 
-    def _handle_event(self, event: Event):
-        """Handle xcomfort_event and update state if relevant.
+    @callback
+    def _handle_state(self, record: ContactRecord | None):
+        """Handle a state change of this device dispatched by the hub.
 
         Args:
-            event: The event data
+            record: The new state of the device, None if it was not a boolean
 
         """
-        if (event.data.get("device_id") == self._device.device_id and
-                event.data.get("device_type") == self._expected_device_type):
-            new_state = event.data.get("new_state")
-            if isinstance(new_state, bool):
-                self._is_open = new_state
-                self.schedule_update_ha_state()
-            else:
-                _LOGGER.warning(f"Received non-boolean state for {self._attr_name}: {new_state}")
+        if record is not None:
+            self._is_open = record.is_open
+            self.async_write_ha_state()
+        else:
+            _LOGGER.warning("Received non-boolean state for %s", self._attr_name)
 
     @property
     def is_on(self) -> bool | None:
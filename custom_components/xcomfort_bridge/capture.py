@@ -0,0 +1,162 @@
+"""Capture of raw bridge traffic for the xComfort Bridge integration.
+
+With the capture option on, the hub records every message the bridge sends
+(inventory replies, device and room state changes) with the time it
+arrived, so real traffic can be replayed offline against the hub, see
+benchmarks/bench_replay.py.
+
+A capture is a gzip compressed file of JSON lines. Each connection starts
+with a header line, an object such as ``{"capture": 1, "started": ...}``,
+followed by one ``[seconds, type_int, payload]`` array per message, where
+seconds count from the start of the connection. Lines are buffered and
+written in the executor, appending a gzip member per write.
+
+Once the file has grown to CAPTURE_MAX_BYTES it is moved to ``<path>.1``,
+replacing an earlier one, and recording continues in a new file that starts
+with the header of the current connection; a capture left on therefore
+takes at most twice that on disk.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterator
+import gzip
+import json
+import logging
+import os
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+import homeassistant.util.dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_FORMAT = 1
+# Lines buffered before they are written, and seconds they may wait at most
+CAPTURE_FLUSH_LINES = 500
+CAPTURE_FLUSH_INTERVAL = 5
+# Compressed size in bytes at which the capture file is rotated
+CAPTURE_MAX_BYTES = 20 * 1024 * 1024
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str) + "\n"
+
+
+class TrafficRecorder:
+    """Append the messages of bridge connections to a capture file."""
+
+    def __init__(self, hass: HomeAssistant, path: str) -> None:
+        """Initialize the recorder.
+
+        Args:
+            hass: Home Assistant instance
+            path: Capture file, appended to if it exists
+
+        """
+        self.hass = hass
+        self.path = path
+        self._started = 0.0
+        self._header = ""
+        self._buffer: list[str] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task | None = None
+        self.messages = 0
+        self.written = 0
+        self.rotations = 0
+
+    @callback
+    def async_start_connection(self) -> None:
+        """Mark the start of a connection; message times count from here."""
+        self._started = self.hass.loop.time()
+        self._header = _dumps({"capture": CAPTURE_FORMAT, "started": dt_util.utcnow().isoformat()})
+        self._buffer.append(self._header)
+
+    @callback
+    def async_record(self, message: dict[str, Any]) -> None:
+        """Record a message received from the bridge."""
+        self._buffer.append(
+            _dumps([round(self.hass.loop.time() - self._started, 4), message.get("type_int"), message.get("payload")])
+        )
+        self.messages += 1
+        if len(self._buffer) >= CAPTURE_FLUSH_LINES:
+            self._async_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_later(CAPTURE_FLUSH_INTERVAL, self._async_flush)
+
+    def tap(self, handler: Callable[[dict[str, Any]], None]) -> Callable[[dict[str, Any]], None]:
+        """Return a message handler that records each message, then passes it to handler.
+
+        Used in place of the bridge's own message handler, so messages are
+        recorded as decoded once for the bridge.
+        """
+        record = self.async_record
+
+        def _tapped(message: dict[str, Any]) -> None:
+            record(message)
+            handler(message)
+
+        return _tapped
+
+    @callback
+    def _async_flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        # One writer at a time keeps the lines in order
+        if self._task is None and self._buffer:
+            self._task = self.hass.async_create_background_task(self._async_write(), "xcomfort_bridge capture")
+
+    async def _async_write(self) -> None:
+        try:
+            while self._buffer:
+                lines, self._buffer = self._buffer, []
+                await self.hass.async_add_executor_job(self._write, lines)
+                self.written += len(lines)
+        except OSError as err:
+            _LOGGER.error("Failed to write bridge capture %s: %s", self.path, err)
+        finally:
+            self._task = None
+
+    def _write(self, lines: list[str]) -> None:
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            size = 0
+        if size >= CAPTURE_MAX_BYTES:
+            os.replace(self.path, f"{self.path}.1")
+            self.rotations += 1
+            # Message times in the new file count from the same connection start
+            if lines[0] != self._header:
+                lines = [self._header, *lines]
+        with gzip.open(self.path, "at", encoding="utf-8") as file:
+            file.writelines(lines)
+
+    async def async_close(self) -> None:
+        """Write every buffered line."""
+        self._async_flush()
+        if self._task is not None:
+            await self._task
+        _LOGGER.debug("Recorded %s bridge messages to %s", self.messages, self.path)
+
+
+def read_capture(path: str | os.PathLike) -> Iterator[tuple[float, dict[str, Any]]]:
+    """Yield the messages of a capture with their time in seconds.
+
+    Connections are joined back to back, so times keep increasing over the
+    whole capture. Messages are yielded in the shape the bridge connection
+    emits them.
+    """
+    offset = last = 0.0
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            entry = json.loads(line)
+            if isinstance(entry, dict):
+                if entry.get("capture") != CAPTURE_FORMAT:
+                    raise ValueError(f"Unsupported capture format in {path}: {entry}")
+                offset = last
+                continue
+            seconds, type_int, payload = entry
+            last = offset + seconds
+            yield last, {"type_int": type_int, "payload": payload}
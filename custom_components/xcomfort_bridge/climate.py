@@ -1,4 +1,5 @@
 """Climate platform for xComfort integration with Home Assistant."""
+from dataclasses import replace
 import logging
 
 from xcomfort.bridge import RctMode, RctState, Room
@@ -14,11 +15,15 @@ from homeassistant.components.climate.const import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfTemperature
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
+from .entity import XComfortEntity
 from .hub import XComfortHub
+from .index import BUCKET_RCT_ROOMS
+from .states import RoomRecord, room_record
 
 SUPPORT_FLAGS = ClimateEntityFeature.TARGET_TEMPERATURE | ClimateEntityFeature.PRESET_MODE
 
@@ -35,26 +40,26 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     """
     hub = XComfortHub.get_hub(hass, entry)
 
-    async def _wait_for_hub_then_setup():
-        await hub.has_done_initial_load.wait()
-
-        rooms = hub.rooms
-
-        _LOGGER.debug("Found %d xcomfort rooms", len(rooms))
+    @callback
+    def _add_rcts(rooms):
+        _LOGGER.debug("Found %d xcomfort rc touch rooms", len(rooms))
 
         rcts = []
         for room in rooms:
-            if room.state.value is not None:
-                if room.state.value.setpoint is not None:
-                    rct = HASSXComfortRcTouch(hass, hub, room)
-                    rcts.append(rct)
+            rct = HASSXComfortRcTouch(hass, hub, room)
+            rcts.append(rct)
 
         _LOGGER.debug("Added %d rc touch units", len(rcts))
         async_add_entities(rcts)
 
+    async def _wait_for_hub_then_setup():
+        await hub.has_done_initial_load.wait()
+
+        hub.async_setup_bucket(entry, BUCKET_RCT_ROOMS, _add_rcts)
+
     entry.async_create_task(hass, _wait_for_hub_then_setup())
 
-class HASSXComfortRcTouch(ClimateEntity):
+class HASSXComfortRcTouch(XComfortEntity, ClimateEntity):
     """Representation of an xComfort RC Touch climate device."""
 
     _attr_temperature_unit = UnitOfTemperature.CELSIUS
@@ -74,42 +79,55 @@ class HASSXComfortRcTouch(ClimateEntity):
         self.hub = hub
         self._room = room
         self._name = room.name
-        self._state = None
+        self._record: RoomRecord | None = None
 
         self.rctpreset = RctMode.Comfort
-        self.rctstate = RctState.Idle
+        # Last RC touch state the bridge reported, sent back with setpoints
+        self.rctstate: RctState | None = None
         self.temperature = 20.0
         self.currentsetpoint = 20.0
 
         self._unique_id = f"climate_{DOMAIN}_{hub.identifier}-{room.room_id}"
 
+    @property
+    def _source(self):
+        return self._room
+
     async def async_added_to_hass(self):
         """Run when entity about to be added to hass."""
         _LOGGER.debug("Added to hass %s", self._name)
-        if self._room.state is None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self.hub.async_subscribe_state("Room", self._room.room_id, self._state_change))
+        if self._room.state is None or self._room.state.value is None:
             _LOGGER.debug("State is null for %s", self._name)
         else:
-            self._room.state.subscribe(lambda state: self._state_change(state))
+            self._state_change(room_record(self._room.state.value))
 
-    def _state_change(self, state):
+    async def async_will_remove_from_hass(self):
+        """Run when entity is removed from hass."""
+        self.hub.async_cancel_write(self)
+
+    @callback
+    def _state_change(self, record: RoomRecord | None):
         """Handle state changes from the device.
 
         Args:
-            state: New state from the device
+            record: New state of the room
 
         """
-        self._state = state
+        self._record = record
 
-        if self._state is not None:
-            if "currentMode" in state.raw:
-                self.rctpreset = RctMode(state.raw["currentMode"])
-            if "mode" in state.raw:
-                self.rctpreset = RctMode(state.raw["mode"])
-            self.temperature = state.temperature
-            self.currentsetpoint = state.setpoint
+        if record is not None:
+            previous_preset = self.rctpreset
+            if record.mode is not None:
+                self.rctpreset = RctMode(record.mode)
+            if record.rctstate is not None:
+                self.rctstate = RctState(record.rctstate)
+            self.temperature = record.temperature
+            self.currentsetpoint = record.setpoint
 
-            _LOGGER.debug("State changed %s : %s", self._name, state)
-            self.schedule_update_ha_state()
+            _LOGGER.debug("State changed %s : %s", self._name, record)
+            self.hub.async_write_state(self, flush=self.rctpreset != previous_preset)
 
     async def async_set_preset_mode(self, preset_mode):
         """Set new preset mode.
@@ -127,9 +145,14 @@ class HASSXComfortRcTouch(ClimateEntity):
         if preset_mode == PRESET_COMFORT:
             mode = RctMode.Comfort
         if self.rctpreset != mode:
-            await self._room.set_mode(mode)
-            self.rctpreset = mode
-            self.schedule_update_ha_state()
+            await self.hub.async_send_optimistic(
+                ("Room", self._room.room_id),
+                lambda record: replace(record or RoomRecord(), mode=mode.value),
+                lambda: self._room.set_mode(mode),
+                key=("rct_mode", self._room.room_id),
+                context=self._context,
+                name="set_mode",
+            )
 
     async def async_set_temperature(self, **kwargs):
         """Set new target temperature.
@@ -140,6 +163,9 @@ class HASSXComfortRcTouch(ClimateEntity):
         """
         _LOGGER.debug("Set temperature %s", kwargs)
 
+        if self.rctstate is None:
+            raise HomeAssistantError(f"The state of {self._name} has not been reported by the bridge yet")
+
         # TODO: Move everything below into Room class in xcomfort-python library.
         # Latest implementation in the base library is broken, so everything moved here
         # To facilitate easier debugging inside HA.
@@ -154,29 +180,29 @@ class HASSXComfortRcTouch(ClimateEntity):
         payload = {
             "roomId": self._room.room_id,
             "mode": self.rctpreset.value,
-            "state": self._room.state.value.rctstate.value,
+            "state": self.rctstate.value,
             "setpoint": setpoint,
             "confirmed": False,
         }
-        await self._room.bridge.send_message(Messages.SET_HEATING_STATE, payload)
+        await self.hub.async_send_optimistic(
+            ("Room", self._room.room_id),
+            lambda record: replace(record or RoomRecord(), setpoint=setpoint),
+            lambda: self._room.bridge.send_message(Messages.SET_HEATING_STATE, payload),
+            key=("rct_setpoint", self._room.room_id),
+            context=self._context,
+            name="send_message",
+        )
         self._room.modesetpoints[self.rctpreset] = setpoint
-        self.currentsetpoint = setpoint
 
     @property
     def device_info(self):
         """Return device information about this entity."""
-        return {
-            "identifiers": {(DOMAIN, self.unique_id)},
-            "name": self._name,
-            "manufacturer": "Eaton",
-            "model": "RC Touch",
-            "via_device": self.hub.device_id,  # Changed from self.hub.hub_id
-        }
+        return self.hub.child_device_info(BUCKET_RCT_ROOMS, self._room)
 
     @property
     def name(self):
         """Return the display name of this climate entity."""
-        return self._name
+        return self._room.name
 
     @property
     def unique_id(self):
@@ -204,26 +230,30 @@ class HASSXComfortRcTouch(ClimateEntity):
     @property
     def current_humidity(self):
         """Return the current humidity."""
-        return int(self._state.humidity)
+        if self._record is None or self._record.humidity is None:
+            return None
+        return int(self._record.humidity)
 
     @property
     def hvac_action(self):
         """Return the current running HVAC action."""
-        if self._state.power > 0:
+        if self._record is None or self._record.power is None:
+            return HVACAction.IDLE
+        if self._record.power > 0:
             return HVACAction.HEATING
         return HVACAction.IDLE
 
     @property
     def max_temp(self):
         """Return the maximum temperature."""
-        if self._state is None:
+        if self._record is None:
             return 40.0
         return self._room.bridge.rctsetpointallowedvalues[self.rctpreset].Max
 
     @property
     def min_temp(self):
         """Return the minimum temperature."""
-        if self._state is None:
+        if self._record is None:
             return 5.0
         return self._room.bridge.rctsetpointallowedvalues[self.rctpreset].Min
 
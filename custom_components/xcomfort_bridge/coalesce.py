@@ -0,0 +1,96 @@
+"""Coalescing of entity state writes for the xComfort Bridge integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import Entity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StateWriteCoalescer:
+    """Merge bursts of state updates into one state write per entity per window.
+
+    The first update for an entity opens a window; updates arriving while the
+    window is open are merged into the pending write, which writes whatever the
+    entity state is when the window closes. Edge updates (e.g. on/off) flush
+    immediately.
+    """
+
+    def __init__(self, hass: HomeAssistant, window: float) -> None:
+        """Initialize the coalescer.
+
+        Args:
+            hass: Home Assistant instance
+            window: Coalescing window in seconds, 0 disables coalescing
+
+        """
+        self.hass = hass
+        self.window = window
+        self._pending: dict[Entity, asyncio.TimerHandle] = {}
+        self.writes = 0
+        self.merged = 0
+        self.dropped = 0
+
+    @callback
+    def async_schedule(self, entity: Entity, flush: bool = False) -> None:
+        """Schedule a state write for the entity.
+
+        Args:
+            entity: Entity whose state changed
+            flush: Write immediately, absorbing any pending write
+
+        """
+        if flush or self.window <= 0:
+            if (handle := self._pending.pop(entity, None)) is not None:
+                handle.cancel()
+                self.merged += 1
+            self._write(entity)
+            return
+
+        if entity in self._pending:
+            self.merged += 1
+            return
+
+        self._pending[entity] = self.hass.loop.call_later(self.window, self._flush, entity)
+
+    @callback
+    def async_cancel(self, entity: Entity) -> None:
+        """Drop a pending write, e.g. when the entity is removed."""
+        if (handle := self._pending.pop(entity, None)) is not None:
+            handle.cancel()
+            self.dropped += 1
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Drop all pending writes."""
+        for handle in self._pending.values():
+            handle.cancel()
+        self.dropped += len(self._pending)
+        self._pending.clear()
+        _LOGGER.debug(
+            "State write coalescer stopped: %s writes, %s merged, %s dropped",
+            self.writes,
+            self.merged,
+            self.dropped,
+        )
+
+    @property
+    def pending(self) -> int:
+        """Return the number of entities with a pending write."""
+        return len(self._pending)
+
+    @callback
+    def _flush(self, entity: Entity) -> None:
+        self._pending.pop(entity, None)
+        self._write(entity)
+
+    def _write(self, entity: Entity) -> None:
+        if entity.hass is None:
+            self.dropped += 1
+            return
+        self.writes += 1
+        entity.async_write_ha_state()
@@ -0,0 +1,247 @@
+"""Outgoing command handling for the xComfort Bridge integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+import logging
+from typing import Any
+
+from homeassistant.core import Context, HomeAssistant, callback
+
+from .metrics import HubMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+CommandSender = Callable[[], Awaitable[Any]]
+
+# Priority classes, most urgent first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_AUTOMATION = 1
+PRIORITY_BACKGROUND = 2
+
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_AUTOMATION, PRIORITY_BACKGROUND)
+
+
+def priority_for_context(context: Context | None) -> int:
+    """Return the priority class for a command issued in the given context.
+
+    Calls made by a user (e.g. from the UI) are interactive, calls made from
+    automations and scripts are automation, anything else is background.
+    """
+    if context is None:
+        return PRIORITY_BACKGROUND
+    if context.user_id is not None:
+        return PRIORITY_INTERACTIVE
+    return PRIORITY_AUTOMATION
+
+
+async def _run(send: CommandSender) -> Any:
+    """Run a command, so errors raised while creating it stay with that command."""
+    return await send()
+
+
+class _Command:
+    """A queued command and the futures of every caller waiting on it."""
+
+    __slots__ = ("futures", "key", "name", "priority", "queued_at", "send")
+
+    def __init__(
+        self,
+        send: CommandSender,
+        key: Hashable | None,
+        priority: int,
+        future: asyncio.Future,
+        name: str,
+        queued_at: float,
+    ) -> None:
+        self.send = send
+        self.key = key
+        self.priority = priority
+        self.futures = [future]
+        self.name = name
+        self.queued_at = queued_at
+
+
+class CommandScheduler:
+    """Rate limited, prioritized scheduler for commands sent to the bridge.
+
+    Commands submitted in the same event loop iteration are started together
+    without waiting for each other. A token bucket limits how many commands
+    per second reach the bridge; when it runs dry, queued commands are sent in
+    priority order as tokens refill. A queued command is replaced by a newer
+    one with the same key (last write wins), and the callers of both get the
+    result of the one actually sent.
+
+    Only one command per key is in flight at a time; newer commands for that
+    key wait in the queue, collapsing into one, until it completes. Dragging a
+    slider therefore sends the first value, at most one intermediate value
+    and the final value.
+
+    The round trip time of each command actually sent, and the time it
+    waited in the queue before, are recorded in the hub metrics.
+    """
+
+    def __init__(self, hass: HomeAssistant, rate: float, burst: int, metrics: HubMetrics | None = None) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            hass: Home Assistant instance
+            rate: Commands per second, 0 disables rate limiting
+            burst: Commands that may be sent at once after an idle period
+            metrics: Metrics the command timings are recorded in
+
+        """
+        self.hass = hass
+        self.metrics = metrics
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._refilled_at = hass.loop.time()
+        self._queues: tuple[deque[_Command], ...] = tuple(deque() for _ in PRIORITIES)
+        self._queued_by_key: dict[Hashable, _Command] = {}
+        self._in_flight: set[Hashable] = set()
+        self._wakeup: asyncio.Handle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.commands = 0
+        self.collapsed = 0
+        self.throttled = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of commands waiting to be sent."""
+        return sum(len(queue) for queue in self._queues)
+
+    @callback
+    def async_submit(
+        self,
+        send: CommandSender,
+        key: Hashable | None = None,
+        priority: int = PRIORITY_AUTOMATION,
+        name: str = "command",
+    ) -> asyncio.Future:
+        """Queue a command and return a future for its result.
+
+        Args:
+            send: Function returning the awaitable that sends the command
+            key: Commands with the same key supersede each other while queued
+            priority: Priority class of the command
+            name: Command name the round trip time is recorded under
+
+        """
+        future = self.hass.loop.create_future()
+
+        if key is not None and (queued := self._queued_by_key.get(key)) is not None:
+            queued.send = send
+            queued.name = name
+            queued.futures.append(future)
+            self.collapsed += 1
+            if priority < queued.priority:
+                self._queues[queued.priority].remove(queued)
+                queued.priority = priority
+                self._queues[priority].append(queued)
+            return future
+
+        command = _Command(send, key, priority, future, name, self.hass.loop.time())
+        self._queues[priority].append(command)
+        if key is not None:
+            self._queued_by_key[key] = command
+
+        if self._wakeup is None:
+            self._wakeup = self.hass.loop.call_soon(self._drain)
+        return future
+
+    def _refill(self) -> None:
+        now = self.hass.loop.time()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    @callback
+    def _drain(self) -> None:
+        self._wakeup = None
+        limited = self.rate > 0
+        if limited:
+            self._refill()
+
+        batch: list[_Command] = []
+        for queue in self._queues:
+            held: list[_Command] = []
+            while queue and (not limited or self._tokens >= 1):
+                command = queue.popleft()
+                if command.key is not None:
+                    if command.key in self._in_flight:
+                        # Wait for the command in flight, newer ones collapse into this one
+                        held.append(command)
+                        continue
+                    self._queued_by_key.pop(command.key, None)
+                    self._in_flight.add(command.key)
+                batch.append(command)
+                if limited:
+                    self._tokens -= 1
+            queue.extendleft(reversed(held))
+
+        if batch:
+            self.batches += 1
+            self.commands += len(batch)
+            task = self.hass.async_create_background_task(self._send_batch(batch), "xcomfort_bridge command batch")
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        # Commands held behind one in flight are sent when it completes
+        if any(command.key not in self._in_flight for queue in self._queues for command in queue):
+            self.throttled += 1
+            self._wakeup = self.hass.loop.call_later((1 - self._tokens) / self.rate, self._drain)
+
+    async def _send_batch(self, batch: list[_Command]) -> None:
+        _LOGGER.debug("Sending batch of %s commands", len(batch))
+        # Start every send before awaiting any of them
+        await asyncio.gather(*(self._send(command) for command in batch))
+
+    async def _send(self, command: _Command) -> None:
+        loop = self.hass.loop
+        started = loop.time()
+        try:
+            result = await _run(command.send)
+        except asyncio.CancelledError:
+            for future in command.futures:
+                future.cancel()
+            raise
+        except Exception as err:
+            self._record(command, started)
+            for future in command.futures:
+                if not future.done():
+                    future.set_exception(err)
+        else:
+            self._record(command, started)
+            for future in command.futures:
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            if command.key is not None:
+                self._in_flight.discard(command.key)
+                if command.key in self._queued_by_key and self._wakeup is None:
+                    self._wakeup = self.hass.loop.call_soon(self._drain)
+
+    def _record(self, command: _Command, started: float) -> None:
+        """Record the queue wait and round trip time of a command that was sent."""
+        if self.metrics is not None:
+            self.metrics.record_queue_wait(started - command.queued_at)
+            self.metrics.record_command(command.name, self.hass.loop.time() - started)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel queued commands and batches in flight."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        for queue in self._queues:
+            for command in queue:
+                for future in command.futures:
+                    future.cancel()
+            queue.clear()
+        self._queued_by_key.clear()
+        self._in_flight.clear()
+        for task in self._tasks:
+            task.cancel()
@@ -6,12 +6,36 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.core import callback
 # from homeassistant.components import dhcp <-- removed
 from homeassistant.helpers.service_info.dhcp import DhcpServiceInfo
 from homeassistant.const import CONF_IP_ADDRESS
 from homeassistant.helpers.device_registry import format_mac
 
-from .const import CONF_AUTH_KEY, CONF_IDENTIFIER, CONF_MAC, DOMAIN
+from .const import (
+    CONF_AUTH_KEY,
+    CONF_CAPTURE,
+    CONF_COALESCE_WINDOW,
+    CONF_COMMAND_RATE,
+    CONF_ENERGY_DEADBAND,
+    CONF_ENERGY_INTERVAL,
+    CONF_FIRE_EVENTS,
+    CONF_IDENTIFIER,
+    CONF_MAC,
+    CONF_POWER_DEADBAND,
+    CONF_POWER_MIN_INTERVAL,
+    CONF_POWER_RELATIVE_DEADBAND,
+    DEFAULT_CAPTURE,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_COMMAND_RATE,
+    DEFAULT_ENERGY_DEADBAND,
+    DEFAULT_ENERGY_INTERVAL,
+    DEFAULT_FIRE_EVENTS,
+    DEFAULT_POWER_DEADBAND,
+    DEFAULT_POWER_MIN_INTERVAL,
+    DEFAULT_POWER_RELATIVE_DEADBAND,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,6 +63,12 @@ class XComfortBridgeConfigFlow(config_entries.ConfigFlow):
         """Initialize the config flow."""
         self.data = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> config_entries.OptionsFlow:
+        """Return the options flow handler."""
+        return XComfortBridgeOptionsFlow()
+
 #    async def async_step_dhcp(self, discovery_info: dhcp.DhcpServiceInfo) -> config_entries.ConfigFlowResult:
     async def async_step_dhcp(self, discovery_info: DhcpServiceInfo) -> config_entries.ConfigFlowResult:
         """Handle dhcp discovery."""
@@ -107,3 +137,45 @@ class XComfortBridgeConfigFlow(config_entries.ConfigFlow):
     def title(self) -> str:
         """Return the title of the config entry."""
         return self.data.get(CONF_IDENTIFIER, self.data.get(CONF_MAC, self.data.get(CONF_IP_ADDRESS, "Untitled")))
+
+
+class XComfortBridgeOptionsFlow(config_entries.OptionsFlow):
+    """Handle runtime options for Eaton xComfort Bridge."""
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> config_entries.ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_FIRE_EVENTS, default=options.get(CONF_FIRE_EVENTS, DEFAULT_FIRE_EVENTS)
+                ): bool,
+                vol.Optional(
+                    CONF_COALESCE_WINDOW, default=options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
+                vol.Optional(
+                    CONF_COMMAND_RATE, default=options.get(CONF_COMMAND_RATE, DEFAULT_COMMAND_RATE)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+                vol.Optional(
+                    CONF_POWER_MIN_INTERVAL, default=options.get(CONF_POWER_MIN_INTERVAL, DEFAULT_POWER_MIN_INTERVAL)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                vol.Optional(
+                    CONF_POWER_DEADBAND, default=options.get(CONF_POWER_DEADBAND, DEFAULT_POWER_DEADBAND)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_POWER_RELATIVE_DEADBAND,
+                    default=options.get(CONF_POWER_RELATIVE_DEADBAND, DEFAULT_POWER_RELATIVE_DEADBAND),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+                vol.Optional(
+                    CONF_ENERGY_INTERVAL, default=options.get(CONF_ENERGY_INTERVAL, DEFAULT_ENERGY_INTERVAL)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                vol.Optional(
+                    CONF_ENERGY_DEADBAND, default=options.get(CONF_ENERGY_DEADBAND, DEFAULT_ENERGY_DEADBAND)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(CONF_CAPTURE, default=options.get(CONF_CAPTURE, DEFAULT_CAPTURE)): bool,
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema)
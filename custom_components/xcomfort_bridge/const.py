@@ -6,3 +6,45 @@ CONF_AUTH_KEY = "auth_key"
 CONF_IDENTIFIER = "identifier"
 CONF_DIMMING = "dimming"
 CONF_GATEWAYS = "gateways"
+CONF_FIRE_EVENTS = "fire_events"
+CONF_COALESCE_WINDOW = "coalesce_window"
+CONF_COMMAND_RATE = "command_rate"
+CONF_POWER_MIN_INTERVAL = "power_min_interval"
+CONF_POWER_DEADBAND = "power_deadband"
+CONF_POWER_RELATIVE_DEADBAND = "power_relative_deadband"
+CONF_ENERGY_INTERVAL = "energy_interval"
+CONF_ENERGY_DEADBAND = "energy_deadband"
+CONF_CAPTURE = "capture"
+
+DEFAULT_FIRE_EVENTS = False
+# Milliseconds
+DEFAULT_COALESCE_WINDOW = 100
+# Commands per second sent to the bridge, and how many may go out at once
+DEFAULT_COMMAND_RATE = 10
+DEFAULT_COMMAND_BURST = 10
+# Seconds before reconnecting to the bridge, doubling up to the maximum
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 60
+# Inventories from the bridge a device or room must be missing from in a row
+# before its entities are removed; until then they are unavailable
+INVENTORY_MISSING_LIMIT = 3
+# Seconds after a state change before the last known states are saved;
+# pending saves are also written when Home Assistant shuts down
+SNAPSHOT_SAVE_DELAY = 60
+# Seconds the bridge has to confirm a command before its optimistic state is
+# rolled back; service calls wait up to this long for the confirmation
+CONFIRM_TIMEOUT = 10
+# Bridge state updates queued before the reader handles them itself, and
+# updates handled per event loop iteration
+UPDATE_QUEUE_SIZE = 1000
+UPDATE_BATCH_SIZE = 100
+# Room power and energy publication: seconds, W, percent, seconds, kWh
+DEFAULT_POWER_MIN_INTERVAL = 10
+DEFAULT_POWER_DEADBAND = 0.0
+DEFAULT_POWER_RELATIVE_DEADBAND = 0.0
+DEFAULT_ENERGY_INTERVAL = 60
+DEFAULT_ENERGY_DEADBAND = 0.0
+# Record raw bridge messages to <config>/xcomfort_bridge.<entry id>.capture.jsonl.gz
+DEFAULT_CAPTURE = False
+
+EVENT_XCOMFORT = "xcomfort_event"
@@ -17,8 +17,12 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .commands import CommandSender
 from .const import DOMAIN
+from .entity import XComfortEntity
 from .hub import XComfortHub
+from .index import BUCKET_SHADES
+from .states import ShadeRecord, shade_record
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,20 +30,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     """Set up the xComfort Bridge covers from a config entry."""
     hub = XComfortHub.get_hub(hass, entry)
     
-    if hub is not None:
-        await hub.has_done_initial_load.wait()
-        
-        devices = hub.devices
-
+    @callback
+    def _add_shades(devices):
         shades = []
         for device in devices:
-            if isinstance(device, Shade):
-                shade = HASSXComfortShade(hass, hub, device)
-                shades.append(shade)
+            shade = HASSXComfortShade(hass, hub, device)
+            shades.append(shade)
 
         async_add_entities(shades)
 
-class HASSXComfortShade(CoverEntity):
+    async def _wait_for_hub_then_setup():
+        await hub.has_done_initial_load.wait()
+
+        hub.async_setup_bucket(entry, BUCKET_SHADES, _add_shades)
+
+    entry.async_create_task(hass, _wait_for_hub_then_setup())
+
+class HASSXComfortShade(XComfortEntity, CoverEntity):
     """Representation of an xComfort Bridge cover device."""
 
     def __init__(self, hass: HomeAssistant, hub: XComfortHub, device: Shade):
@@ -49,74 +56,49 @@ class HASSXComfortShade(CoverEntity):
 
         self._device = device
         self._name = device.name
-        # Set initial state from device, if available
-        self._state = device.state.value if device.state is not None else None
         self.device_id = device.device_id
         self._unique_id = f"shade_{DOMAIN}_{hub.identifier}-{device.device_id}"
-        self._device_subscription = None
-        self._event_subscription = None
-
-    @property
-    def device_class(self):
-        """Return the class of this device."""
-        return CoverDeviceClass.SHADE
+        self._attr_device_class = CoverDeviceClass.SHADE
+        self._attr_supported_features = CoverEntityFeature.OPEN | CoverEntityFeature.CLOSE | CoverEntityFeature.STOP
+        if device.supports_go_to:
+            self._attr_supported_features |= CoverEntityFeature.SET_POSITION
+        self._record: ShadeRecord | None = None
+        # Set initial state from device, if available
+        self._apply(shade_record(device.state.value) if device.state is not None else None)
 
     async def async_added_to_hass(self):
         """Run when entity about to be added to hass."""
-        def _on_device_state(new_state):
-            if new_state is not None:
-                self._state = new_state
-                self.async_write_ha_state()
-        self._device_subscription = self._device.state.subscribe(_on_device_state)
-
-        # Subscribe to xcomfort_event for this device
-        @callback
-        def handle_xcomfort_event(event):
-            event_data = event.data
-            if (event_data.get("device_id") == self.device_id and 
-                event_data.get("device_type") == "Shade" and 
-                event_data.get("action") == "state_change"):
-                new_state = event_data.get("new_state")
-                if new_state and isinstance(new_state, dict):
-                    self._state = new_state
-                    self.async_write_ha_state()
-
-        self._event_subscription = self.hass.bus.async_listen("xcomfort_event", handle_xcomfort_event)
+        await super().async_added_to_hass()
+        self.async_on_remove(self.hub.async_subscribe_state("Shade", self.device_id, self._on_device_state))
 
     async def async_will_remove_from_hass(self):
         """Run when entity is removed from hass."""
-        if self._device_subscription is not None:
-            self._device_subscription.dispose()
-            self._device_subscription = None
-        if self._event_subscription is not None:
-            self._event_subscription()
-            self._event_subscription = None
-
-    @property
-    def is_closed(self) -> bool | None:
-        """Return if the cover is closed or not."""
-        position = self.current_cover_position
-        if position is None:
-            return None
+        self.hub.async_cancel_write(self)
+
+    @callback
+    def _on_device_state(self, record: ShadeRecord | None):
+        """Handle a state change of this shade dispatched by the hub."""
+        if record is not None and record != self._record:
+            self._apply(record)
+            self.hub.async_write_state(self)
+
+    def _apply(self, record: ShadeRecord | None) -> None:
+        """Precompute the state attributes from a state record."""
+        self._record = record
+        position = record.cover_position if record is not None else None
+        self._attr_current_cover_position = position
         # In Home Assistant, position 0 means fully closed
-        return position == 0
+        self._attr_is_closed = None if position is None else position == 0
 
     @property
     def device_info(self):
         """Return device information about this entity."""
-        return {
-            "identifiers": {(DOMAIN, self.unique_id)},
-            "name": self.name,
-            "manufacturer": "Eaton",
-            "model": "XXX",
-            "sw_version": "Unknown",
-            "via_device": self.hub.device_id,
-        }
+        return self.hub.child_device_info(BUCKET_SHADES, self._device)
 
     @property
     def name(self):
         """Return the display name of this cover."""
-        return self._name
+        return self._device.name
 
     @property
     def unique_id(self):
@@ -128,51 +110,47 @@ class HASSXComfortShade(CoverEntity):
         """Return True if entity has to be polled for state."""
         return False
 
-    @property
-    def supported_features(self):
-        """Flag supported features."""
-        supported_features = CoverEntityFeature.OPEN | CoverEntityFeature.CLOSE | CoverEntityFeature.STOP
-        if self._device.supports_go_to:
-            supported_features |= CoverEntityFeature.SET_POSITION
-        return supported_features
-
     async def async_open_cover(self, **kwargs):
         """Open the cover."""
-        await self._device.move_up()
+        await self._async_move(ShadeRecord(0), self._device.move_up, "move_up")
 
     async def async_close_cover(self, **kwargs):
         """Close cover."""
-        await self._device.move_down()
+        await self._async_move(ShadeRecord(100), self._device.move_down, "move_down")
 
     async def async_stop_cover(self, **kwargs):
         """Stop the cover."""
-        await self._device.move_stop()
+        await self.hub.async_send_command(
+            self._device.move_stop, key=("shade", self.device_id), context=self._context, name="move_stop"
+        )
 
     def update(self):
         """Update the entity."""
         pass
 
-    @property
-    def current_cover_position(self) -> int | None:
-        """Return current position of cover.
-
-        None is unknown, 0 is closed, 100 is fully open.
-        """
-        if self._state is None:
-            return None
-        # Handle both dictionary (from events) and object (from device.state.value)
-        if isinstance(self._state, dict):
-            position = self._state.get("shPos")
-        else:
-            position = getattr(self._state, "position", None)
-        if position is None:
-            return None
-        # Invert for Home Assistant: xComfort 0 is open, 100 is closed; HA 0 is closed, 100 is open
-        return 100 - position
-
     async def async_set_cover_position(self, **kwargs) -> None:
         """Move the cover to a specific position."""
         if (position := kwargs.get(ATTR_POSITION)) is not None:
             # Invert for xComfort: HA 0 is closed (xComfort 100), HA 100 is open (xComfort 0)
             xcomfort_position = 100 - position
-            await self._device.move_to_position(xcomfort_position)
\ No newline at end of file
+            await self._async_move(
+                ShadeRecord(xcomfort_position),
+                lambda: self._device.move_to_position(xcomfort_position),
+                "move_to_position",
+            )
+
+    async def _async_move(self, target: ShadeRecord, send: CommandSender, name: str) -> None:
+        """Move the shade, showing the target position until the bridge reports on the shade.
+
+        A shade takes longer to move than the bridge takes to confirm a
+        command, so any state reported for it confirms the command.
+        """
+        await self.hub.async_send_optimistic(
+            ("Shade", self.device_id),
+            lambda record: target,
+            send,
+            key=("shade", self.device_id),
+            context=self._context,
+            name=name,
+            confirm=lambda record: True,
+        )
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""Diagnostics support for the xComfort Bridge integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .hub import XComfortHub
+from .index import BUCKETS
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return runtime metrics of the bridge connection.
+
+    The entry data holds the bridge auth key and is left out.
+    """
+    hub = XComfortHub.get_hub(hass, entry)
+    commands = hub.commands
+    coalescer = hub.write_coalescer
+    updates = hub.updates
+    return {
+        "options": dict(entry.options),
+        "inventory": {
+            "devices": len(hub.devices),
+            "rooms": len(hub.rooms),
+            "buckets": {bucket: len(hub.index[bucket]) for bucket in BUCKETS},
+        },
+        "load_timings": hub.load_timings,
+        "subscriptions": hub.subscription_count,
+        "metrics": hub.metrics.as_dict(),
+        "command_scheduler": {
+            "queue_depth": commands.queue_depth,
+            "batches": commands.batches,
+            "commands": commands.commands,
+            "collapsed": commands.collapsed,
+            "throttled": commands.throttled,
+        },
+        "optimistic": {
+            "pending": len(hub.optimistic.pending),
+            "confirmed": hub.optimistic.confirmed,
+            "rolled_back": hub.optimistic.rolled_back,
+            "superseded": hub.optimistic.superseded,
+        },
+        "state_updates": {
+            "depth": updates.depth,
+            "max_depth": updates.max_depth,
+            "enqueued": updates.enqueued,
+            "batches": updates.batches,
+            "overflows": updates.overflows,
+        },
+        "capture": (
+            {"messages": hub.recorder.messages, "written": hub.recorder.written, "rotations": hub.recorder.rotations}
+            if hub.recorder is not None
+            else None
+        ),
+        "state_writes": {
+            "writes": coalescer.writes,
+            "merged": coalescer.merged,
+            "dropped": coalescer.dropped,
+            "pending": coalescer.pending,
+        },
+    }
@@ -0,0 +1,60 @@
+"""Energy integration for the xComfort Bridge room sensors."""
+
+from __future__ import annotations
+
+import time
+
+# Watt seconds per kilowatt hour
+WS_PER_KWH = 3600 * 1000
+
+
+class EnergyIntegrator:
+    """Integrate power samples into energy.
+
+    Samples are timestamped with a monotonic clock at sub-second resolution.
+    Power is assumed to hold at each sample until the next one arrives, so
+    the energy between two samples is the earlier power times the time
+    between them. The energy since the last sample is pending until the next
+    one; energy() includes it without changing any state, so the total does
+    not depend on when or how often it is read.
+    """
+
+    def __init__(self, total: float = 0.0, clock=time.monotonic) -> None:
+        """Initialize the integrator.
+
+        Args:
+            total: Energy already accumulated, in kWh
+            clock: Monotonic clock returning seconds
+
+        """
+        self.total = total
+        self._clock = clock
+        self._power: float | None = None
+        self._sampled_at: float | None = None
+
+    @property
+    def power(self) -> float | None:
+        """Return the last power sample in W, if any."""
+        return self._power
+
+    def _pending(self, now: float) -> float:
+        """Return the energy in kWh since the last sample."""
+        if self._power is None:
+            return 0.0
+        return self._power * (now - self._sampled_at) / WS_PER_KWH
+
+    def add_sample(self, power: float | None) -> float:
+        """Integrate up to a new power sample in W and return the total in kWh.
+
+        A None sample means power is unknown; nothing is integrated until the
+        next known sample.
+        """
+        now = self._clock()
+        self.total += self._pending(now)
+        self._power = power
+        self._sampled_at = now
+        return self.total
+
+    def energy(self) -> float:
+        """Return the total in kWh including the energy since the last sample."""
+        return self.total + self._pending(self._clock())
@@ -0,0 +1,64 @@
+"""Base entity of the xComfort Bridge integration."""
+
+from __future__ import annotations
+
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity
+
+from .hub import XComfortHub
+
+
+class XComfortEntity(Entity):
+    """Entity of a device or room behind the bridge.
+
+    Unavailable while the bridge connection is down or the bridge no longer
+    reports the device or room, renamed when it is renamed and removed once
+    it has been missing for INVENTORY_MISSING_LIMIT inventories in a row.
+    Mixed in before the platform entity class, e.g.
+    ``class Light(XComfortEntity, LightEntity)``; subclasses set ``self.hub``
+    and ``self._device`` (or override _source) and call
+    super().async_added_to_hass().
+    """
+
+    hub: XComfortHub
+    _state_key: tuple | None = None
+
+    @property
+    def _source(self):
+        """Return the device or room this entity represents."""
+        return self._device
+
+    @property
+    def available(self) -> bool:
+        """Return True while the bridge is connected and reports the device or room."""
+        return self.hub.available and self._state_key not in self.hub.missing
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the availability of the bridge and changes to the inventory."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, self.hub.signal_availability, self._on_availability_changed)
+        )
+        self._state_key = key = self.hub.state_key(self._source)
+        if key is not None:
+            self.async_on_remove(
+                async_dispatcher_connect(self.hass, self.hub.signal_inventory(key), self._on_inventory_changed)
+            )
+
+    @callback
+    def _on_availability_changed(self) -> None:
+        self.async_write_ha_state()
+
+    @callback
+    def _on_inventory_changed(self, name: str | None) -> None:
+        if name is not None:
+            # Also sent when the device or room goes missing or comes back
+            self._attr_name = name
+            self.async_write_ha_state()
+        elif self.registry_entry is not None:
+            # Removing the registry entry removes the entity as well
+            er.async_get(self.hass).async_remove(self.entity_id)
+        else:
+            self.hass.async_create_task(self.async_remove(force_remove=True))
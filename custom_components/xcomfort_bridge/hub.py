@@ -3,25 +3,96 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Callable, Hashable
+from itertools import chain
 import logging
+import time
+from typing import Any
 
-from xcomfort.bridge import Bridge
+from xcomfort.bridge import Bridge, State
+from xcomfort.devices import DoorSensor, DoorWindowSensor, Light, Shade, Switch, WindowSensor
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, Context, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN
+from .capture import TrafficRecorder
+from .coalesce import StateWriteCoalescer
+from .commands import CommandScheduler, CommandSender, priority_for_context
+from .const import (
+    CONF_CAPTURE,
+    CONF_COALESCE_WINDOW,
+    CONF_COMMAND_RATE,
+    CONF_FIRE_EVENTS,
+    CONFIRM_TIMEOUT,
+    DEFAULT_CAPTURE,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_COMMAND_BURST,
+    DEFAULT_COMMAND_RATE,
+    DEFAULT_FIRE_EVENTS,
+    DOMAIN,
+    EVENT_XCOMFORT,
+    INVENTORY_MISSING_LIMIT,
+    RECONNECT_MAX_DELAY,
+    RECONNECT_MIN_DELAY,
+    SNAPSHOT_SAVE_DELAY,
+    UPDATE_BATCH_SIZE,
+    UPDATE_QUEUE_SIZE,
+)
+from .index import BUCKET_LIGHTS, BUCKET_RCT_ROOMS, BUCKET_SHADES, BUCKET_SWITCHES, DeviceIndex
+from .metrics import HubMetrics
+from .observable import adopt_state
+from .optimistic import OptimisticUpdates
+from .snapshot import (
+    STORAGE_VERSION,
+    CachedDevice,
+    CachedRoom,
+    device_to_dict,
+    room_to_dict,
+)
+from .states import decode_state, state_decoder
+from .updates import StateUpdateQueue
 
 _LOGGER = logging.getLogger(__name__)
 
+# Device classes the platforms create entities for, most specific first.
+DEVICE_KINDS = (Light, Switch, Shade, WindowSensor, DoorSensor, DoorWindowSensor)
+
+# Index buckets whose members get a device registry entry, with the prefix of
+# their identifier (that of the entity's unique id) and their model. Switches
+# are identified by their bare device id.
+CHILD_DEVICES = {
+    BUCKET_LIGHTS: ("light", "XXX"),
+    BUCKET_SHADES: ("shade", "XXX"),
+    BUCKET_SWITCHES: (None, "Smartstikk"),
+    BUCKET_RCT_ROOMS: ("climate", "RC Touch"),
+}
+
 """Wrapper class over bridge library to emulate hub."""
 
 class XComfortHub:
     """Hub wrapper for xComfort bridge communication."""
 
-    def __init__(self, hass: HomeAssistant, identifier: str, ip: str, auth_key: str):
-        """Initialize underlying bridge."""
-        bridge = Bridge(ip, auth_key)
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        identifier: str,
+        ip: str,
+        auth_key: str,
+        entry: ConfigEntry | None = None,
+        bridge: Bridge | None = None,
+    ):
+        """Initialize underlying bridge.
+
+        A bridge object may be passed in to run the hub against something other
+        than a real bridge, e.g. the benchmark simulator.
+        """
+        if bridge is None:
+            bridge = Bridge(ip, auth_key)
         self.hass = hass
         self.bridge = bridge
         self.identifier = identifier
@@ -29,13 +100,203 @@ class XComfortHub:
             self.identifier = ip
         self._id = ip
         self.devices = []
+        self.rooms = []
         self._loop = asyncio.get_event_loop()
         self.has_done_initial_load = asyncio.Event()
-        self.device_id = None  # Initialize device_id to None
+        # Identifier of the bridge device, the via_device of all child
+        # devices; set once the bridge is in the device registry
+        self.device_id: tuple[str, str] | None = None
+        self._device_infos: dict[tuple[str, Any], DeviceInfo] = {}
+        self.config_entry = entry
+        options = entry.options if entry is not None else {}
+        self.fire_events = options.get(CONF_FIRE_EVENTS, DEFAULT_FIRE_EVENTS)
+        # State listeners keyed by (device_type, device_id), so delivering a
+        # state change only touches the entities of that one device. The
+        # tuples are replaced rather than mutated, so dispatch needs no copy.
+        self._listeners: dict[tuple[str, Any], tuple[Callable[[Any], None], ...]] = {}
+        # The one state subscription per device or room, and the device or
+        # room itself, by dispatch key
+        self._subscriptions: dict[tuple[str, Any], Any] = {}
+        self._sources: dict[tuple[str, Any], Any] = {}
+        # States emitted by the bridge, handled outside its websocket reader
+        self.updates = StateUpdateQueue(hass, self._fire_event, UPDATE_QUEUE_SIZE, UPDATE_BATCH_SIZE)
+        self.write_coalescer = StateWriteCoalescer(
+            hass, options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW) / 1000
+        )
+        self._instance_key = entry.entry_id if entry is not None else self.identifier
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{self._instance_key}.inventory")
+        # Records the raw bridge traffic when the capture option is on
+        self.recorder: TrafficRecorder | None = None
+        if options.get(CONF_CAPTURE, DEFAULT_CAPTURE):
+            self.recorder = TrafficRecorder(hass, hass.config.path(f"{DOMAIN}.{self._instance_key}.capture.jsonl.gz"))
+        self._has_live_inventory = False
+        # True while a save of the last known states is scheduled
+        self._snapshot_save_pending = False
+        # Inventories in a row each device or room kept from an earlier one
+        # has been missing from, by dispatch key; their entities are unavailable
+        self.missing: dict[tuple[str, Any], int] = {}
+        self.load_timings: dict[str, float] = {}
+        self.index = DeviceIndex(self.device_kind)
+        self.metrics = HubMetrics()
+        self.commands = CommandScheduler(
+            hass, options.get(CONF_COMMAND_RATE, DEFAULT_COMMAND_RATE), DEFAULT_COMMAND_BURST, self.metrics
+        )
+        self.optimistic = OptimisticUpdates(hass, self._dispatch, self._reported_state, CONFIRM_TIMEOUT)
+        # False while the bridge connection is down
+        self.available = True
+        # Last known state of every device and room while resyncing after a
+        # reconnect, see _async_begin_resync
+        self._resync_states: dict[tuple[str, Any], Any] | None = None
+        self._resync_task: asyncio.Task | None = None
+        self._resync_unchanged = 0
+
+    @property
+    def subscription_count(self) -> int:
+        """Return the number of device subscriptions and entity listeners."""
+        return len(self._subscriptions) + sum(len(listeners) for listeners in self._listeners.values())
+
+    @property
+    def signal_availability(self) -> str:
+        """Return the dispatcher signal sent when the bridge connection goes down or up."""
+        return f"{DOMAIN}_{self._instance_key}_availability"
+
+    def signal_inventory(self, key: tuple[str, Any]) -> str:
+        """Return the dispatcher signal sent when a device or room is renamed or removed.
+
+        The signal carries the new name, or None if the device or room is gone.
+        """
+        return f"{DOMAIN}_{self._instance_key}_inventory_{key[0]}_{key[1]}"
+
+    @property
+    def signal_index_added(self) -> str:
+        """Return the dispatcher signal sent with index additions after initial load."""
+        return f"{DOMAIN}_{self._instance_key}_index_added"
+
+    @callback
+    def async_setup_bucket(
+        self, entry: ConfigEntry, bucket: str, add: Callable[[list], None]
+    ) -> None:
+        """Call add with the members of an index bucket, and later with additions to it.
+
+        Must be called once the initial load is done.
+        """
+
+        @callback
+        def _on_index_added(added: dict[str, list]) -> None:
+            if members := added.get(bucket):
+                add(members)
+
+        entry.async_on_unload(async_dispatcher_connect(self.hass, self.signal_index_added, _on_index_added))
+        add(self.index[bucket])
+
+    @staticmethod
+    def device_kind(device) -> str | None:
+        """Return the kind of a live or cached device, e.g. "Light", or None if unsupported."""
+        if isinstance(device, CachedDevice):
+            return device.kind
+        for device_class in DEVICE_KINDS:
+            if isinstance(device, device_class):
+                return device_class.__name__
+        return None
 
     def start(self):
         """Start the event loop running the bridge."""
-        self.hass.async_create_task(self.bridge.run())
+        self.hass.async_create_task(self.run())
+
+    async def run(self):
+        """Run the bridge connection until stopped, reconnecting when it drops.
+
+        Does what Bridge.run does, but retries with exponential backoff and
+        counts connections and errors in the hub metrics. While disconnected,
+        entities are unavailable; after a reconnect the state the bridge sends
+        is resynced into the existing entities.
+        """
+        bridge = self.bridge
+        if bridge.state != State.Uninitialized:
+            raise RuntimeError("Run can only be called once at a time")
+
+        loop = asyncio.get_running_loop()
+        delay = RECONNECT_MIN_DELAY
+        bridge.state = State.Initializing
+        while bridge.state != State.Closing:
+            connected_at = None
+            try:
+                await bridge._connect()
+                connected_at = loop.time()
+                if self.recorder is not None:
+                    self.recorder.async_start_connection()
+                    # Every subscription to the messages runs the decoding
+                    # pipeline, so record on the bridge's own one
+                    bridge.connection_subscription.dispose()
+                    bridge.connection_subscription = bridge.connection.messages.subscribe(
+                        self.recorder.tap(bridge._onMessage)
+                    )
+                self.metrics.connections += 1
+                if not self.available:
+                    self._async_begin_resync()
+                await bridge.connection.pump()
+            except Exception as err:
+                self.metrics.connection_errors += 1
+                _LOGGER.warning("Connection to xComfort bridge %s failed: %r", self.hub_id, err)
+
+            if bridge.connection_subscription is not None:
+                bridge.connection_subscription.dispose()
+            if bridge.state == State.Closing:
+                break
+
+            self._async_set_available(False)
+            if connected_at is not None and loop.time() - connected_at > RECONNECT_MAX_DELAY:
+                # The connection was up for a while, start backing off afresh
+                delay = RECONNECT_MIN_DELAY
+            _LOGGER.info("Reconnecting to xComfort bridge %s in %s s", self.hub_id, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+            if bridge.state != State.Closing:
+                # The bridge sends its full state again, wait for it
+                bridge.state = State.Initializing
+
+        bridge.state = State.Uninitialized
+
+    @callback
+    def _async_set_available(self, available: bool) -> None:
+        if available != self.available:
+            self.available = available
+            async_dispatcher_send(self.hass, self.signal_availability)
+
+    @callback
+    def _async_begin_resync(self) -> None:
+        """Resync entity state from the full state the bridge sends after a reconnect.
+
+        The existing devices, rooms and entities are kept. Until the bridge has
+        sent its state, only states that differ from the last known ones are
+        dispatched, then the entities become available again.
+        """
+        if self._resync_task is not None:
+            return
+        self._resync_unchanged = 0
+        self._resync_states = {
+            key: decode_state(key[0], source.state.value)
+            for source in chain(self.devices, self.rooms)
+            if (key := self.state_key(source)) is not None
+        }
+        self._resync_task = self.hass.async_create_background_task(
+            self._async_finish_resync(), "xcomfort_bridge resync"
+        )
+
+    async def _async_finish_resync(self) -> None:
+        try:
+            await self.bridge.wait_for_initialization()
+        finally:
+            self._resync_states = None
+            self._resync_task = None
+        if self.bridge.state == State.Closing:
+            return
+        _LOGGER.info(
+            "Resynced xComfort bridge %s, %s unchanged states skipped", self.hub_id, self._resync_unchanged
+        )
+        self._async_set_available(True)
+        # The bridge has reported its whole inventory again
+        await self.async_refresh_inventory()
 
     async def stop(self):
         """Stop the bridge event loop.
@@ -43,69 +304,550 @@ class XComfortHub:
         Will also shut down websocket, if open.
         """
         self.has_done_initial_load.clear()
+        if self._resync_task is not None:
+            self._resync_task.cancel()
+        self.write_coalescer.async_shutdown()
+        self.commands.async_shutdown()
+        self.optimistic.async_shutdown()
+        if self._has_live_inventory:
+            # Persist the last known states for the next startup
+            await self._store.async_save(self._snapshot_data())
+        self._dispose_subscriptions()
+        self.updates.async_shutdown()
         await self.bridge.close()
+        if self.recorder is not None:
+            await self.recorder.async_close()
 
-    async def load_devices(self):
-        """Load devices and rooms from bridge and subscribe to their state changes."""
-        devs = await self.bridge.get_devices()
-        self.devices = devs.values()
+    def _dispose_subscriptions(self) -> None:
+        """Drop every subscription and listener the hub holds.
 
-        _LOGGER.info("loaded %s devices", len(self.devices))
+        Entities remove their listeners when they are removed, which happens
+        before the hub is stopped; any listener left is a leak and reported.
+        """
+        for subscription in self._subscriptions.values():
+            subscription.dispose()
+        self._subscriptions.clear()
+        self._sources.clear()
+        for source in chain(self.devices, self.rooms):
+            if isinstance(source, CachedDevice | CachedRoom):
+                source.unbind()
+        if leaked := sum(len(listeners) for listeners in self._listeners.values()):
+            _LOGGER.warning("%s state listeners of %s were not removed", leaked, self.hub_id)
+        self._listeners.clear()
+
+    async def async_restore_snapshot(self) -> None:
+        """Restore the device and room inventory saved by a previous run.
 
-        # Subscribe to state changes for all devices
-        for device in self.devices:
-            if hasattr(device, 'state') and hasattr(device.state, 'subscribe'):
-                device.state.subscribe(lambda state, dev=device: self._fire_event(dev, state))
+        Lets platforms create entities before the bridge has answered; the
+        cached devices and rooms are bound to the live ones by load_devices.
+        """
+        data = await self._store.async_load()
+        if not data:
+            return
 
-        rooms = await self.bridge.get_rooms()
-        self.rooms = rooms.values()
+        self.devices = [CachedDevice.from_dict(device) for device in data.get("devices", [])]
+        self.rooms = [CachedRoom.from_dict(self.bridge, room) for room in data.get("rooms", [])]
+        self.missing = {(kind, source_id): count for kind, source_id, count in data.get("missing", [])}
 
-        _LOGGER.info("loaded %s rooms", len(self.rooms))
+        self.index.add(self.devices, self.rooms)
+        for source in chain(self.devices, self.rooms):
+            self._subscribe_source(source)
 
-        # Subscribe to state changes for all rooms
-        for room in self.rooms:
-            if hasattr(room, 'state') and hasattr(room.state, 'subscribe'):
-                room.state.subscribe(lambda state, rm=room: self._fire_event(rm, state))
+        _LOGGER.info("restored %s devices and %s rooms from snapshot", len(self.devices), len(self.rooms))
 
         self.has_done_initial_load.set()
 
-    def _fire_event(self, entity, state):
-        """Fire a simplified xcomfort_event with serializable data for devices and rooms, ignoring BridgeDevice."""
-        entity_id = getattr(entity, "device_id", None)
-        entity_type = type(entity).__name__
-        entity_name = getattr(entity, "name", "")
+    async def load_devices(self):
+        """Load devices and rooms from bridge and subscribe to their state changes.
 
-        if hasattr(entity, 'device_id'):
-            # Ignore all events for BridgeDevice type
-            if entity_type == "BridgeDevice":
-                _LOGGER.debug(f"Skipping event for BridgeDevice (device_id: {entity_id})")
-                return
-        elif hasattr(entity, 'room_id'):
-            entity_id = entity.room_id
-            entity_type = "Room"
+        After the initial load this refreshes the inventory instead: new
+        devices and rooms are announced to the platforms and renamed ones to
+        their entities, so only the entities affected by a change are touched.
+        Devices and rooms the bridge no longer reports are kept, with their
+        entities unavailable, until they have been missing from
+        INVENTORY_MISSING_LIMIT inventories in a row; then they are removed.
+        """
+        started = time.monotonic()
+        # Devices and rooms are independent, fetch them concurrently
+        devs, rooms = await asyncio.gather(self.bridge.get_devices(), self.bridge.get_rooms())
+        fetched = time.monotonic()
+
+        renamed = []
+        device_list, new_devices, stale_devices = self._reconcile(self.devices, devs.values(), "device_id", renamed)
+        room_list, new_rooms, stale_rooms = self._reconcile(self.rooms, rooms.values(), "room_id", renamed)
+        renamed.extend(source for source in chain(device_list, room_list) if self._refresh_name(source))
+        # Devices and rooms reported again become available again
+        availability = []
+        for source in chain(device_list, room_list):
+            if (key := self.state_key(source)) in self.missing:
+                del self.missing[key]
+                availability.append(source)
+        gone = []
+        for inventory, stale_sources in ((device_list, stale_devices), (room_list, stale_rooms)):
+            for stale in stale_sources:
+                key = self.state_key(stale)
+                absent = self.missing.get(key, 0) + 1
+                if key is None or absent >= INVENTORY_MISSING_LIMIT:
+                    gone.append(stale)
+                    continue
+                # Kept with its entities unavailable, the bridge may report it again
+                inventory.append(stale)
+                self.missing[key] = absent
+                if absent == 1:
+                    availability.append(stale)
+        self.devices, self.rooms = device_list, room_list
+        self._async_remove_sources(gone)
+        self._async_rename_devices(renamed)
+        for source in chain(renamed, availability):
+            if (key := self.state_key(source)) is not None:
+                async_dispatcher_send(self.hass, self.signal_inventory(key), source.name)
+        added = self.index.add(new_devices, new_rooms)
+        reconciled = time.monotonic()
+
+        # Cached objects bound above keep their subscription and forward the
+        # live state into it, so only the new objects are subscribed here
+        for source in chain(new_devices, new_rooms):
+            if hasattr(source, 'state') and hasattr(source.state, 'subscribe'):
+                self._subscribe_source(source)
+        subscribed = time.monotonic()
+
+        self.load_timings = {
+            "fetch": fetched - started,
+            "reconcile": reconciled - fetched,
+            "subscribe": subscribed - reconciled,
+            "total": subscribed - started,
+        }
+        initial = not self._has_live_inventory
+        changed = bool(new_devices or new_rooms or stale_devices or stale_rooms or renamed or availability)
+        _LOGGER.log(
+            logging.INFO if initial or changed else logging.DEBUG,
+            "loaded %s devices and %s rooms in %.3fs (fetch %.3fs, reconcile %.3fs, subscribe %.3fs), "
+            "%s added, %s missing, %s removed, %s renamed",
+            len(self.devices),
+            len(self.rooms),
+            self.load_timings["total"],
+            self.load_timings["fetch"],
+            self.load_timings["reconcile"],
+            self.load_timings["subscribe"],
+            len(new_devices) + len(new_rooms),
+            len(self.missing),
+            len(gone),
+            len(renamed),
+        )
+
+        self._has_live_inventory = True
+        if self.has_done_initial_load.is_set():
+            # Entities were created from the snapshot, only announce the additions
+            if added:
+                async_dispatcher_send(self.hass, self.signal_index_added, added)
         else:
-            _LOGGER.error("Entity has neither device_id nor room_id")
+            self.has_done_initial_load.set()
+
+        if initial or changed:
+            await self._store.async_save(self._snapshot_data())
+
+    async def async_refresh_inventory(self) -> None:
+        """Diff the bridge inventory against the hub's, while connected.
+
+        The bridge only reports its inventory when connecting, so this is done
+        after every reconnect.
+        """
+        if self.available and self._has_live_inventory and self.bridge.state == State.Ready:
+            await self.load_devices()
+
+    @callback
+    def _async_remove_sources(self, sources: list) -> None:
+        """Drop devices and rooms from the inventory and remove their entities."""
+        if not sources:
+            return
+        removed = {id(source) for source in sources}
+        self.devices = [device for device in self.devices if id(device) not in removed]
+        self.rooms = [room for room in self.rooms if id(room) not in removed]
+        for source in sources:
+            _LOGGER.info("Removing %s", source)
+            for bucket in self.index.buckets_of(source):
+                self._device_infos.pop((bucket, self._source_id(source)), None)
+            self.index.remove(source)
+            self._unsubscribe_source(source)
+            if (key := self.state_key(source)) is not None:
+                self.missing.pop(key, None)
+                async_dispatcher_send(self.hass, self.signal_inventory(key), None)
+
+    @callback
+    def async_remove_missing_device(self, identifiers: set[tuple[str, str]]) -> bool:
+        """Remove the devices and rooms of a device registry entry the bridge no longer reports.
+
+        Returns False, keeping the registry entry, if the bridge still reports
+        any of them.
+        """
+        sources = [
+            source
+            for bucket in CHILD_DEVICES
+            for source in self.index[bucket]
+            if self.child_device_info(bucket, source)["identifiers"] & identifiers
+        ]
+        if not sources or any(self.state_key(source) not in self.missing for source in sources):
+            return False
+        self._async_remove_sources(sources)
+        self._store.async_delay_save(self._snapshot_data)
+        return True
+
+    @staticmethod
+    def _refresh_name(source) -> bool:
+        """Pick up a new name from the latest full payload of a device or room.
+
+        The library keeps the name a device or room was created with; the
+        bridge reports the current one in its full state, e.g. on reconnect.
+        Returns True if the name changed.
+        """
+        raw = getattr(source.state.value, "raw", None)
+        if not isinstance(raw, dict) or not (name := raw.get("name")) or name == source.name:
+            return False
+        _LOGGER.info("%s was renamed to %s", source, name)
+        source.name = name
+        return True
+
+    def _reconcile(self, current: list, live, id_attr: str, renamed: list) -> tuple[list, list, list]:
+        """Bind cached objects to their live counterparts.
+
+        Returns the new inventory, the live objects not known before and the
+        known objects no longer reported by the bridge. Cached objects newly
+        bound to a live object of another name are appended to renamed.
+        """
+        known = {getattr(obj, id_attr): obj for obj in current}
+        inventory = []
+        added = []
+        for obj in live:
+            existing = known.pop(getattr(obj, id_attr), None)
+            if existing is obj:
+                inventory.append(obj)
+            elif isinstance(existing, CachedDevice | CachedRoom) and (
+                id_attr == "room_id" or existing.kind == self.device_kind(obj)
+            ):
+                # The library keeps the name an object was created with, so
+                # only a newly bound object tells about a rename here
+                if not existing.is_bound_to(obj) and existing.name != obj.name:
+                    renamed.append(existing)
+                existing.bind(obj)
+                inventory.append(existing)
+            else:
+                inventory.append(obj)
+                added.append(obj)
+
+        for stale in known.values():
+            _LOGGER.info("%s is no longer reported by the bridge", stale)
+
+        return inventory, added, list(known.values())
+
+    @property
+    def bridge_device_info(self) -> DeviceInfo:
+        """Return the device info of the bridge itself."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self.hub_id)},
+            name=self.identifier,
+            manufacturer="Eaton",
+            model="xComfort Bridge",
+        )
+
+    @staticmethod
+    def _source_id(source) -> Any:
+        """Return the device id of a device or the room id of a room."""
+        source_id = getattr(source, "device_id", None)
+        return source.room_id if source_id is None else source_id
+
+    def child_device_info(self, bucket: str, source) -> DeviceInfo:
+        """Return the device info of a device or room in one of the CHILD_DEVICES buckets.
+
+        Built once per device and shared by its entities; rebuilt when the
+        device or room is renamed.
+        """
+        source_id = self._source_id(source)
+        if (info := self._device_infos.get((bucket, source_id))) is None:
+            prefix, model = CHILD_DEVICES[bucket]
+            identifier = f"{prefix}_{DOMAIN}_{self.identifier}-{source_id}" if prefix else f"{source_id}"
+            info = self._device_infos[(bucket, source_id)] = DeviceInfo(
+                identifiers={(DOMAIN, identifier)},
+                name=source.name,
+                manufacturer="Eaton",
+                model=model,
+                via_device=(DOMAIN, self.hub_id),
+            )
+        return info
+
+    @callback
+    def async_register_bridge(self) -> None:
+        """Register the bridge in the device registry.
+
+        Done before the platforms add their entities, so the via_device of
+        the devices they register is in place.
+        """
+        if self.config_entry is None or self.device_id is not None:
+            return
+        dr.async_get(self.hass).async_get_or_create(
+            config_entry_id=self.config_entry.entry_id, **self.bridge_device_info
+        )
+        self.device_id = (DOMAIN, self.hub_id)
+
+    @callback
+    def _async_rename_devices(self, sources: list) -> None:
+        """Carry renamed devices and rooms over to their device info and registry entries.
+
+        The registry only reads an entity's device info when the entity is
+        added, so existing entries are renamed here.
+        """
+        registry = dr.async_get(self.hass) if self.config_entry is not None else None
+        for source in sources:
+            for bucket in self.index.buckets_of(source):
+                if bucket not in CHILD_DEVICES:
+                    continue
+                self._device_infos.pop((bucket, self._source_id(source)), None)
+                if registry is None:
+                    continue
+                identifiers = self.child_device_info(bucket, source)["identifiers"]
+                if (device := registry.async_get_device(identifiers=identifiers)) is not None:
+                    registry.async_update_device(device.id, name=source.name)
+
+    def _snapshot_data(self) -> dict[str, Any]:
+        """Return the compact inventory snapshot to persist."""
+        # Whichever save asks for the data writes the current states
+        self._snapshot_save_pending = False
+        return {
+            "devices": [
+                device_to_dict(kind, device)
+                for device in self.devices
+                if (kind := self.device_kind(device)) is not None
+            ],
+            "rooms": [room_to_dict(room) for room in self.rooms],
+            "missing": [[kind, source_id, count] for (kind, source_id), count in self.missing.items()],
+        }
+
+    @callback
+    def async_subscribe_state(
+        self, device_type: str, device_id: Any, listener: Callable[[Any], None]
+    ) -> CALLBACK_TYPE:
+        """Register a listener for state changes of a single device or room.
+
+        The listener is called with the state decoded for the device kind, e.g.
+        a LightRecord (see states.py). Returns a callback that removes the
+        listener again.
+        """
+        key = (device_type, device_id)
+        self._listeners[key] = (*self._listeners.get(key, ()), listener)
+
+        @callback
+        def _unsubscribe() -> None:
+            remaining = tuple(other for other in self._listeners.get(key, ()) if other is not listener)
+            if remaining:
+                self._listeners[key] = remaining
+            else:
+                self._listeners.pop(key, None)
+
+        return _unsubscribe
+
+    async def async_send_command(
+        self,
+        send: CommandSender,
+        key: Hashable | None = None,
+        context: Context | None = None,
+        name: str | None = None,
+    ) -> Any:
+        """Send a command to the bridge through the hub command scheduler.
+
+        Commands are rate limited and prioritized by where they came from:
+        user actions go before automations, which go before background work.
+
+        Args:
+            send: Function returning the awaitable that sends the command
+            key: Identifies what the command sets, e.g. a light's output; a
+                queued command is replaced by a newer one with the same key
+            context: Context of the service call that issued the command
+            name: Command name the round trip time is recorded under, e.g. "dimm"
+
+        """
+        return await self.commands.async_submit(send, key, priority_for_context(context), name or "command")
+
+    async def async_send_optimistic(
+        self,
+        state_key: tuple[str, Any],
+        apply: Callable[[Any], Any],
+        send: CommandSender,
+        key: Hashable | None = None,
+        context: Context | None = None,
+        name: str | None = None,
+        confirm: Callable[[Any], bool] | None = None,
+    ) -> Any:
+        """Send a command, showing its effect on the device's entities right away.
+
+        The entities of the device get the state the command should produce
+        at once; it is rolled back, and HomeAssistantError raised, if the
+        bridge does not confirm it within CONFIRM_TIMEOUT seconds after the
+        command was sent. The call returns once the command is confirmed, so
+        a service call blocks for up to CONFIRM_TIMEOUT seconds after the
+        command was sent. See OptimisticUpdates.
+
+        Args:
+            state_key: Dispatch key of the device, e.g. ("Light", 12)
+            apply: Returns the state the command produces from the last
+                reported state of the device (a record, see states.py, or None)
+            send: Function returning the awaitable that sends the command
+            key: Command key, see async_send_command
+            context: Context of the service call that issued the command
+            name: Command name, see async_send_command
+            confirm: Returns True if a reported state confirms the command;
+                by default, if applying the command to it changes nothing
+
+        """
+        return await self.optimistic.async_run(
+            state_key, apply, lambda: self.async_send_command(send, key, context, name), confirm, name
+        )
+
+    @callback
+    def async_write_state(self, entity: Entity, flush: bool = False) -> None:
+        """Write entity state, coalescing bursts of updates.
+
+        Args:
+            entity: Entity whose state changed
+            flush: Write immediately, e.g. for on/off edges
+
+        """
+        self.write_coalescer.async_schedule(entity, flush)
+
+    @callback
+    def async_cancel_write(self, entity: Entity) -> None:
+        """Drop a pending coalesced write for an entity being removed."""
+        self.write_coalescer.async_cancel(entity)
+
+    def state_key(self, source) -> tuple[str, Any] | None:
+        """Return the dispatch key of a device or room, or None if it has no events.
+
+        Devices are keyed by their kind (see device_kind), so cached stand-ins
+        and live devices share a key. BridgeDevice events are ignored.
+        """
+        # Stand-ins know their kind without a live object
+        if isinstance(source, CachedDevice):
+            return (source.kind, source.device_id)
+        if isinstance(source, CachedRoom):
+            return ("Room", source.room_id)
+        if hasattr(source, "device_id"):
+            source_type = self.device_kind(source) or type(source).__name__
+            if source_type == "BridgeDevice":
+                return None
+            return (source_type, source.device_id)
+        if hasattr(source, "room_id"):
+            return ("Room", source.room_id)
+        _LOGGER.error("Entity has neither device_id nor room_id")
+        return None
+
+    def _subscribe_source(self, source) -> None:
+        """Subscribe to state changes of a device or room.
+
+        This is the only subscription to a device's state, whose Rx subject
+        the library created is replaced by a StateObservable; its states are
+        queued in self.updates, and entities and the event bus are fed from
+        the queue by _fire_event. The dispatch key and the state decoder of
+        the device kind are worked out once here rather than on every event,
+        and each state is decoded once for all listeners.
+
+        States are decoded, and the xcomfort_event payload taken, as they are
+        emitted: the library updates the state objects and payloads of shades
+        and rooms in place, so by the time the queue gets to them they may
+        already hold later values.
+        """
+        if (key := self.state_key(source)) is None:
+            return
+        if (previous := self._subscriptions.pop(key, None)) is not None:
+            previous.dispose()
+        decode = state_decoder(key[0])
+        self._sources[key] = source
+        put = self.updates.async_put
+        event_state = self._event_state
+
+        def _on_state(state) -> None:
+            put(key, decode(state), event_state(state) if self.fire_events else None)
+
+        self._subscriptions[key] = adopt_state(source).subscribe(_on_state)
+
+    def _unsubscribe_source(self, source) -> None:
+        """Drop the subscription to a device or room no longer in the inventory."""
+        if (key := self.state_key(source)) is None:
             return
+        self._sources.pop(key, None)
+        if (subscription := self._subscriptions.pop(key, None)) is not None:
+            subscription.dispose()
+
+    def _reported_state(self, key: tuple[str, Any]) -> Any:
+        """Return the last state the bridge reported for a device or room, decoded."""
+        if (source := self._sources.get(key)) is None or source.state is None:
+            return None
+        return decode_state(key[0], source.state.value)
 
-        # Extract or convert state to a simple, serializable format
+    @callback
+    def _dispatch(self, key: tuple[str, Any], record) -> None:
+        """Deliver a state to the listeners of a device or room."""
+        for listener in self._listeners.get(key, ()):
+            listener(record)
+
+    @callback
+    def _async_classify_room(self, room_id: Any) -> None:
+        """Index a room that had no state when it was added, now that it has one."""
+        added = self.index.add(rooms=[self.index.unclassified[room_id]])
+        if added and self.has_done_initial_load.is_set():
+            async_dispatcher_send(self.hass, self.signal_index_added, added)
+
+    @staticmethod
+    def _event_state(state) -> Any:
+        """Return a state emitted by the bridge library in the serializable form of xcomfort_event."""
         if isinstance(state, (str, int, float, bool)):
-            new_state = state
-        elif hasattr(state, 'raw'):
-            new_state = state.raw  # Use raw dictionary if available
-        else:
-            new_state = str(state)  # Fallback to string representation
+            return state
+        if hasattr(state, 'raw'):
+            # Use raw dictionary if available, copied as the library keeps updating it
+            return dict(state.raw) if isinstance(state.raw, dict) else state.raw
+        return str(state)  # Fallback to string representation
+
+    def _fire_event(self, key: tuple[str, Any], record, new_state=None):
+        """Dispatch a state change to its listeners and optionally fire xcomfort_event.
+
+        Args:
+            key: Dispatch key of the device or room, see state_key
+            record: The state decoded for the device kind, passed to listeners
+            new_state: The state for xcomfort_event, see _event_state
+
+        """
+        self.metrics.events[key[0]] += 1
+        if key[1] in self.index.unclassified and key[0] == "Room" and record is not None:
+            self._async_classify_room(key[1])
+        if self._resync_states is not None and key in self._resync_states:
+            # Skip the state after a reconnect if it is the one entities already have
+            known = self._resync_states.pop(key)
+            if known is not None and known == record:
+                self._resync_unchanged += 1
+                return
+        if key in self.optimistic.pending:
+            record = self.optimistic.async_reported(key, record)
+        if self._has_live_inventory and not self._snapshot_save_pending:
+            # Keep the last known states current; Home Assistant does not
+            # unload config entries when it shuts down, but flushes the Store
+            self._snapshot_save_pending = True
+            self._store.async_delay_save(self._snapshot_data, SNAPSHOT_SAVE_DELAY)
+
+        if listeners := self._listeners.get(key):
+            for listener in listeners:
+                listener(record)
+
+        if not self.fire_events:
+            return
 
         # Construct the event data
         event_data = {
-            "device_id": entity_id,
-            "device_type": entity_type,
+            "device_id": key[1],
+            "device_type": key[0],
             "action": "state_change",
             "new_state": new_state
         }
 
         # Fire the event and log it
-        self.hass.bus.fire("xcomfort_event", event_data)
-        _LOGGER.debug(f"Fired xcomfort_event for {entity_type} {entity_id} with new_state {new_state}")
+        self.hass.bus.fire(EVENT_XCOMFORT, event_data)
+        _LOGGER.debug("Fired xcomfort_event for %s %s with new_state %s", key[0], key[1], new_state)
 
     @property
     def hub_id(self) -> str:
@@ -0,0 +1,127 @@
+"""Typed index of the devices and rooms of an xComfort bridge."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any
+
+BUCKET_LIGHTS = "lights"
+BUCKET_SWITCHES = "switches"
+BUCKET_SHADES = "shades"
+BUCKET_DOOR_WINDOW_SENSORS = "door_window_sensors"
+BUCKET_RCT_ROOMS = "rct_rooms"
+BUCKET_POWER_ROOMS = "power_rooms"
+BUCKET_ENERGY_ROOMS = "energy_rooms"
+
+BUCKETS = (
+    BUCKET_LIGHTS,
+    BUCKET_SWITCHES,
+    BUCKET_SHADES,
+    BUCKET_DOOR_WINDOW_SENSORS,
+    BUCKET_RCT_ROOMS,
+    BUCKET_POWER_ROOMS,
+    BUCKET_ENERGY_ROOMS,
+)
+
+DEVICE_KIND_BUCKETS = {
+    "Light": BUCKET_LIGHTS,
+    "Switch": BUCKET_SWITCHES,
+    "Shade": BUCKET_SHADES,
+    "WindowSensor": BUCKET_DOOR_WINDOW_SENSORS,
+    "DoorSensor": BUCKET_DOOR_WINDOW_SENSORS,
+    "DoorWindowSensor": BUCKET_DOOR_WINDOW_SENSORS,
+}
+
+# Room buckets and the room state value that must be present to be in them
+ROOM_BUCKET_KEYS = (
+    (BUCKET_RCT_ROOMS, "setpoint"),
+    (BUCKET_POWER_ROOMS, "power"),
+    (BUCKET_ENERGY_ROOMS, "temperature"),
+)
+
+
+def _room_value(state: Any, key: str):
+    if isinstance(state, dict):
+        return state.get(key)
+    return getattr(state, key, None)
+
+
+class DeviceIndex:
+    """Devices and rooms classified into the buckets the platforms consume.
+
+    Each device or room is classified once when it is added, so platforms read
+    their bucket directly instead of scanning the whole inventory. Rooms are
+    classified by their state; a room without one yet is kept in unclassified
+    until it is added again once it has one.
+    """
+
+    def __init__(self, device_kind: Callable[[Any], str | None]) -> None:
+        """Initialize an empty index.
+
+        Args:
+            device_kind: Function returning the kind of a device, e.g. "Light"
+
+        """
+        self._device_kind = device_kind
+        self._buckets: dict[str, dict[Any, Any]] = {bucket: {} for bucket in BUCKETS}
+        # Rooms without a state to classify them by, by room id
+        self.unclassified: dict[Any, Any] = {}
+
+    def __getitem__(self, bucket: str) -> list:
+        """Return the members of a bucket."""
+        return list(self._buckets[bucket].values())
+
+    def __len__(self) -> int:
+        """Return the number of indexed entries over all buckets."""
+        return sum(len(members) for members in self._buckets.values())
+
+    def add(self, devices: Iterable = (), rooms: Iterable = ()) -> dict[str, list]:
+        """Classify devices and rooms into their buckets.
+
+        Returns the newly indexed members by bucket.
+        """
+        added: dict[str, list] = {}
+
+        for device in devices:
+            bucket = DEVICE_KIND_BUCKETS.get(self._device_kind(device))
+            if bucket is not None and device.device_id not in self._buckets[bucket]:
+                self._buckets[bucket][device.device_id] = device
+                added.setdefault(bucket, []).append(device)
+
+        for room in rooms:
+            if (state := room.state.value) is None:
+                self.unclassified[room.room_id] = room
+                continue
+            self.unclassified.pop(room.room_id, None)
+            for bucket, key in ROOM_BUCKET_KEYS:
+                if _room_value(state, key) is not None and room.room_id not in self._buckets[bucket]:
+                    self._buckets[bucket][room.room_id] = room
+                    added.setdefault(bucket, []).append(room)
+
+        return added
+
+    def buckets_of(self, obj) -> list[str]:
+        """Return the buckets a device or room is in."""
+        if hasattr(obj, "device_id"):
+            key = obj.device_id
+            buckets = [DEVICE_KIND_BUCKETS.get(self._device_kind(obj))]
+        else:
+            key = obj.room_id
+            buckets = [bucket for bucket, _ in ROOM_BUCKET_KEYS]
+        return [bucket for bucket in buckets if bucket is not None and key in self._buckets[bucket]]
+
+    def remove(self, obj) -> None:
+        """Remove a device or room from every bucket it is in."""
+        if hasattr(obj, "device_id"):
+            key = obj.device_id
+        else:
+            key = obj.room_id
+            self.unclassified.pop(key, None)
+        for bucket in self.buckets_of(obj):
+            del self._buckets[bucket][key]
+
+    def clear(self) -> None:
+        """Remove everything from the index."""
+        for members in self._buckets.values():
+            members.clear()
+        self.unclassified.clear()
@@ -4,7 +4,7 @@
 Version: 2024.05.18.1
 """
 
-from functools import cached_property
+from collections.abc import Callable
 import logging
 from math import ceil
 
@@ -12,11 +12,14 @@ from xcomfort.devices import Light
 
 from homeassistant.components.light import ATTR_BRIGHTNESS, ColorMode, LightEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
+from .entity import XComfortEntity
 from .hub import XComfortHub
+from .index import BUCKET_LIGHTS
+from .states import LightRecord, light_record
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,26 +27,27 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     """Set up xComfort light devices."""
     hub = XComfortHub.get_hub(hass, entry)
 
-    async def _wait_for_hub_then_setup():
-        await hub.has_done_initial_load.wait()
-
-        devices = hub.devices
-
-        _LOGGER.debug("Found %s xcomfort devices", len(devices))
+    @callback
+    def _add_lights(devices):
+        _LOGGER.debug("Found %s xcomfort lights", len(devices))
 
         lights = []
         for device in devices:
-            if isinstance(device, Light):
-                _LOGGER.debug("Adding %s", device)
-                light = HASSXComfortLight(hass, hub, device)
-                lights.append(light)
+            _LOGGER.debug("Adding %s", device)
+            light = HASSXComfortLight(hass, hub, device)
+            lights.append(light)
 
         _LOGGER.debug("Added %s lights", len(lights))
         async_add_entities(lights)
 
+    async def _wait_for_hub_then_setup():
+        await hub.has_done_initial_load.wait()
+
+        hub.async_setup_bucket(entry, BUCKET_LIGHTS, _add_lights)
+
     entry.async_create_task(hass, _wait_for_hub_then_setup())
 
-class HASSXComfortLight(LightEntity):
+class HASSXComfortLight(XComfortEntity, LightEntity):
     """Entity class for xComfort lights."""
 
     def __init__(self, hass: HomeAssistant, hub: XComfortHub, device: Light):
@@ -53,56 +57,47 @@ class HASSXComfortLight(LightEntity):
 
         self._device = device
         self._name = device.name
-        # Set initial state from device, if available
-        self._state = device.state.value if device.state is not None else None
         self.device_id = device.device_id
         self._unique_id = f"light_{DOMAIN}_{hub.identifier}-{device.device_id}"
-        self._color_mode = ColorMode.BRIGHTNESS if self._device.dimmable else ColorMode.ONOFF
-        self._device_subscription = None
+        self._attr_color_mode = ColorMode.BRIGHTNESS if self._device.dimmable else ColorMode.ONOFF
+        self._attr_supported_color_modes = {self._attr_color_mode}
+        self._record: LightRecord | None = None
+        # Set initial state from device, if available
+        self._apply(light_record(device.state.value) if device.state is not None else None)
 
     async def async_added_to_hass(self):
         """Run when entity about to be added to hass."""
         _LOGGER.debug("Added to hass %s", self._name)
-        # Subscribe directly to device's state (RxPy)
-        def _on_device_state(new_state):
-            if new_state is not None and new_state != self._state:
-                self._state = new_state
-                _LOGGER.debug("State updated via RxPy subscription %s : %s", self._name, self._state)
-                self.async_write_ha_state()
-        self._device_subscription = self._device.state.subscribe(_on_device_state)
+        await super().async_added_to_hass()
+        self.async_on_remove(self.hub.async_subscribe_state("Light", self.device_id, self._on_device_state))
 
     async def async_will_remove_from_hass(self):
-        if self._device_subscription is not None:
-            self._device_subscription.dispose()
-            self._device_subscription = None
-
-    def _get_state_value(self, key, default=None):
-        """Helper method to get state values from either a dictionary or object."""
-        if self._state is None:
-            return default
-        if isinstance(self._state, dict):
-            return self._state.get(key, default)
-        elif hasattr(self._state, key):
-            return getattr(self._state, key)
-        else:
-            return default
+        self.hub.async_cancel_write(self)
+
+    @callback
+    def _on_device_state(self, record: LightRecord | None):
+        """Handle a state change of this light dispatched by the hub."""
+        if record is not None and record != self._record:
+            was_on = self._attr_is_on
+            self._apply(record)
+            _LOGGER.debug("State updated %s : %s", self._name, record)
+            self.hub.async_write_state(self, flush=record.is_on != was_on)
+
+    def _apply(self, record: LightRecord | None) -> None:
+        """Precompute the state attributes from a state record."""
+        self._record = record
+        self._attr_is_on = record.is_on if record is not None else False
+        self._attr_brightness = record.brightness if record is not None else None
 
     @property
     def device_info(self):
         """Return device information."""
-        return {
-            "identifiers": {(DOMAIN, self.unique_id)},
-            "name": self.name,
-            "manufacturer": "Eaton",
-            "model": "XXX",
-            "sw_version": "Unknown",
-            "via_device": self.hub.device_id,
-        }
+        return self.hub.child_device_info(BUCKET_LIGHTS, self._device)
 
     @property
     def name(self):
         """Return the display name of this light."""
-        return self._name
+        return self._device.name
 
     @property
     def unique_id(self):
@@ -114,46 +109,43 @@ class HASSXComfortLight(LightEntity):
         """Return if the entity should be polled for state updates."""
         return False
 
-    @property
-    def brightness(self):
-        """Return the brightness of this light between 0..255."""
-        if not self.is_on:
-            return None
-        dimmvalue = self._get_state_value("dimmvalue", 0)
-        return int(255.0 * dimmvalue / 99.0)
-
-    @property
-    def is_on(self):
-        """Return true if light is on."""
-        return self._get_state_value("switch", False)
-
-    @property
-    def color_mode(self) -> ColorMode:
-        """Return the color mode of the light."""
-        return self._color_mode
-
-    @cached_property
-    def supported_color_modes(self) -> set[ColorMode] | set[str] | None:
-        """Return a set of supported color modes."""
-        return {self._color_mode}
-
     async def async_turn_on(self, **kwargs):
         """Turn the light on."""
         _LOGGER.debug("async_turn_on %s : %s", self._name, kwargs)
         if ATTR_BRIGHTNESS in kwargs and self._device.dimmable:
             br = ceil(kwargs[ATTR_BRIGHTNESS] * 99 / 255.0)
             _LOGGER.debug("async_turn_on br %s : %s", self._name, br)
-            await self._device.dimm(br)
-            # Update state immediately for responsiveness
-            self._state = {"switch": True, "dimmvalue": br}
+            await self.hub.async_send_optimistic(
+                ("Light", self.device_id),
+                lambda record: LightRecord(True, br),
+                lambda: self._device.dimm(br),
+                key=("light", self.device_id),
+                context=self._context,
+                name="dimm",
+            )
         else:
-            await self._device.switch(True)
-            self._state = {"switch": True}
-        self.async_write_ha_state()
+            await self.hub.async_send_optimistic(
+                ("Light", self.device_id),
+                _switched(True),
+                lambda: self._device.switch(True),
+                key=("light", self.device_id),
+                context=self._context,
+                name="switch",
+            )
 
     async def async_turn_off(self, **kwargs):
         """Turn the light off."""
         _LOGGER.debug("async_turn_off %s : %s", self._name, kwargs)
-        await self._device.switch(False)
-        self._state = {"switch": False}
-        self.async_write_ha_state()
\ No newline at end of file
+        await self.hub.async_send_optimistic(
+            ("Light", self.device_id),
+            _switched(False),
+            lambda: self._device.switch(False),
+            key=("light", self.device_id),
+            context=self._context,
+            name="switch",
+        )
+
+
+def _switched(is_on: bool) -> Callable[[LightRecord | None], LightRecord]:
+    """Return the effect of switching a light on or off, which keeps its dimm value."""
+    return lambda record: LightRecord(is_on, record.dimmvalue if record is not None else None)
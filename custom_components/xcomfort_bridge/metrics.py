@@ -0,0 +1,111 @@
+"""Runtime metrics of the xComfort Bridge integration."""
+
+from __future__ import annotations
+
+from collections import Counter, deque
+import statistics
+import time
+from typing import Any
+
+# Command latency samples kept per command
+LATENCY_SAMPLES = 1000
+# Seconds over which event rates are averaged
+RATE_WINDOW = 10.0
+
+
+class HubMetrics:
+    """Counters and latency samples collected by the hub.
+
+    Recording is kept to a counter increment or deque append so it can sit
+    on the event path; rates and percentiles are worked out when read.
+    """
+
+    def __init__(self, clock=time.monotonic) -> None:
+        """Initialize the metrics."""
+        self._clock = clock
+        self.events: Counter[str] = Counter()
+        self.connections = 0
+        self.connection_errors = 0
+        self._latencies: dict[str, deque[float]] = {}
+        self._queue_waits: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._commands: Counter[str] = Counter()
+        self._rate_totals: Counter[str] = Counter()
+        self._rate_sampled_at = clock()
+        self._rates: dict[str, float] = {}
+
+    @property
+    def reconnects(self) -> int:
+        """Return how often the bridge connection was established again."""
+        return max(0, self.connections - 1)
+
+    @property
+    def command_names(self) -> list[str]:
+        """Return the names of the commands with latency samples."""
+        return list(self._latencies)
+
+    def record_command(self, name: str, seconds: float) -> None:
+        """Record the round trip time of a command sent to the bridge."""
+        self._commands[name] += 1
+        if (samples := self._latencies.get(name)) is None:
+            samples = self._latencies[name] = deque(maxlen=LATENCY_SAMPLES)
+        samples.append(seconds)
+
+    def record_queue_wait(self, seconds: float) -> None:
+        """Record how long a command waited in the command scheduler before it was sent."""
+        self._queue_waits.append(seconds)
+
+    def event_rates(self) -> dict[str, float]:
+        """Return events received per second by device type.
+
+        Rates are averaged over the last completed window of RATE_WINDOW
+        seconds, or over the time since the last window if reads are rarer.
+        """
+        now = self._clock()
+        if (elapsed := now - self._rate_sampled_at) >= RATE_WINDOW:
+            self._rates = {
+                device_type: (count - self._rate_totals[device_type]) / elapsed
+                for device_type, count in self.events.items()
+            }
+            self._rate_totals = self.events.copy()
+            self._rate_sampled_at = now
+        return self._rates
+
+    def command_latency(self, name: str | None = None) -> dict[str, float] | None:
+        """Return p50/p95/p99 command latency in milliseconds.
+
+        Args:
+            name: Command to report, or None for all commands together
+
+        """
+        if name is None:
+            samples = [sample for samples in self._latencies.values() for sample in samples]
+        else:
+            samples = list(self._latencies.get(name, ()))
+        return _percentiles(samples)
+
+    def queue_wait(self) -> dict[str, float] | None:
+        """Return p50/p95/p99 time commands waited to be sent, in milliseconds."""
+        return _percentiles(list(self._queue_waits))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics as a JSON serializable dictionary."""
+        return {
+            "events": dict(self.events),
+            "event_rates": self.event_rates(),
+            "commands": dict(self._commands),
+            "command_latency_ms": {name: self.command_latency(name) for name in self.command_names},
+            "command_queue_wait_ms": self.queue_wait(),
+            "connections": self.connections,
+            "reconnects": self.reconnects,
+            "connection_errors": self.connection_errors,
+        }
+
+
+def _percentiles(samples: list[float]) -> dict[str, float] | None:
+    """Return p50/p95/p99 of samples in seconds, in milliseconds."""
+    if not samples:
+        return None
+    if len(samples) == 1:
+        return {"p50": samples[0] * 1000, "p95": samples[0] * 1000, "p99": samples[0] * 1000}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49] * 1000, "p95": cuts[94] * 1000, "p99": cuts[98] * 1000}
@@ -0,0 +1,70 @@
+"""Lightweight state observables for the xComfort Bridge integration."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+Observer = Callable[[Any], None]
+
+
+class StateSubscription:
+    """Handle of an observer subscribed to a StateObservable."""
+
+    __slots__ = ("_observable", "_observer")
+
+    def __init__(self, observable: StateObservable, observer: Observer) -> None:
+        self._observable = observable
+        self._observer = observer
+
+    def dispose(self) -> None:
+        """Stop calling the observer; disposing twice does nothing."""
+        if (observable := self._observable) is not None:
+            self._observable = None
+            observable.observers = tuple(other for other in observable.observers if other is not self._observer)
+
+
+class StateObservable:
+    """Current state of a device or room and the observers of its changes.
+
+    A stand-in for the Rx BehaviorSubject the library uses, covering what
+    the integration needs: value, on_next, and subscribe returning something
+    with dispose. Observers are plain callables called in the event loop, so
+    there are no locks, observer wrappers or copies of the observer list on
+    the way; the observers tuple is replaced rather than mutated when they
+    change. Like a BehaviorSubject, a new observer is called with the current
+    value straight away.
+    """
+
+    __slots__ = ("observers", "value")
+
+    def __init__(self, value: Any = None) -> None:
+        """Initialize with the current state."""
+        self.value = value
+        self.observers: tuple[Observer, ...] = ()
+
+    def on_next(self, value: Any) -> None:
+        """Set the current state and pass it to every observer."""
+        self.value = value
+        for observer in self.observers:
+            observer(value)
+
+    def subscribe(self, observer: Observer) -> StateSubscription:
+        """Call observer with the current state now and with every change."""
+        self.observers = (*self.observers, observer)
+        observer(self.value)
+        return StateSubscription(self, observer)
+
+
+def adopt_state(source) -> StateObservable:
+    """Replace the Rx state subject of a library device or room with a StateObservable.
+
+    The library only reads value and calls on_next on the subject it creates
+    for each device and room, so the observable takes its place and the
+    library's states reach the integration without going through Rx.
+    Must be done before anything subscribes to the subject; a source already
+    adopted keeps its observable.
+    """
+    if not isinstance(state := source.state, StateObservable):
+        state = source.state = StateObservable(state.value)
+    return state
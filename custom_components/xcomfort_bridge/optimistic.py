@@ -0,0 +1,147 @@
+"""Optimistic device state for commands sent to the xComfort bridge."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+StateKey = tuple[str, Any]
+
+
+class _Pending:
+    """A command waiting for the bridge to confirm its effect."""
+
+    __slots__ = ("apply", "confirm", "future")
+
+    def __init__(
+        self, apply: Callable[[Any], Any], confirm: Callable[[Any], bool], future: asyncio.Future
+    ) -> None:
+        self.apply = apply
+        self.confirm = confirm
+        self.future = future
+
+
+class OptimisticUpdates:
+    """Show the intended effect of a command until the bridge confirms it.
+
+    A command is described by a function mapping the state the bridge last
+    reported for a device to the state the command should produce, e.g.
+    turning a light on. That state is dispatched to the device's listeners
+    straight away. While the command is pending, states reported by the
+    bridge are dispatched with the command applied on top, so unrelated
+    changes (e.g. a room's power) still come through. A reported state that
+    already has the effect confirms the command. If none arrives within the
+    timeout after the command was sent, or sending fails, the last reported
+    state is dispatched again and the caller gets an error.
+
+    A newer command for the same device supersedes a pending one, whose
+    caller then returns without waiting for a confirmation.
+
+    The caller, i.e. the service call, waits for the confirmation so it can
+    get the error: once the command is sent it blocks until the bridge
+    reports the state, which usually takes a round trip, and at most for the
+    timeout. Entities show the intended state in the meantime.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        dispatch: Callable[[StateKey, Any], None],
+        reported: Callable[[StateKey], Any],
+        timeout: float,
+    ) -> None:
+        """Initialize the tracker.
+
+        Args:
+            hass: Home Assistant instance
+            dispatch: Delivers a state of a device to its listeners
+            reported: Returns the state the bridge last reported for a device
+            timeout: Seconds the bridge has to confirm a sent command
+
+        """
+        self.hass = hass
+        self._dispatch = dispatch
+        self._reported = reported
+        self.timeout = timeout
+        self.pending: dict[StateKey, _Pending] = {}
+        self.confirmed = 0
+        self.rolled_back = 0
+        self.superseded = 0
+
+    async def async_run(
+        self,
+        key: StateKey,
+        apply: Callable[[Any], Any],
+        send: Callable[[], Awaitable[Any]],
+        confirm: Callable[[Any], bool] | None = None,
+        name: str | None = None,
+    ) -> Any:
+        """Dispatch the intended state of a device, send the command and wait for confirmation.
+
+        Args:
+            key: Dispatch key of the device, see XComfortHub.state_key
+            apply: Returns the state a command produces from the reported
+                state, which may be None if the bridge has not reported any
+            send: Sends the command
+            confirm: Returns True if a reported state confirms the command;
+                by default, if applying the command to it changes nothing
+            name: Command name for the error message
+
+        Returns the result of send once the command is confirmed or
+        superseded; raises HomeAssistantError if it is not confirmed within
+        the timeout after sending, or the error of send.
+        """
+        if (previous := self.pending.pop(key, None)) is not None:
+            self.superseded += 1
+            previous.future.set_result(None)
+        pending = _Pending(apply, confirm or (lambda state: apply(state) == state), self.hass.loop.create_future())
+        self.pending[key] = pending
+        self._dispatch(key, apply(self._reported(key)))
+
+        try:
+            result = await send()
+            try:
+                async with asyncio.timeout(self.timeout):
+                    await pending.future
+            except TimeoutError as err:
+                raise HomeAssistantError(
+                    f"{name or 'Command'} for {key[0]} {key[1]} was not confirmed by the bridge within {self.timeout} s"
+                ) from err
+        except BaseException:
+            self._rollback(key, pending)
+            raise
+        return result
+
+    @callback
+    def async_reported(self, key: StateKey, state: Any) -> Any:
+        """Return the state to dispatch for a state reported while a command is pending."""
+        pending = self.pending[key]
+        if pending.confirm(state):
+            del self.pending[key]
+            self.confirmed += 1
+            pending.future.set_result(None)
+            return state
+        return pending.apply(state)
+
+    def _rollback(self, key: StateKey, pending: _Pending) -> None:
+        if self.pending.get(key) is not pending:
+            # Confirmed or superseded in the meantime
+            return
+        del self.pending[key]
+        self.rolled_back += 1
+        _LOGGER.debug("Rolling back optimistic state of %s %s", key[0], key[1])
+        self._dispatch(key, self._reported(key))
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop waiting for confirmations."""
+        for pending in self.pending.values():
+            pending.future.cancel()
+        self.pending.clear()
@@ -0,0 +1,107 @@
+"""Bounded-rate state publication for the xComfort Bridge sensors."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+
+from homeassistant.core import HomeAssistant, callback
+
+
+class PublishPolicy:
+    """Decide when a changing sensor value is written to the state machine.
+
+    A value is published when it differs from the last published value by
+    more than the absolute deadband and more than the relative deadband, and
+    at most once per minimum interval. A significant value arriving within the
+    interval is published when the interval ends, so the last value of a
+    burst is never lost; values inside the deadband are not published at all.
+    The value published is always the precise latest value.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        write: Callable[[], None],
+        min_interval: float = 0.0,
+        deadband: float = 0.0,
+        relative_deadband: float = 0.0,
+    ) -> None:
+        """Initialize the policy.
+
+        Args:
+            hass: Home Assistant instance
+            write: Writes the entity state, e.g. async_write_ha_state
+            min_interval: Minimum seconds between publications
+            deadband: Minimum absolute change to publish
+            relative_deadband: Minimum change relative to the last published
+                value to publish, as a fraction (0.05 is 5%)
+
+        """
+        self.hass = hass
+        self._write = write
+        self.min_interval = min_interval
+        self.deadband = deadband
+        self.relative_deadband = relative_deadband
+        self._published: float | None = None
+        self._published_at: float | None = None
+        self._value: float | None = None
+        self._deferred: asyncio.TimerHandle | None = None
+        self.published = 0
+        self.suppressed = 0
+
+    def _is_significant(self, value: float | None) -> bool:
+        last = self._published
+        if value is None or last is None:
+            return value is not last
+        change = abs(value - last)
+        if change == 0:
+            return False
+        return change > self.deadband and change > abs(last) * self.relative_deadband
+
+    @callback
+    def async_update(self, value: float | None) -> None:
+        """Offer a new value, publishing it if the policy allows."""
+        self._value = value
+        if not self._is_significant(value):
+            self.suppressed += 1
+            return
+        if self._deferred is not None:
+            # Published when the interval ends
+            self.suppressed += 1
+            return
+
+        now = self.hass.loop.time()
+        if self._published_at is not None and (wait := self._published_at + self.min_interval - now) > 0:
+            self.suppressed += 1
+            self._deferred = self.hass.loop.call_later(wait, self._publish_deferred)
+            return
+        self._publish(now)
+
+    @callback
+    def _publish_deferred(self) -> None:
+        self._deferred = None
+        if self._is_significant(self._value):
+            self._publish(self.hass.loop.time())
+
+    def _publish(self, now: float) -> None:
+        self._published = self._value
+        self._published_at = now
+        self.published += 1
+        self._write()
+
+    @callback
+    def async_seed(self, value: float | None) -> None:
+        """Record a value as published without writing it.
+
+        Used for the state written when the entity is added to hass.
+        """
+        self._value = self._published = value
+        self._published_at = self.hass.loop.time()
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop a deferred publication, e.g. when the entity is removed."""
+        if self._deferred is not None:
+            self._deferred.cancel()
+            self._deferred = None
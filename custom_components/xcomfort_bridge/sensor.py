@@ -3,9 +3,10 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from datetime import timedelta
 import logging
-import math
-import time
 from typing import Any
 
 from xcomfort.bridge import Room
@@ -18,12 +19,30 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfEnergy
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfEnergy, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
 
-from .const import DOMAIN
+from .const import (
+    CONF_ENERGY_DEADBAND,
+    CONF_ENERGY_INTERVAL,
+    CONF_POWER_DEADBAND,
+    CONF_POWER_MIN_INTERVAL,
+    CONF_POWER_RELATIVE_DEADBAND,
+    DEFAULT_ENERGY_DEADBAND,
+    DEFAULT_ENERGY_INTERVAL,
+    DEFAULT_POWER_DEADBAND,
+    DEFAULT_POWER_MIN_INTERVAL,
+    DEFAULT_POWER_RELATIVE_DEADBAND,
+    DOMAIN,
+)
+from .energy import EnergyIntegrator
+from .entity import XComfortEntity
 from .hub import XComfortHub
+from .index import BUCKET_ENERGY_ROOMS, BUCKET_POWER_ROOMS
+from .publish import PublishPolicy
+from .states import RoomRecord, room_record
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,33 +51,32 @@ async def async_setup_entry(
 ) -> None:
     hub = XComfortHub.get_hub(hass, entry)
 
+    async_add_entities([XComfortMetricSensor(hub, description) for description in METRIC_SENSORS])
+
+    @callback
+    def _add_power_sensors(rooms):
+        async_add_entities([XComfortPowerSensor(hub, room, entry.options) for room in rooms])
+
+    @callback
+    def _add_energy_sensors(rooms):
+        async_add_entities([XComfortEnergySensor(hub, room, entry.options) for room in rooms])
+
     async def _wait_for_hub_then_setup():
         await hub.has_done_initial_load.wait()
-        rooms = hub.rooms
-        sensors = []
-        for room in rooms:
-            if room.state.value is not None:
-                if _safe_get(room.state.value, "power") is not None:
-                    sensors.append(XComfortPowerSensor(hub, room))
-                if _safe_get(room.state.value, "temperature") is not None:
-                    sensors.append(XComfortEnergySensor(hub, room))
-        async_add_entities(sensors)
-
-    hass.async_create_task(_wait_for_hub_then_setup())
-
-def _safe_get(state: Any, key: str):
-    if state is None:
-        return None
-    if hasattr(state, key):
-        return getattr(state, key)
-    if isinstance(state, dict):
-        return state.get(key)
-    return None
-
-class XComfortPowerSensor(SensorEntity):
-    """Power sensor for a specific room with RxPy subscription."""
-
-    def __init__(self, hub: XComfortHub, room: Room):
+
+        hub.async_setup_bucket(entry, BUCKET_POWER_ROOMS, _add_power_sensors)
+        hub.async_setup_bucket(entry, BUCKET_ENERGY_ROOMS, _add_energy_sensors)
+
+    entry.async_create_task(hass, _wait_for_hub_then_setup())
+
+class XComfortPowerSensor(XComfortEntity, SensorEntity):
+    """Power sensor for a specific room, fed by the hub state dispatch.
+
+    Power changes are published subject to the configured minimum interval
+    and deadbands, so fluctuating loads do not write state on every update.
+    """
+
+    def __init__(self, hub: XComfortHub, room: Room, options: Mapping[str, Any]):
         self._attr_device_class = SensorEntityDescription(
             key="current_consumption",
             device_class=SensorDeviceClass.ENERGY,
@@ -70,20 +88,32 @@ class XComfortPowerSensor(SensorEntity):
         self._room = room
         self._attr_name = self._room.name
         self._attr_unique_id = f"energy_{self._room.room_id}"
-        self._state = self._room.state.value
-        self._room_subscription = None
+        self._record = room_record(self._room.state.value)
+        self._publish_policy = PublishPolicy(
+            hub.hass,
+            self.async_write_ha_state,
+            min_interval=options.get(CONF_POWER_MIN_INTERVAL, DEFAULT_POWER_MIN_INTERVAL),
+            deadband=options.get(CONF_POWER_DEADBAND, DEFAULT_POWER_DEADBAND),
+            relative_deadband=options.get(CONF_POWER_RELATIVE_DEADBAND, DEFAULT_POWER_RELATIVE_DEADBAND) / 100,
+        )
+
+    @property
+    def _source(self):
+        return self._room
 
     async def async_added_to_hass(self) -> None:
-        def _on_room_state(new_state):
-            if new_state is not None and _safe_get(new_state, "power") != _safe_get(self._state, "power"):
-                self._state = new_state
-                self.async_write_ha_state()
-        self._room_subscription = self._room.state.subscribe(_on_room_state)
+        await super().async_added_to_hass()
+        self._publish_policy.async_seed(self.native_value)
+        self.async_on_remove(self.hub.async_subscribe_state("Room", self._room.room_id, self._on_room_state))
 
     async def async_will_remove_from_hass(self):
-        if self._room_subscription is not None:
-            self._room_subscription.dispose()
-            self._room_subscription = None
+        self._publish_policy.async_cancel()
+
+    @callback
+    def _on_room_state(self, record: RoomRecord | None):
+        if record is not None:
+            self._record = record
+            self._publish_policy.async_update(record.power)
 
     @property
     def device_class(self):
@@ -95,14 +125,21 @@ class XComfortPowerSensor(SensorEntity):
 
     @property
     def native_value(self):
-        return _safe_get(self._state, "power")
+        return self._record.power if self._record is not None else None
+
+class XComfortEnergySensor(XComfortEntity, RestoreSensor):
+    """Energy sensor for a specific room, fed by the hub state dispatch.
 
-class XComfortEnergySensor(RestoreSensor):
-    """Energy sensor for a specific room with RxPy subscription."""
+    Room power is integrated on every state change of the room, independent
+    of when the value is read, so the total is exact. The total is published
+    once per configured interval if it changed by more than the deadband,
+    which also keeps the restored total current. Reading the value includes
+    the energy since the last state change, so none is lost on a restart.
+    """
 
     _attr_state_class = SensorStateClass.TOTAL
 
-    def __init__(self, hub: XComfortHub, room: Room):
+    def __init__(self, hub: XComfortHub, room: Room, options: Mapping[str, Any]):
         self._attr_device_class = SensorEntityDescription(
             key="energy_used",
             device_class=SensorDeviceClass.ENERGY,
@@ -114,43 +151,57 @@ class XComfortEnergySensor(RestoreSensor):
         self._room = room
         self._attr_name = self._room.name
         self._attr_unique_id = f"energy_kwh_{self._room.room_id}"
-        self._state = self._room.state.value
-        self._updateTime = time.monotonic()
-        self._consumption = 0.0
-        self._room_subscription = None
+        self._record = room_record(self._room.state.value)
+        self._integrator = EnergyIntegrator()
+        self._interval = options.get(CONF_ENERGY_INTERVAL, DEFAULT_ENERGY_INTERVAL)
+        self._publish_policy = PublishPolicy(
+            hub.hass, self.async_write_ha_state, deadband=options.get(CONF_ENERGY_DEADBAND, DEFAULT_ENERGY_DEADBAND)
+        )
+
+    @property
+    def _source(self):
+        return self._room
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
         savedstate = await self.async_get_last_sensor_data()
         if savedstate and savedstate.native_value is not None:
             try:
-                self._consumption = float(savedstate.native_value)
+                self._integrator.total = float(savedstate.native_value)
             except (ValueError, TypeError):
-                self._consumption = 0.0
-        else:
-            self._consumption = 0.0
+                self._integrator.total = 0.0
 
-        def _on_room_state(new_state):
-            if new_state is not None and _safe_get(new_state, "power") != _safe_get(self._state, "power"):
-                self._state = new_state
-                self.async_write_ha_state()
-        self._room_subscription = self._room.state.subscribe(_on_room_state)
+        self._integrator.add_sample(self._record.power if self._record is not None else None)
+        self._publish_policy.async_seed(self._integrator.total)
+        self.async_on_remove(self.hub.async_subscribe_state("Room", self._room.room_id, self._on_room_state))
+        self.async_on_remove(
+            async_track_time_interval(self.hass, self._periodic_update, timedelta(seconds=self._interval))
+        )
 
     async def async_will_remove_from_hass(self):
-        if self._room_subscription is not None:
-            self._room_subscription.dispose()
-            self._room_subscription = None
+        self._publish_policy.async_cancel()
 
-    def calculate(self):
-        if self._state is None:
-            return
-        power = _safe_get(self._state, "power")
-        if power is None:
+    @callback
+    def _on_room_state(self, record: RoomRecord | None):
+        if record is None:
             return
-        now = time.monotonic()
-        timediff = math.floor(now - self._updateTime)
-        self._consumption += (power / 3600 / 1000 * timediff)
-        self._updateTime = now
+        self._record = record
+        self._integrator.add_sample(record.power)
+
+    @callback
+    def _on_availability_changed(self) -> None:
+        if not self.hub.available:
+            # Power is unknown while the bridge is disconnected
+            self._integrator.add_sample(None)
+        elif self._record is not None:
+            # The resync after a reconnect does not redeliver an unchanged
+            # room state, so pick up integrating from the last known power
+            self._integrator.add_sample(self._record.power)
+        super()._on_availability_changed()
+
+    @callback
+    def _periodic_update(self, now=None):
+        self._publish_policy.async_update(self._integrator.energy())
 
     @property
     def device_class(self):
@@ -162,5 +213,121 @@ class XComfortEnergySensor(RestoreSensor):
 
     @property
     def native_value(self):
-        self.calculate()
-        return self._consumption
\ No newline at end of file
+        return self._integrator.energy()
+
+
+def _command_latency_p95(hub: XComfortHub) -> float | None:
+    latency = hub.metrics.command_latency()
+    return latency["p95"] if latency is not None else None
+
+
+def _command_latency_attributes(hub: XComfortHub) -> dict[str, Any]:
+    return {name: hub.metrics.command_latency(name) for name in hub.metrics.command_names}
+
+
+def _command_queue_wait_p95(hub: XComfortHub) -> float | None:
+    queue_wait = hub.metrics.queue_wait()
+    return queue_wait["p95"] if queue_wait is not None else None
+
+
+@dataclass(frozen=True, kw_only=True)
+class XComfortMetricSensorDescription(SensorEntityDescription):
+    """Describes a hub metric sensor."""
+
+    value_fn: Callable[[XComfortHub], Any]
+    attributes_fn: Callable[[XComfortHub], dict[str, Any]] | None = None
+
+
+METRIC_SENSORS = (
+    XComfortMetricSensorDescription(
+        key="event_rate",
+        name="Event rate",
+        native_unit_of_measurement="events/s",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        entity_registry_enabled_default=False,
+        value_fn=lambda hub: sum(hub.metrics.event_rates().values()),
+        attributes_fn=lambda hub: dict(hub.metrics.event_rates()),
+    ),
+    XComfortMetricSensorDescription(
+        key="command_latency",
+        name="Command latency p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        entity_registry_enabled_default=False,
+        value_fn=_command_latency_p95,
+        attributes_fn=_command_latency_attributes,
+    ),
+    XComfortMetricSensorDescription(
+        key="command_queue_wait",
+        name="Command queue wait p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        entity_registry_enabled_default=False,
+        value_fn=_command_queue_wait_p95,
+        attributes_fn=lambda hub: hub.metrics.queue_wait() or {},
+    ),
+    XComfortMetricSensorDescription(
+        key="command_queue_depth",
+        name="Command queue depth",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=lambda hub: hub.commands.queue_depth,
+    ),
+    XComfortMetricSensorDescription(
+        key="reconnects",
+        name="Reconnects",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda hub: hub.metrics.reconnects,
+        attributes_fn=lambda hub: {"connection_errors": hub.metrics.connection_errors},
+    ),
+    XComfortMetricSensorDescription(
+        key="load_time",
+        name="Inventory load time",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        suggested_display_precision=2,
+        value_fn=lambda hub: hub.load_timings.get("total"),
+        attributes_fn=lambda hub: dict(hub.load_timings),
+    ),
+    XComfortMetricSensorDescription(
+        key="subscriptions",
+        name="Active subscriptions",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=lambda hub: hub.subscription_count,
+    ),
+)
+
+
+class XComfortMetricSensor(SensorEntity):
+    """Diagnostic sensor exposing a runtime metric of the hub.
+
+    Metrics are collected by the hub as counters; the sensors are polled so
+    reading them costs nothing on the event path.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = True
+    entity_description: XComfortMetricSensorDescription
+
+    def __init__(self, hub: XComfortHub, description: XComfortMetricSensorDescription) -> None:
+        self.hub = hub
+        self.entity_description = description
+        self._attr_name = f"{hub.identifier} {description.name}"
+        self._attr_unique_id = f"{DOMAIN}_{hub.identifier}_{description.key}"
+        self._attr_device_info = hub.bridge_device_info
+
+    @property
+    def native_value(self):
+        return self.entity_description.value_fn(self.hub)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self.hub)
@@ -0,0 +1,242 @@
+"""Cached device and room inventory for the xComfort Bridge integration.
+
+The hub persists a compact snapshot of the bridge inventory so entities can be
+created from it on startup, before the bridge has answered. The stand-in
+objects below mimic the parts of the library's devices and rooms that the
+platforms use, and are bound to the live objects once the bridge inventory
+arrives.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .observable import StateObservable, adopt_state
+from .states import room_mode
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+ROOM_STATE_KEYS = ("temperature", "humidity", "power", "setpoint")
+
+
+def _get(state: Any, key: str, default=None):
+    """Read a value from a state object or dictionary."""
+    if state is None:
+        return default
+    if isinstance(state, dict):
+        return state.get(key, default)
+    return getattr(state, key, default)
+
+
+def encode_device_state(kind: str, state: Any) -> Any:
+    """Return a JSON serializable last known state for a device."""
+    if state is None:
+        return None
+    if isinstance(state, bool):
+        return state
+    if kind == "Light":
+        return {"switch": _get(state, "switch", False), "dimmvalue": _get(state, "dimmvalue", 0)}
+    if kind == "Switch":
+        if (is_on := _get(state, "is_on")) is None:
+            is_on = _get(_get(state, "payload"), "switch")
+        if is_on is None:
+            is_on = _get(state, "switch")
+        return {"switch": is_on} if is_on is not None else None
+    if kind == "Shade":
+        position = state.get("shPos") if isinstance(state, dict) else getattr(state, "position", None)
+        return {"shPos": position} if position is not None else None
+    return None
+
+
+def encode_room_state(state: Any) -> dict[str, Any] | None:
+    """Return a JSON serializable last known state for a room."""
+    if state is None:
+        return None
+    data = {key: _get(state, key) for key in ROOM_STATE_KEYS}
+    raw = _get(state, "raw") or {}
+    data["mode"] = room_mode(raw)
+    return data
+
+
+class NotConnectedError(HomeAssistantError, AttributeError):
+    """Raised for attributes of a cached object that only the live object has.
+
+    Being an AttributeError keeps hasattr() and getattr() with a default
+    working on unbound stand-ins.
+    """
+
+
+class CachedRoomState:
+    """Last known room state restored from the snapshot."""
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        """Initialize from snapshot data."""
+        self.temperature = data.get("temperature")
+        self.humidity = data.get("humidity")
+        self.power = data.get("power")
+        self.setpoint = data.get("setpoint")
+        self.raw = {"mode": data["mode"]} if data.get("mode") is not None else {}
+
+    def __str__(self) -> str:
+        """Return a readable representation."""
+        return f"CachedRoomState({self.temperature}, {self.setpoint}, {self.power})"
+
+
+class _CachedObject:
+    """Common behaviour of cached devices and rooms.
+
+    Exposes a ``state`` observable seeded with the last known state. Once
+    bound to the live object, whose state subject is adopted (see
+    adopt_state), live state is forwarded into the observable, and any
+    attribute not cached here is looked up on the live object.
+    """
+
+    def __init__(self, name: str, state: Any) -> None:
+        self.name = name
+        self.state = StateObservable(state)
+        self._live = None
+        self._live_subscription = None
+
+    @property
+    def is_bound(self) -> bool:
+        """Return True once bound to a live object."""
+        return self._live is not None
+
+    def is_bound_to(self, live) -> bool:
+        """Return True if bound to the given live object."""
+        return self._live is live
+
+    def bind(self, live) -> None:
+        """Bind to the live library object and forward its state.
+
+        Binding again to the object already bound only refreshes the cached
+        attributes. The subscription is kept, as subscribing again would
+        deliver the current state to every listener once more; the name is
+        left to the hub, which picks renames up from the state payload.
+        """
+        if live is self._live:
+            self._refresh(live)
+            return
+        self.unbind()
+        self._live = live
+        self.name = live.name
+        self._refresh(live)
+        self._live_subscription = adopt_state(live).subscribe(self._forward_state)
+
+    def _refresh(self, live) -> None:
+        """Refresh the attributes cached from the live object."""
+
+    def unbind(self) -> None:
+        """Stop forwarding state from the live object."""
+        if self._live_subscription is not None:
+            self._live_subscription.dispose()
+            self._live_subscription = None
+        self._live = None
+
+    def _forward_state(self, state) -> None:
+        if state is not None:
+            self.state.on_next(state)
+
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        live = self.__dict__.get("_live")
+        if live is None:
+            raise NotConnectedError(f"{self.__dict__.get('name')} is not connected to the xComfort bridge yet")
+        return getattr(live, name)
+
+
+class CachedDevice(_CachedObject):
+    """Stand-in for a bridge device restored from the snapshot."""
+
+    def __init__(
+        self,
+        kind: str,
+        device_id: Any,
+        name: str,
+        dimmable: bool | None = None,
+        supports_go_to: bool | None = None,
+        state: Any = None,
+    ) -> None:
+        """Initialize the cached device."""
+        super().__init__(name, state)
+        self.kind = kind
+        self.device_id = device_id
+        self.dimmable = dimmable
+        self.supports_go_to = supports_go_to
+
+    @property
+    def is_open(self) -> bool | None:
+        """Return the last known state of a door/window sensor."""
+        value = self.state.value
+        return value if isinstance(value, bool) else None
+
+    def _refresh(self, live) -> None:
+        """Refresh whether the device dims and goes to positions."""
+        self.dimmable = getattr(live, "dimmable", self.dimmable)
+        self.supports_go_to = getattr(live, "supports_go_to", self.supports_go_to)
+
+    def __str__(self) -> str:
+        """Return a readable representation."""
+        return f"CachedDevice({self.kind}, {self.device_id}, \"{self.name}\", bound: {self.is_bound})"
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CachedDevice:
+        """Restore a cached device from snapshot data."""
+        return cls(
+            data["kind"],
+            data["id"],
+            data["name"],
+            dimmable=data.get("dimmable"),
+            supports_go_to=data.get("supports_go_to"),
+            state=data.get("state"),
+        )
+
+
+class CachedRoom(_CachedObject):
+    """Stand-in for a bridge room restored from the snapshot."""
+
+    def __init__(self, bridge, room_id: Any, name: str, state: dict[str, Any] | None) -> None:
+        """Initialize the cached room.
+
+        The bridge is kept so RC Touch setpoint ranges are available before
+        the room is bound.
+        """
+        super().__init__(name, CachedRoomState(state) if state is not None else None)
+        self.bridge = bridge
+        self.room_id = room_id
+
+    def __str__(self) -> str:
+        """Return a readable representation."""
+        return f"CachedRoom({self.room_id}, \"{self.name}\", bound: {self.is_bound})"
+
+    @classmethod
+    def from_dict(cls, bridge, data: dict[str, Any]) -> CachedRoom:
+        """Restore a cached room from snapshot data."""
+        return cls(bridge, data["id"], data["name"], data.get("state"))
+
+
+def device_to_dict(kind: str, device) -> dict[str, Any]:
+    """Return the snapshot data for a device."""
+    return {
+        "kind": kind,
+        "id": device.device_id,
+        "name": device.name,
+        "dimmable": getattr(device, "dimmable", None),
+        "supports_go_to": getattr(device, "supports_go_to", None),
+        "state": encode_device_state(kind, device.state.value),
+    }
+
+
+def room_to_dict(room) -> dict[str, Any]:
+    """Return the snapshot data for a room."""
+    return {
+        "id": room.room_id,
+        "name": room.name,
+        "state": encode_room_state(room.state.value),
+    }
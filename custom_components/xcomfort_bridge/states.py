@@ -0,0 +1,162 @@
+"""Normalized device and room state records for the xComfort Bridge integration.
+
+Device state reaches the hub in several shapes: library state objects,
+dictionaries from the snapshot, payload wrappers and bare booleans. The hub
+decodes each bridge message into a small immutable record of the device's
+kind once, with the decoder looked up in STATE_DECODERS when it subscribes,
+and hands the record to every listener. Entities precompute their Home
+Assistant attributes from it and compare records to detect changes.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class LightRecord:
+    """State of a light; dimmvalue is 0..99 as used by the bridge."""
+
+    is_on: bool
+    dimmvalue: int | None = None
+
+    @property
+    def brightness(self) -> int | None:
+        """Return the brightness in Home Assistant's 0..255 scale, None when off."""
+        if not self.is_on:
+            return None
+        return int(255.0 * (self.dimmvalue or 0) / 99.0)
+
+
+@dataclass(frozen=True, slots=True)
+class ShadeRecord:
+    """State of a shade; position is the bridge's, 0 open and 100 closed."""
+
+    position: int | None
+
+    @property
+    def cover_position(self) -> int | None:
+        """Return the position in Home Assistant's scale, 0 closed and 100 open."""
+        return None if self.position is None else 100 - self.position
+
+
+@dataclass(frozen=True, slots=True)
+class SwitchRecord:
+    """State of a switching actuator."""
+
+    is_on: bool | None
+
+
+@dataclass(frozen=True, slots=True)
+class ContactRecord:
+    """State of a door or window sensor."""
+
+    is_open: bool
+
+
+ROOM_KEYS = ("temperature", "humidity", "power", "setpoint")
+
+
+@dataclass(frozen=True, slots=True)
+class RoomRecord:
+    """State of a room; mode and rctstate are the raw RC touch mode and state, if the room has one."""
+
+    temperature: float | None = None
+    humidity: float | None = None
+    power: float | None = None
+    setpoint: float | None = None
+    mode: int | None = None
+    rctstate: int | None = None
+
+
+def light_record(state: Any) -> LightRecord | None:
+    """Return the record for a light state, or None if it carries no state."""
+    if state is None or type(state) is LightRecord:
+        return state
+    if type(state) is dict:
+        return LightRecord(bool(state.get("switch", False)), state.get("dimmvalue"))
+    return LightRecord(bool(getattr(state, "switch", False)), getattr(state, "dimmvalue", None))
+
+
+def shade_record(state: Any) -> ShadeRecord | None:
+    """Return the record for a shade state, or None if it carries no state."""
+    if state is None or isinstance(state, ShadeRecord):
+        return state
+    if isinstance(state, dict):
+        return ShadeRecord(state.get("shPos"))
+    return ShadeRecord(getattr(state, "position", None))
+
+
+def switch_record(state: Any) -> SwitchRecord | None:
+    """Return the record for a switch state, or None if it carries no switch value."""
+    if state is None or isinstance(state, SwitchRecord):
+        return state
+    if (is_on := getattr(state, "is_on", None)) is not None:
+        return SwitchRecord(is_on)
+    if isinstance(payload := getattr(state, "payload", None), dict):
+        state = payload
+    if isinstance(state, dict) and "switch" in state:
+        return SwitchRecord(state["switch"])
+    return None
+
+
+def contact_record(state: Any) -> ContactRecord | None:
+    """Return the record for a door or window sensor state, or None if it is not a bool."""
+    if type(state) is ContactRecord:
+        return state
+    if isinstance(state, bool):
+        return ContactRecord(state)
+    return None
+
+
+def room_mode(raw: dict[str, Any]) -> Any:
+    """Return the preset mode in the raw payload of a room.
+
+    The library collects both the mode and currentMode keys the bridge sends
+    into the payload over time; mode takes precedence.
+    """
+    return raw.get("mode", raw.get("currentMode"))
+
+
+def room_record(state: Any) -> RoomRecord | None:
+    """Return the record for a room state, or None if it carries no state."""
+    if state is None or type(state) is RoomRecord:
+        return state
+    if type(state) is dict:
+        raw = state
+        values = (state.get(key) for key in ROOM_KEYS)
+        rctstate = state.get("state")
+    else:
+        raw = getattr(state, "raw", None) or {}
+        values = (getattr(state, key, None) for key in ROOM_KEYS)
+        if (rctstate := getattr(state, "rctstate", None)) is None:
+            rctstate = raw.get("state")
+    return RoomRecord(*values, room_mode(raw), getattr(rctstate, "value", rctstate))
+
+
+def _raw(state: Any) -> Any:
+    return state
+
+
+# Decoder of each device kind (see XComfortHub.device_kind) and of rooms
+STATE_DECODERS: dict[str, Callable[[Any], Any]] = {
+    "Light": light_record,
+    "Switch": switch_record,
+    "Shade": shade_record,
+    "WindowSensor": contact_record,
+    "DoorSensor": contact_record,
+    "DoorWindowSensor": contact_record,
+    "Room": room_record,
+}
+
+
+def state_decoder(kind: str) -> Callable[[Any], Any]:
+    """Return the decoder for a device kind; states of other kinds are passed on as they are."""
+    return STATE_DECODERS.get(kind, _raw)
+
+
+def decode_state(kind: str, state: Any) -> Any:
+    """Decode a single state of a device kind, e.g. the initial state of a device."""
+    return state_decoder(kind)(state)
@@ -5,16 +5,16 @@ Version: 2024.05.31.1
 # by oywin
 import logging
 
-from xcomfort.devices import DeviceState, Switch, SwitchState
-
 from homeassistant.components.switch import SwitchDeviceClass, SwitchEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers import device_registry as dr
 
 from .const import DOMAIN
+from .entity import XComfortEntity
 from .hub import XComfortHub
+from .index import BUCKET_SWITCHES
+from .states import SwitchRecord, switch_record
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,33 +23,20 @@ async def async_setup_entry(
 ) -> None:
     """Set up xComfort switch devices."""
     hub = XComfortHub.get_hub(hass, entry)
-    hub.config_entry = entry  # Store the config entry in the hub object
+
+    @callback
+    def _add_switches(devices):
+        # The hub has registered their devices when it indexed them
+        async_add_entities(HASSXComfortAppliance(hass, hub, device) for device in devices)
 
     async def _wait_for_hub_then_setup():
         await hub.has_done_initial_load.wait()
 
-        switches = []
-        device_registry = dr.async_get(hass)
-        for device in hub.devices:
-            _LOGGER.debug("Device type: %s, ID: %s, Name: %s", type(device).__name__, device.device_id, device.name)
-            if isinstance(device, Switch):
-                _LOGGER.debug("Adding Switch: %s", device)
-                appliance = HASSXComfortAppliance(hass, hub, device)
-                switches.append(appliance)
-                device_registry.async_get_or_create(
-                    config_entry_id=entry.entry_id,
-                    identifiers={(DOMAIN, f"{device.device_id}")},
-                    manufacturer="Eaton",
-                    name=device.name,
-                    model="Smartstikk"
-                )
-                _LOGGER.debug("Registered device for Switch: %s (ID: %s)", device.name, device.device_id)
-
-        async_add_entities(switches)
+        hub.async_setup_bucket(entry, BUCKET_SWITCHES, _add_switches)
 
     entry.async_create_task(hass, _wait_for_hub_then_setup())
 
-class HASSXComfortAppliance(SwitchEntity):
+class HASSXComfortAppliance(XComfortEntity, SwitchEntity):
     """Entity class for xComfort Smartstikk switches."""
 
     def __init__(self, hass: HomeAssistant, hub: XComfortHub, device) -> None:
@@ -57,56 +44,38 @@ class HASSXComfortAppliance(SwitchEntity):
         self.hub = hub
         self._device = device
         self._attr_device_class = SwitchDeviceClass.OUTLET
-        self._state = None
+        self._attr_is_on = None
         self.device_id = device.device_id
         self._unique_id = f"switch_{DOMAIN}_{device.device_id}"
-        self._device_subscription = None
 
     async def async_added_to_hass(self) -> None:
         """Run when entity is added to hass."""
         _LOGGER.debug("Subscribing to state updates for %s", self._device.name)
-        self._device_subscription = self._device.state.subscribe(self._state_change)
+        await super().async_added_to_hass()
+        self.async_on_remove(self.hub.async_subscribe_state("Switch", self.device_id, self._state_change))
         await self._fetch_initial_state()
 
     async def async_will_remove_from_hass(self) -> None:
-        if self._device_subscription is not None:
-            self._device_subscription.dispose()
-            self._device_subscription = None
+        self.hub.async_cancel_write(self)
 
     async def _fetch_initial_state(self) -> None:
         """Fetch initial state from the device."""
         _LOGGER.debug("Fetching initial state for %s", self._device.name)
         if hasattr(self._device, "state") and self._device.state.value is not None:
-            self._state_change(self._device.state.value)
+            self._state_change(switch_record(self._device.state.value))
         else:
             _LOGGER.debug("No initial state available for %s", self._device.name)
 
-    def _state_change(self, state) -> None:
+    @callback
+    def _state_change(self, record: SwitchRecord | None) -> None:
         """Handle state changes from the device."""
-        _LOGGER.debug("Raw state update for %s: %s", self._device.name, state)
-        if isinstance(state, SwitchState):
-            self._state = state.is_on
-            _LOGGER.debug("Processed SwitchState for %s: %s", self._device.name, self._state)
-        elif isinstance(state, DeviceState):
-            state_dict = state.payload
-            _LOGGER.debug("DeviceState payload dict for %s: %s", self._device.name, state_dict)
-            if "switch" in state_dict:
-                self._state = state_dict["switch"]
-                _LOGGER.debug("Processed switch from DeviceState for %s: %s", self._device.name, self._state)
-        elif isinstance(state, dict):
-            if "switch" in state:
-                self._state = state["switch"]
-                _LOGGER.debug("Processed switch from dict for %s: %s", self._device.name, self._state)
-        else:
-            _LOGGER.debug("Unhandled state type for %s: %s", self._device.name, type(state))
-        _LOGGER.debug("Final processed state for %s: %s", self._device.name, self._state)
-        if self._state is not None:
-            self.schedule_update_ha_state()
-
-    @property
-    def is_on(self) -> bool | None:
-        """Return True if entity is on."""
-        return self._state
+        if record is None:
+            return
+        previous = self._attr_is_on
+        self._attr_is_on = record.is_on
+        _LOGGER.debug("Processed state for %s: %s", self._device.name, record.is_on)
+        if record.is_on is not None:
+            self.hub.async_write_state(self, flush=record.is_on != previous)
 
     @property
     def name(self) -> str:
@@ -126,18 +95,20 @@ class HASSXComfortAppliance(SwitchEntity):
     @property
     def device_info(self) -> dict:
         """Return device-specific attributes."""
-        return {
-            "identifiers": {(DOMAIN, f"{self.device_id}")},
-            "name": self._device.name,
-            "manufacturer": "Eaton",
-            "model": "Smartstikk",
-        }
+        return self.hub.child_device_info(BUCKET_SWITCHES, self._device)
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn the switch on."""
         try:
             _LOGGER.debug("Turning on %s (device_id: %s)", self._device.name, self.device_id)
-            await self.hub.bridge.switch_device(self.device_id, {"switch": True})
+            await self.hub.async_send_optimistic(
+                ("Switch", self.device_id),
+                lambda record: SwitchRecord(True),
+                lambda: self.hub.bridge.switch_device(self.device_id, {"switch": True}),
+                key=("switch", self.device_id),
+                context=self._context,
+                name="switch_device",
+            )
         except Exception as e:
             _LOGGER.error("Failed to turn on %s: %s", self._device.name, str(e))
             raise
@@ -146,7 +117,14 @@ class HASSXComfortAppliance(SwitchEntity):
         """Turn the switch off."""
         try:
             _LOGGER.debug("Turning off %s (device_id: %s)", self._device.name, self.device_id)
-            await self.hub.bridge.switch_device(self.device_id, {"switch": False})
+            await self.hub.async_send_optimistic(
+                ("Switch", self.device_id),
+                lambda record: SwitchRecord(False),
+                lambda: self.hub.bridge.switch_device(self.device_id, {"switch": False}),
+                key=("switch", self.device_id),
+                context=self._context,
+                name="switch_device",
+            )
         except Exception as e:
             _LOGGER.error("Failed to turn off %s: %s", self._device.name, str(e))
             raise
\ No newline at end of file
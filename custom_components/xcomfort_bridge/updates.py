@@ -0,0 +1,119 @@
+"""Queue of bridge state updates for the xComfort Bridge integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StateUpdateQueue:
+    """Bounded queue between the bridge subscriptions and the entities.
+
+    The bridge library emits device and room states from inside its
+    websocket reader. They are decoded and queued there (see
+    XComfortHub._subscribe_source), and handled by a consumer task in
+    batches of up to batch_size, yielding to the event loop between batches,
+    so reading the next message does not wait for the entity and event bus
+    work of the previous ones.
+
+    When the queue is full the consumer is falling behind; the producer then
+    handles the oldest batch itself before queueing, which holds up the
+    reader as it used to. Updates are always handled in the order they were
+    queued. Depth, batches and overflows are counted for diagnostics.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        handle: Callable[..., None],
+        maxsize: int,
+        batch_size: int,
+    ) -> None:
+        """Initialize the queue.
+
+        Args:
+            hass: Home Assistant instance
+            handle: Called with the arguments of every queued update
+            maxsize: Updates queued before the producer handles them itself
+            batch_size: Updates handled per event loop iteration
+
+        """
+        self.hass = hass
+        self._handle = handle
+        self.maxsize = max(1, maxsize)
+        self.batch_size = max(1, batch_size)
+        self._queue: deque[tuple] = deque()
+        self._task: asyncio.Task | None = None
+        self._waiter: asyncio.Future | None = None
+        self.enqueued = 0
+        self.batches = 0
+        self.overflows = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        """Return the number of updates waiting to be handled."""
+        return len(self._queue)
+
+    @callback
+    def async_put(self, *update: Any) -> None:
+        """Queue an update, starting the consumer on first use."""
+        queue = self._queue
+        if len(queue) >= self.maxsize:
+            self.overflows += 1
+            self._handle_batch()
+        queue.append(update)
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, len(queue))
+
+        if (waiter := self._waiter) is not None:
+            self._waiter = None
+            waiter.set_result(None)
+        elif self._task is None:
+            self._task = self.hass.async_create_background_task(
+                self._consume(), "xcomfort_bridge state updates"
+            )
+
+    async def _consume(self) -> None:
+        queue = self._queue
+        while True:
+            if not queue:
+                self._waiter = self.hass.loop.create_future()
+                await self._waiter
+            self._handle_batch()
+            # Let the reader and other tasks run between batches
+            await asyncio.sleep(0)
+
+    def _handle_batch(self) -> None:
+        queue = self._queue
+        self.batches += 1
+        for _ in range(min(self.batch_size, len(queue))):
+            update = queue.popleft()
+            try:
+                self._handle(*update)
+            except Exception:
+                _LOGGER.exception("Error handling state update %s", update[:1])
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop the consumer and drop queued updates."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._waiter = None
+        _LOGGER.debug(
+            "State update queue stopped: %s updates, %s batches, %s overflows, max depth %s, %s dropped",
+            self.enqueued,
+            self.batches,
+            self.overflows,
+            self.max_depth,
+            len(self._queue),
+        )
+        self._queue.clear()
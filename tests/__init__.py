@@ -0,0 +1 @@
+"""Tests of the xComfort Bridge integration."""
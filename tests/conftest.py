@@ -0,0 +1,16 @@
+"""Shared setup of the xComfort Bridge tests.
+
+The tests run the integration against benchmarks/simulator.py in a bare Home
+Assistant instance, so no bridge or network is needed; they are skipped
+unless Home Assistant and xcomfort are installed.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
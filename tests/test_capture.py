@@ -0,0 +1,58 @@
+"""Tests of the bridge traffic capture."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("xcomfort")
+
+from custom_components.xcomfort_bridge import capture
+from custom_components.xcomfort_bridge.capture import TrafficRecorder, read_capture
+from homeassistant.core import HomeAssistant
+
+
+async def _record(config_dir: str, path: str, messages: int) -> TrafficRecorder:
+    hass = HomeAssistant(config_dir)
+    recorder = TrafficRecorder(hass, path)
+    recorder.async_start_connection()
+    handled = []
+    tapped = recorder.tap(handled.append)
+    for value in range(messages):
+        tapped({"type_int": 310, "payload": {"deviceId": value % 10, "switch": value % 2 == 0}})
+        if value % 10 == 9:
+            # Write in several gzip members so the file grows between writes
+            await recorder.async_close()
+    await recorder.async_close()
+    await hass.async_stop(force=True)
+    assert len(handled) == messages
+    return recorder
+
+
+def test_capture_round_trip(tmp_path) -> None:
+    """Recorded messages read back in order, in the shape the bridge emits them."""
+    path = str(tmp_path / "capture.jsonl.gz")
+    asyncio.run(_record(str(tmp_path), path, 25))
+    messages = [message for _, message in read_capture(path)]
+    assert [message["payload"]["deviceId"] for message in messages] == [value % 10 for value in range(25)]
+    assert messages[0] == {"type_int": 310, "payload": {"deviceId": 0, "switch": True}}
+
+
+def test_capture_rotates_at_max_size(tmp_path, monkeypatch) -> None:
+    """A full capture file is moved aside, and recording continues in a new one."""
+    monkeypatch.setattr(capture, "CAPTURE_MAX_BYTES", 200)
+    path = str(tmp_path / "capture.jsonl.gz")
+    recorder = asyncio.run(_record(str(tmp_path), path, 100))
+
+    assert recorder.rotations > 0
+    assert os.path.exists(f"{path}.1")
+    current = list(read_capture(path))
+    rotated = list(read_capture(f"{path}.1"))
+    assert current
+    assert rotated
+    # Times keep counting from the start of the connection
+    assert current[0][0] >= rotated[-1][0]
+    assert [message["payload"]["deviceId"] for _, message in current][-1] == 99 % 10
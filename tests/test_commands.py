@@ -0,0 +1,153 @@
+"""Tests of the command scheduler."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("xcomfort")
+
+from custom_components.xcomfort_bridge.commands import (
+    PRIORITY_AUTOMATION,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    CommandScheduler,
+)
+from custom_components.xcomfort_bridge.metrics import HubMetrics
+from homeassistant.core import HomeAssistant
+
+
+class _Bridge:
+    """Records the commands sent, optionally holding them until released."""
+
+    def __init__(self) -> None:
+        self.sent: list = []
+        self.release: asyncio.Event | None = None
+
+    def command(self, value):
+        async def _send():
+            self.sent.append(value)
+            if self.release is not None:
+                await self.release.wait()
+            return value
+
+        return _send
+
+
+def _run(test, config_dir: str, **kwargs) -> None:
+    async def _with_scheduler() -> None:
+        hass = HomeAssistant(config_dir)
+        scheduler = CommandScheduler(hass, **kwargs)
+        try:
+            await test(scheduler, _Bridge())
+        finally:
+            scheduler.async_shutdown()
+            await hass.async_stop(force=True)
+
+    asyncio.run(_with_scheduler())
+
+
+def test_commands_with_the_same_key_collapse(tmp_path) -> None:
+    """Only the last queued command for a key is sent, and every caller gets its result."""
+
+    async def _test(scheduler: CommandScheduler, bridge: _Bridge) -> None:
+        futures = [scheduler.async_submit(bridge.command(value), key="light") for value in (1, 2, 3)]
+        other = scheduler.async_submit(bridge.command("other"), key="shade")
+        assert await asyncio.gather(*futures, other) == [3, 3, 3, "other"]
+        assert bridge.sent == [3, "other"]
+        assert (scheduler.collapsed, scheduler.commands, scheduler.batches) == (2, 2, 1)
+
+    _run(_test, str(tmp_path), rate=0, burst=10)
+
+
+def test_commands_wait_for_the_one_in_flight(tmp_path) -> None:
+    """Newer commands for a key in flight are held, collapsing into one, until it completes."""
+
+    async def _test(scheduler: CommandScheduler, bridge: _Bridge) -> None:
+        bridge.release = asyncio.Event()
+        first = scheduler.async_submit(bridge.command(1), key="light")
+        await asyncio.sleep(0.01)
+        assert bridge.sent == [1]
+
+        later = [scheduler.async_submit(bridge.command(value), key="light") for value in (2, 3)]
+        unrelated = scheduler.async_submit(bridge.command("other"), key="shade")
+        await asyncio.sleep(0.01)
+        assert bridge.sent == [1, "other"]
+        assert scheduler.queue_depth == 1
+
+        bridge.release.set()
+        assert await asyncio.gather(first, *later, unrelated) == [1, 3, 3, "other"]
+        assert bridge.sent == [1, "other", 3]
+
+    _run(_test, str(tmp_path), rate=0, burst=10)
+
+
+def test_queued_commands_are_sent_in_priority_order(tmp_path) -> None:
+    """When tokens run out, interactive commands go before automation and background ones."""
+
+    async def _test(scheduler: CommandScheduler, bridge: _Bridge) -> None:
+        futures = [
+            scheduler.async_submit(bridge.command("background"), priority=PRIORITY_BACKGROUND),
+            scheduler.async_submit(bridge.command("automation"), priority=PRIORITY_AUTOMATION),
+            scheduler.async_submit(bridge.command("interactive"), priority=PRIORITY_INTERACTIVE),
+        ]
+        await asyncio.gather(*futures)
+        assert bridge.sent == ["interactive", "automation", "background"]
+
+    _run(_test, str(tmp_path), rate=100, burst=1)
+
+
+def test_collapsed_command_takes_the_higher_priority(tmp_path) -> None:
+    """A queued command superseded from a more urgent context moves up the queue."""
+
+    async def _test(scheduler: CommandScheduler, bridge: _Bridge) -> None:
+        futures = [
+            scheduler.async_submit(bridge.command("automation"), priority=PRIORITY_AUTOMATION),
+            scheduler.async_submit(bridge.command(1), key="light", priority=PRIORITY_BACKGROUND),
+            scheduler.async_submit(bridge.command(2), key="light", priority=PRIORITY_INTERACTIVE),
+        ]
+        await asyncio.gather(*futures)
+        assert bridge.sent == [2, "automation"]
+
+    _run(_test, str(tmp_path), rate=100, burst=1)
+
+
+def test_token_bucket_limits_the_rate(tmp_path) -> None:
+    """A burst goes out at once, the rest at the configured rate."""
+
+    async def _test(scheduler: CommandScheduler, bridge: _Bridge) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        futures = [scheduler.async_submit(bridge.command(value)) for value in range(7)]
+        await asyncio.sleep(0.005)
+        assert len(bridge.sent) == 2
+        await asyncio.gather(*futures)
+        assert bridge.sent == list(range(7))
+        # Five commands beyond the burst at 50 per second
+        assert loop.time() - started >= 5 / 50 - 0.01
+        assert scheduler.throttled >= 1
+
+    _run(_test, str(tmp_path), rate=50, burst=2)
+
+
+def test_errors_reach_every_caller_and_timings_are_recorded(tmp_path) -> None:
+    """A failed command fails the futures of all collapsed callers."""
+
+    async def _fail():
+        raise ConnectionError("bridge gone")
+
+    async def _test(scheduler: CommandScheduler, bridge: _Bridge) -> None:
+        futures = [
+            scheduler.async_submit(bridge.command(1), key="light", name="dimm"),
+            scheduler.async_submit(_fail, key="light", name="switch"),
+        ]
+        for result in await asyncio.gather(*futures, return_exceptions=True):
+            assert isinstance(result, ConnectionError)
+        assert bridge.sent == []
+        assert scheduler.metrics.command_names == ["switch"]
+        assert scheduler.metrics.command_latency("switch") is not None
+        assert scheduler.metrics.queue_wait() is not None
+
+    _run(_test, str(tmp_path), rate=0, burst=10, metrics=HubMetrics())
@@ -0,0 +1,62 @@
+"""Tests of the energy integration."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("xcomfort")
+
+from custom_components.xcomfort_bridge.energy import WS_PER_KWH, EnergyIntegrator
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _integrate(samples: list[tuple[float, float | None]], reads: list[float]) -> float:
+    """Integrate (time, power) samples, reading the energy at the given times."""
+    clock = _Clock()
+    integrator = EnergyIntegrator(clock=clock)
+    events = sorted([(at, False, power) for at, power in samples] + [(at, True, None) for at in reads])
+    for at, read, power in events:
+        clock.now = at
+        if read:
+            integrator.energy()
+        else:
+            integrator.add_sample(power)
+    return integrator.energy()
+
+
+@pytest.mark.parametrize("reads", [[], [60.0], [10.0, 20.0, 60.0, 99.0]])
+def test_total_does_not_depend_on_reads(reads: list[float]) -> None:
+    """Reading the energy between samples does not change the total."""
+    samples = [(0.0, 0.0), (100.0, 1000.0), (150.0, 200.0), (200.0, None)]
+    assert _integrate(samples, reads) == pytest.approx((1000 * 50 + 200 * 50) / WS_PER_KWH)
+
+
+def test_power_holds_until_the_next_sample() -> None:
+    """The energy up to a sample is the earlier power times the time between them."""
+    assert _integrate([(0.0, 1000.0), (100.0, 0.0)], []) == pytest.approx(1000 * 100 / WS_PER_KWH)
+
+
+def test_energy_includes_time_since_last_sample() -> None:
+    """energy() adds the pending energy without integrating it."""
+    clock = _Clock()
+    integrator = EnergyIntegrator(total=1.0, clock=clock)
+    integrator.add_sample(360.0)
+    clock.now = 10.0
+    assert integrator.energy() == pytest.approx(1.0 + 3600 / WS_PER_KWH)
+    assert integrator.total == 1.0
+    clock.now = 20.0
+    assert integrator.add_sample(360.0) == pytest.approx(1.0 + 7200 / WS_PER_KWH)
+
+
+def test_unknown_power_is_not_integrated() -> None:
+    """Nothing is integrated between a None sample and the next known one."""
+    samples = [(0.0, 100.0), (10.0, None), (1000.0, 100.0), (1010.0, None)]
+    assert _integrate(samples, [500.0]) == pytest.approx(100 * 20 / WS_PER_KWH)
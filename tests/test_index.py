@@ -0,0 +1,86 @@
+"""Tests of the device index."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("xcomfort")
+
+from custom_components.xcomfort_bridge.hub import XComfortHub
+from custom_components.xcomfort_bridge.index import (
+    BUCKET_ENERGY_ROOMS,
+    BUCKET_LIGHTS,
+    BUCKET_POWER_ROOMS,
+    BUCKET_RCT_ROOMS,
+    DeviceIndex,
+)
+from custom_components.xcomfort_bridge.snapshot import CachedDevice, CachedRoom
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+
+def _room_state(**values):
+    return SimpleNamespace(**{"temperature": None, "humidity": None, "power": None, "setpoint": None, "raw": {}, **values})
+
+
+def test_rooms_are_classified_by_their_state() -> None:
+    """Devices go to the bucket of their kind, rooms to the buckets their state has values for."""
+    index = DeviceIndex(XComfortHub.device_kind)
+    light = CachedDevice("Light", 1, "Lamp")
+    metered = CachedRoom(None, 1, "Kitchen", {"power": 5.0, "temperature": 21.0})
+    rct = CachedRoom(None, 2, "Bath", {"setpoint": 22.0, "temperature": 20.0, "power": 0.0})
+    added = index.add([light], [metered, rct])
+    assert added == {
+        BUCKET_LIGHTS: [light],
+        BUCKET_POWER_ROOMS: [metered, rct],
+        BUCKET_ENERGY_ROOMS: [metered, rct],
+        BUCKET_RCT_ROOMS: [rct],
+    }
+    assert index.add([light], [metered]) == {}
+    assert index.buckets_of(rct) == [BUCKET_RCT_ROOMS, BUCKET_POWER_ROOMS, BUCKET_ENERGY_ROOMS]
+
+    index.remove(rct)
+    assert index[BUCKET_RCT_ROOMS] == []
+    assert index[BUCKET_POWER_ROOMS] == [metered]
+
+
+def test_room_without_state_is_classified_once_it_has_one() -> None:
+    """A room added before it has a state is kept unclassified until added again."""
+    index = DeviceIndex(XComfortHub.device_kind)
+    room = CachedRoom(None, 3, "Hall", None)
+    assert index.add(rooms=[room]) == {}
+    assert index.unclassified == {3: room}
+
+    room.state.on_next(_room_state(power=12.0))
+    assert index.add(rooms=[room]) == {BUCKET_POWER_ROOMS: [room]}
+    assert index.unclassified == {}
+
+
+def test_hub_indexes_a_room_on_its_first_state(tmp_path) -> None:
+    """The platforms are told about a room once its first state arrives."""
+
+    async def _test() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        hub = XComfortHub(hass, "test", "test", "test", bridge=object())
+        room = CachedRoom(None, 4, "Office", None)
+        hub.rooms = [room]
+        hub.index.add(rooms=hub.rooms)
+        hub._subscribe_source(room)
+        hub.has_done_initial_load.set()
+        announced = []
+        async_dispatcher_connect(hass, hub.signal_index_added, announced.append)
+        try:
+            room.state.on_next(_room_state(power=40.0, temperature=19.0))
+            while hub.updates.depth:
+                await asyncio.sleep(0)
+            assert announced == [{BUCKET_POWER_ROOMS: [room], BUCKET_ENERGY_ROOMS: [room]}]
+            assert hub.index[BUCKET_POWER_ROOMS] == [room]
+        finally:
+            hub.updates.async_shutdown()
+            await hass.async_stop(force=True)
+
+    asyncio.run(_test())
@@ -0,0 +1,139 @@
+"""Tests of the optimistic state of commands."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("xcomfort")
+
+from custom_components.xcomfort_bridge.commands import CommandScheduler
+from custom_components.xcomfort_bridge.optimistic import OptimisticUpdates
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+KEY = ("Light", 1)
+
+
+def _turn_on(state):
+    return {**(state or {}), "switch": True}
+
+
+class _Device:
+    """The reported state of one device and the states dispatched for it."""
+
+    def __init__(self, state) -> None:
+        self.reported = state
+        self.dispatched: list = []
+
+    def dispatch(self, key, state) -> None:
+        assert key == KEY
+        self.dispatched.append(state)
+
+    def report(self, optimistic: OptimisticUpdates, state) -> None:
+        """Report a state from the bridge as the hub does."""
+        self.reported = state
+        if KEY in optimistic.pending:
+            state = optimistic.async_reported(KEY, state)
+        self.dispatch(KEY, state)
+
+
+def _run(test, config_dir: str, timeout: float = 10) -> None:
+    async def _with_tracker() -> None:
+        hass = HomeAssistant(config_dir)
+        device = _Device({"switch": False, "power": 0})
+        optimistic = OptimisticUpdates(hass, device.dispatch, lambda key: device.reported, timeout)
+        try:
+            await test(hass, optimistic, device)
+        finally:
+            optimistic.async_shutdown()
+            await hass.async_stop(force=True)
+
+    asyncio.run(_with_tracker())
+
+
+async def _sent(result="sent"):
+    return result
+
+
+def test_confirmed_command(tmp_path) -> None:
+    """The intended state is dispatched at once and kept on top of other reported changes."""
+
+    async def _test(hass, optimistic: OptimisticUpdates, device: _Device) -> None:
+        run = asyncio.create_task(optimistic.async_run(KEY, _turn_on, _sent))
+        await asyncio.sleep(0)
+        assert device.dispatched == [{"switch": True, "power": 0}]
+
+        device.report(optimistic, {"switch": False, "power": 5})
+        assert device.dispatched[-1] == {"switch": True, "power": 5}
+        assert not run.done()
+
+        device.report(optimistic, {"switch": True, "power": 60})
+        assert await run == "sent"
+        assert device.dispatched[-1] == {"switch": True, "power": 60}
+        assert (optimistic.confirmed, optimistic.rolled_back) == (1, 0)
+        assert not optimistic.pending
+
+    _run(_test, str(tmp_path))
+
+
+def test_unconfirmed_command_is_rolled_back(tmp_path) -> None:
+    """Without a confirmation within the timeout, the reported state is dispatched again."""
+
+    async def _test(hass, optimistic: OptimisticUpdates, device: _Device) -> None:
+        with pytest.raises(HomeAssistantError, match="not confirmed"):
+            await optimistic.async_run(KEY, _turn_on, _sent, name="Switch")
+        assert device.dispatched == [{"switch": True, "power": 0}, {"switch": False, "power": 0}]
+        assert (optimistic.confirmed, optimistic.rolled_back) == (0, 1)
+        assert not optimistic.pending
+
+    _run(_test, str(tmp_path), timeout=0.05)
+
+
+def test_failed_send_is_rolled_back(tmp_path) -> None:
+    """An error sending the command reaches the caller unchanged after the rollback."""
+
+    async def _fail():
+        raise ConnectionError("bridge gone")
+
+    async def _test(hass, optimistic: OptimisticUpdates, device: _Device) -> None:
+        with pytest.raises(ConnectionError):
+            await optimistic.async_run(KEY, _turn_on, _fail)
+        assert device.dispatched[-1] == {"switch": False, "power": 0}
+        assert optimistic.rolled_back == 1
+
+    _run(_test, str(tmp_path))
+
+
+def test_superseded_command_collapsed_in_the_scheduler(tmp_path) -> None:
+    """A command superseded while queued returns with the result of the one sent."""
+
+    async def _test(hass, optimistic: OptimisticUpdates, device: _Device) -> None:
+        scheduler = CommandScheduler(hass, rate=0, burst=10)
+        sent = []
+
+        def _send(value):
+            async def _command():
+                sent.append(value)
+                return value
+
+            return lambda: scheduler.async_submit(_command, key="light")
+
+        def _dimm(value):
+            return lambda state: {**(state or {}), "switch": True, "dimmvalue": value}
+
+        first = asyncio.create_task(optimistic.async_run(KEY, _dimm(20), _send(20)))
+        second = asyncio.create_task(optimistic.async_run(KEY, _dimm(80), _send(80)))
+        assert await first == 80
+        assert optimistic.superseded == 1
+        assert not second.done()
+
+        device.report(optimistic, {"switch": True, "dimmvalue": 80, "power": 0})
+        assert await second == 80
+        assert sent == [80]
+        assert [state["dimmvalue"] for state in device.dispatched] == [20, 80, 80]
+        scheduler.async_shutdown()
+
+    _run(_test, str(tmp_path))
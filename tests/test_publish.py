@@ -0,0 +1,111 @@
+"""Tests of the sensor publication policy."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("xcomfort")
+
+from custom_components.xcomfort_bridge.publish import PublishPolicy
+from homeassistant.core import HomeAssistant
+
+
+def _run(test, config_dir: str, **kwargs) -> None:
+    async def _with_policy() -> None:
+        hass = HomeAssistant(config_dir)
+        written: list = []
+        policy = PublishPolicy(hass, lambda: written.append(policy._value), **kwargs)
+        try:
+            await test(policy, written)
+        finally:
+            policy.async_cancel()
+            await hass.async_stop(force=True)
+
+    asyncio.run(_with_policy())
+
+
+def test_absolute_deadband(tmp_path) -> None:
+    """Changes up to the deadband from the last published value are not published."""
+
+    async def _test(policy: PublishPolicy, written: list) -> None:
+        policy.async_seed(100.0)
+        for value in (101.0, 99.5, 102.0, 102.5, 97.0):
+            policy.async_update(value)
+        assert written == [102.5, 97.0]
+        assert (policy.published, policy.suppressed) == (2, 3)
+
+    _run(_test, str(tmp_path), deadband=2.0)
+
+
+def test_relative_deadband(tmp_path) -> None:
+    """Changes up to the relative deadband of the last published value are not published."""
+
+    async def _test(policy: PublishPolicy, written: list) -> None:
+        policy.async_seed(1000.0)
+        for value in (1040.0, 960.0, 1060.0, 1100.0, 1170.0):
+            policy.async_update(value)
+        assert written == [1060.0, 1170.0]
+
+    _run(_test, str(tmp_path), relative_deadband=0.05)
+
+
+def test_unknown_values_are_published(tmp_path) -> None:
+    """Going to and from None always publishes, an unchanged value never does."""
+
+    async def _test(policy: PublishPolicy, written: list) -> None:
+        policy.async_seed(None)
+        for value in (None, 5.0, 5.0, None, None):
+            policy.async_update(value)
+        assert written == [5.0, None]
+
+    _run(_test, str(tmp_path), deadband=10.0)
+
+
+def test_min_interval_defers_the_latest_value(tmp_path) -> None:
+    """Values within the minimum interval are published once, with the latest value, when it ends."""
+
+    async def _test(policy: PublishPolicy, written: list) -> None:
+        policy.async_seed(0.0)
+        policy.async_update(1.0)
+        policy.async_update(2.0)
+        policy.async_update(3.0)
+        assert written == []
+        await asyncio.sleep(0.1)
+        assert written == [3.0]
+
+        # A burst settling back within the deadband is dropped when the interval ends
+        policy.async_seed(3.0)
+        policy.async_update(10.0)
+        policy.async_update(3.0)
+        await asyncio.sleep(0.1)
+        assert written == [3.0]
+
+    _run(_test, str(tmp_path), min_interval=0.05)
+
+
+def test_first_value_after_the_interval_is_published_at_once(tmp_path) -> None:
+    """Only values within the minimum interval of the last publication are deferred."""
+
+    async def _test(policy: PublishPolicy, written: list) -> None:
+        policy.async_seed(0.0)
+        await asyncio.sleep(0.06)
+        policy.async_update(1.0)
+        assert written == [1.0]
+
+    _run(_test, str(tmp_path), min_interval=0.05)
+
+
+def test_cancel_drops_the_deferred_value(tmp_path) -> None:
+    """A value deferred when the entity is removed is never written."""
+
+    async def _test(policy: PublishPolicy, written: list) -> None:
+        policy.async_seed(0.0)
+        policy.async_update(1.0)
+        policy.async_cancel()
+        await asyncio.sleep(0.1)
+        assert written == []
+
+    _run(_test, str(tmp_path), min_interval=0.05)
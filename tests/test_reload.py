@@ -0,0 +1,18 @@
+"""Leak check of reloading the config entry, see benchmarks/bench_reload.py."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("xcomfort")
+
+import bench_reload
+
+
+def test_reload_does_not_leak() -> None:
+    """Reloading the entry leaves no listeners, hubs, observers or memory behind."""
+    args = bench_reload.parse_args(["--reloads", "15", "--warmup", "5", "--lights", "10", "--shades", "2"])
+    assert asyncio.run(bench_reload.run(args))
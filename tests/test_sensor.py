@@ -0,0 +1,65 @@
+"""Tests of the room sensors."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("xcomfort")
+
+from simulator import SimulatedBridge
+
+from custom_components.xcomfort_bridge.energy import WS_PER_KWH, EnergyIntegrator
+from custom_components.xcomfort_bridge.hub import XComfortHub
+from custom_components.xcomfort_bridge.sensor import XComfortEnergySensor
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import restore_state
+
+POWER = 1000.0
+
+
+async def _wait_for(condition, timeout: float = 10) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+async def _energy_across_reconnect(config_dir: str) -> None:
+    hass = HomeAssistant(config_dir)
+    await hass.async_start()
+    await restore_state.async_load(hass)
+    bridge = SimulatedBridge(lights=1, shades=0, rooms=1)
+    bridge.set_power(1, POWER)
+    hub = XComfortHub(hass, "test", "simulator", "simulator", bridge=bridge)
+    run = asyncio.create_task(hub.run())
+    try:
+        await hub.load_devices()
+        now = 0.0
+        sensor = XComfortEnergySensor(hub, hub.rooms[0], {})
+        sensor._integrator = EnergyIntegrator(clock=lambda: now)
+        sensor.hass = hass
+        sensor.entity_id = "sensor.room_1_energy"
+        await sensor.async_added_to_hass()
+
+        await bridge.drop_connection()
+        await _wait_for(lambda: not hub.available)
+        # The bridge reports the same power for the room after the reconnect
+        await _wait_for(lambda: hub.available)
+        await hass.async_block_till_done()
+        assert hub.metrics.reconnects == 1
+
+        now = 3600.0
+        assert sensor.native_value == pytest.approx(POWER * 3600 / WS_PER_KWH)
+
+        await sensor.async_remove(force_remove=True)
+    finally:
+        await hub.stop()
+        await run
+        await hass.async_stop(force=True)
+
+
+def test_energy_integrates_constant_power_across_reconnect(tmp_path) -> None:
+    """A room whose power does not change over a reconnect keeps accumulating energy."""
+    asyncio.run(_energy_across_reconnect(str(tmp_path)))
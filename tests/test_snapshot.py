@@ -0,0 +1,62 @@
+"""Tests of the cached inventory stand-ins."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("xcomfort")
+
+from custom_components.xcomfort_bridge.observable import StateObservable
+from custom_components.xcomfort_bridge.snapshot import (
+    CachedDevice,
+    CachedRoomState,
+    encode_room_state,
+)
+from custom_components.xcomfort_bridge.states import room_record
+
+
+def test_binding_again_keeps_the_subscription() -> None:
+    """A refresh binding the same live device does not deliver its state again."""
+    device = CachedDevice("Light", 1, "Old", dimmable=False, state={"switch": False, "dimmvalue": 0})
+    live = SimpleNamespace(name="Lamp", dimmable=True, state=StateObservable({"switch": True, "dimmvalue": 50}))
+    delivered = []
+    device.state.subscribe(delivered.append)
+    delivered.clear()
+
+    device.bind(live)
+    assert device.is_bound_to(live)
+    assert (device.name, device.dimmable) == ("Lamp", True)
+    assert delivered == [live.state.value]
+
+    live.dimmable = False
+    device.bind(live)
+    assert device.dimmable is False
+    assert delivered == [live.state.value]
+
+    live.state.on_next({"switch": False, "dimmvalue": 0})
+    assert delivered == [{"switch": True, "dimmvalue": 50}, {"switch": False, "dimmvalue": 0}]
+
+
+def test_binding_another_live_object_moves_the_subscription() -> None:
+    """State of the previously bound object is no longer forwarded."""
+    device = CachedDevice("Switch", 2, "Plug")
+    first = SimpleNamespace(name="Plug", state=StateObservable(None))
+    second = SimpleNamespace(name="Plug", state=StateObservable(None))
+    device.bind(first)
+    device.bind(second)
+
+    first.state.on_next(True)
+    assert device.state.value is None
+    second.state.on_next(True)
+    assert device.state.value is True
+
+
+def test_room_mode_matches_live_record() -> None:
+    """A restored room has the preset its live record has."""
+    raw = {"currentMode": 1, "mode": 3}
+    state = SimpleNamespace(temperature=21.0, humidity=40.0, power=5.0, setpoint=22.0, raw=raw)
+    restored = room_record(CachedRoomState(encode_room_state(state)))
+    assert restored.mode == room_record(state).mode == 3
@@ -0,0 +1,133 @@
+"""Tests of the bridge state update queue."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("xcomfort")
+
+from custom_components.xcomfort_bridge.const import EVENT_XCOMFORT
+from custom_components.xcomfort_bridge.hub import XComfortHub
+from custom_components.xcomfort_bridge.snapshot import CachedDevice
+from custom_components.xcomfort_bridge.states import ShadeRecord
+from custom_components.xcomfort_bridge.updates import StateUpdateQueue
+from homeassistant.core import HomeAssistant
+
+
+def _run(test, config_dir: str, maxsize: int, batch_size: int) -> None:
+    async def _with_queue() -> None:
+        hass = HomeAssistant(config_dir)
+        handled: list = []
+        updates = StateUpdateQueue(hass, lambda *update: handled.append(update), maxsize, batch_size)
+        try:
+            await test(updates, handled)
+        finally:
+            updates.async_shutdown()
+            await hass.async_stop(force=True)
+
+    asyncio.run(_with_queue())
+
+
+async def _drain(updates: StateUpdateQueue) -> None:
+    while updates.depth:
+        await asyncio.sleep(0)
+
+
+def test_updates_are_handled_in_order_in_batches(tmp_path) -> None:
+    """Updates are handled by the consumer, batch_size per event loop iteration, in order."""
+
+    async def _test(updates: StateUpdateQueue, handled: list) -> None:
+        for value in range(10):
+            updates.async_put("Light", value)
+        assert handled == []
+        assert updates.depth == updates.max_depth == 10
+
+        await _drain(updates)
+        assert handled == [("Light", value) for value in range(10)]
+        assert updates.batches == 3
+        assert (updates.enqueued, updates.overflows) == (10, 0)
+
+    _run(_test, str(tmp_path), maxsize=100, batch_size=4)
+
+
+def test_full_queue_is_handled_by_the_producer(tmp_path) -> None:
+    """When the queue is full, the producer handles the oldest batch before queueing."""
+
+    async def _test(updates: StateUpdateQueue, handled: list) -> None:
+        for value in range(5):
+            updates.async_put(value)
+        assert handled == [(0,), (1,)]
+        assert updates.overflows == 1
+        assert updates.max_depth == 4
+
+        await _drain(updates)
+        assert handled == [(value,) for value in range(5)]
+
+    _run(_test, str(tmp_path), maxsize=4, batch_size=2)
+
+
+def test_errors_do_not_stop_the_consumer(tmp_path) -> None:
+    """An update whose handler fails is logged, and the ones after it are handled."""
+
+    async def _test(updates: StateUpdateQueue, handled: list) -> None:
+        def _handle(value) -> None:
+            if value == 1:
+                raise ValueError(value)
+            handled.append(value)
+
+        updates._handle = _handle
+        for value in range(3):
+            updates.async_put(value)
+        await _drain(updates)
+        assert handled == [0, 2]
+
+    _run(_test, str(tmp_path), maxsize=100, batch_size=10)
+
+
+def test_shutdown_drops_queued_updates(tmp_path) -> None:
+    """Updates still queued at shutdown are dropped and the consumer stops."""
+
+    async def _test(updates: StateUpdateQueue, handled: list) -> None:
+        updates.async_put(0)
+        await _drain(updates)
+        for value in range(1, 4):
+            updates.async_put(value)
+        updates.async_shutdown()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert handled == [(0,)]
+        assert updates.depth == 0
+
+    _run(_test, str(tmp_path), maxsize=100, batch_size=10)
+
+
+def test_hub_queues_states_decoded_when_emitted(tmp_path) -> None:
+    """A state the library changes in place after emitting it is dispatched as emitted."""
+
+    async def _test() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        hub = XComfortHub(hass, "test", "test", "test", bridge=object())
+        hub.fire_events = True
+        shade = CachedDevice("Shade", 7, "Blind", state={"shPos": 50})
+        records, events = [], []
+        unsubscribe = hub.async_subscribe_state("Shade", 7, records.append)
+        hass.bus.async_listen(EVENT_XCOMFORT, lambda event: events.append(event.data["new_state"]))
+        try:
+            hub._subscribe_source(shade)
+            state = SimpleNamespace(position=10, raw={"shPos": 10})
+            shade.state.on_next(state)
+            state.position = state.raw["shPos"] = 90
+            await _drain(hub.updates)
+            await hass.async_block_till_done()
+            assert records == [ShadeRecord(50), ShadeRecord(10)]
+            assert events[-1] == {"shPos": 10}
+        finally:
+            unsubscribe()
+            hub.updates.async_shutdown()
+            await hass.async_stop(force=True)
+
+    asyncio.run(_test())